@@ -1,35 +1,39 @@
-import json
 import logging
+import threading
 
-import azure.functions as func
+try:
+    import azure.functions as func
+except ImportError:  # only the function app needs it, not python -m TickerParser
+    func = None
 
-from . import ticker_parser as tp
+from . import api
 
+_configure_lock = threading.Lock()
+_configured = False
 
-def main(req: func.HttpRequest) -> func.HttpResponse:
+
+def _configure():
+    """
+    apply the function app settings on the first request rather than on import, so python -m TickerParser,
+    which imports this package too, does not pick them up
+    """
+    global _configured
+    with _configure_lock:
+        if not _configured:
+            api.configure_from_environ()
+            _configured = True
+
+
+def main(req: "func.HttpRequest") -> "func.HttpResponse":
     logging.info("Python HTTP trigger function processed a request.")
 
-    ticker = req.params.get("ticker")
-    if not ticker:
-        try:
-            req_body = req.get_json()
-        except ValueError:
-            pass
-        else:
-            ticker = req_body.get("ticker")
-
-    if ticker:
-        # multiple tickers passed in via req body
-        if isinstance(ticker, (tuple, list)):
-            return func.HttpResponse(json.dumps([tp.parse_ticker(t) for t in ticker]))
-        # multiple tickers passed in via req params, e.g. "AAPL,MSFT,IBM"
-        elif isinstance(ticker, str) and "," in ticker:
-            return func.HttpResponse(json.dumps([tp.parse_ticker(t) for t in ticker.split(",")]))
-        # single ticker passed
-        else:
-            return func.HttpResponse(json.dumps(tp.parse_ticker(ticker)))
-    else:
-        return func.HttpResponse(
-            "No valid input was provided. Please pass a ticker on the query string (ticker=AAPL) or in the request body (as JSON)",
-            status_code=400,
-        )
+    if not _configured:
+        _configure()
+    resp = api.handle(req.params, req.headers, req.get_body())
+    body = resp.body
+    if not isinstance(body, (str, bytes)):
+        # the Functions Python worker cannot stream a response, so bulk results are sent in one piece
+        body = b"".join(body)
+    return func.HttpResponse(
+        body, status_code=resp.status_code, mimetype=resp.mimetype, headers=resp.headers
+    )
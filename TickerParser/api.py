@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+The HTTP contract of the ticker parser, independent of what serves it. Both the Azure Functions trigger in
+__init__.py and the standalone server in server.py hand their requests to handle().
+
+    GET  ?ticker=AAPL                       one result object
+    GET  ?ticker=AAPL,MSFT                  list of result objects
+    POST {"ticker": ["AAPL", "MSFT"]}       list of result objects
+    POST NDJSON (Content-Type application/x-ndjson), see ndjson_bulk
+    GET  ?metrics=1                         parse counters, latencies and cache statistics, as JSON
+
+formats=Bloomberg,OCC (or "formats": [...] in the JSON body) limits which renderings are returned.
+"""
+
+import atexit
+import importlib
+import json
+import os
+from typing import Iterator, NamedTuple, Optional, Union
+
+try:
+    from . import ndjson_bulk, reference_data, symbol_store
+    from . import ticker_parser as tp
+except ImportError:  # imported as a top level module, like the tests do
+    import ndjson_bulk
+    import reference_data
+    import symbol_store
+    import ticker_parser as tp
+
+NO_INPUT_MESSAGE = (
+    "No valid input was provided. Please pass a ticker on the query string (ticker=AAPL) or in the "
+    "request body (as JSON)"
+)
+
+BULK_MAX_ROWS = ndjson_bulk.DEFAULT_MAX_ROWS
+BULK_MAX_BYTES = ndjson_bulk.DEFAULT_MAX_BYTES
+REFERENCE_DATA = None  # reference_data.ReferenceDataFile, when one is configured
+_APPLIED_SETTINGS = None  # (settings, PARSE_CACHE) of the last configure_from_environ
+
+
+class Response(NamedTuple):
+    body: Union[
+        str, bytes, Iterator[bytes]
+    ]  # an iterator of blocks for bulk responses, see ndjson_bulk
+    status_code: int = 200
+    mimetype: str = "text/plain"
+    headers: Optional[dict] = None
+
+
+class TickerRequest(NamedTuple):
+    tickers: list
+    single: bool  # a single ticker was asked for, answer with one object rather than a list
+    formats: tuple
+
+    def respond(self, results: list) -> Response:
+        """the Response for the results of parsing tickers, in order"""
+        results = [r.to_dict() if isinstance(r, tp.TickerError) else r for r in results]
+        return Response(json.dumps(results[0] if self.single else results))
+
+
+def configure_from_environ(environ=os.environ):
+    """
+    apply the TICKER_PARSER_* settings from the environment, i.e. the function app settings. Applying the
+    same settings again does nothing, rather than stacking a second shared cache or symbol store on the
+    first ones.
+    """
+    global BULK_MAX_ROWS, BULK_MAX_BYTES, REFERENCE_DATA, _APPLIED_SETTINGS
+
+    settings = {key: value for key, value in environ.items() if key.startswith("TICKER_PARSER_")}
+    if _APPLIED_SETTINGS == (settings, tp.PARSE_CACHE):
+        return
+
+    # size the parse cache, e.g. TICKER_PARSER_CACHE_SIZE=200000
+    cache_settings = (
+        "TICKER_PARSER_CACHE_SIZE",
+        "TICKER_PARSER_CACHE_POLICY",
+        "TICKER_PARSER_CACHE_EXPIRY_AWARE",
+    )
+    if any(key in environ for key in cache_settings):
+        tp.configure_parse_cache(
+            maxsize=int(environ.get("TICKER_PARSER_CACHE_SIZE", tp.PARSE_CACHE.maxsize)),
+            policy=environ.get("TICKER_PARSER_CACHE_POLICY", tp.CACHE_POLICY.LRU),
+            expiry_aware=environ.get("TICKER_PARSER_CACHE_EXPIRY_AWARE", "").lower()
+            in ("1", "true"),
+        )
+
+    # persistent second level for the parse cache, e.g. TICKER_PARSER_SYMBOL_DB=/home/data/symbols.sqlite
+    if environ.get("TICKER_PARSER_SYMBOL_DB"):
+        tp.PARSE_CACHE.store = symbol_store.SymbolStore(environ["TICKER_PARSER_SYMBOL_DB"])
+
+    # parse cache shared by the worker processes of the host, in front of the symbol store if there is one,
+    # e.g. TICKER_PARSER_SHARED_CACHE=ticker_parser, see shared_cache
+    if environ.get("TICKER_PARSER_SHARED_CACHE"):
+        # imported here, shared_cache needs a POSIX host
+        shared_cache = importlib.import_module(
+            f"{__package__}.shared_cache" if __package__ else "shared_cache"
+        )
+        tp.PARSE_CACHE.store = shared_cache.SharedParseCache(
+            environ["TICKER_PARSER_SHARED_CACHE"],
+            entries=int(
+                environ.get("TICKER_PARSER_SHARED_CACHE_ENTRIES", shared_cache.DEFAULT_ENTRIES)
+            ),
+            store=tp.PARSE_CACHE.store,
+        )
+    if environ.get("TICKER_PARSER_SYMBOL_DB") or environ.get("TICKER_PARSER_SHARED_CACHE"):
+        atexit.register(tp.PARSE_CACHE.store.close)
+
+    # index and cash symbols, e.g. TICKER_PARSER_REFERENCE_DATA=/home/data/reference.csv, see reference_data
+    if environ.get("TICKER_PARSER_REFERENCE_DATA"):
+        REFERENCE_DATA = reference_data.ReferenceDataFile(
+            environ["TICKER_PARSER_REFERENCE_DATA"],
+            float(
+                environ.get(
+                    "TICKER_PARSER_REFERENCE_DATA_CHECK_SECONDS",
+                    reference_data.DEFAULT_CHECK_INTERVAL,
+                )
+            ),
+        )
+        REFERENCE_DATA.reload()
+
+    # log one in this many parsed tickers, 0 for none
+    if "TICKER_PARSER_LOG_SAMPLE_EVERY" in environ:
+        tp.METRICS.log_every = int(environ["TICKER_PARSER_LOG_SAMPLE_EVERY"])
+
+    BULK_MAX_ROWS = int(environ.get("TICKER_PARSER_BULK_MAX_ROWS", BULK_MAX_ROWS))
+    BULK_MAX_BYTES = int(environ.get("TICKER_PARSER_BULK_MAX_BYTES", BULK_MAX_BYTES))
+    _APPLIED_SETTINGS = (settings, tp.PARSE_CACHE)
+
+
+def selected_formats(formats) -> tuple:
+    """formats to render, from a list or a comma separated string like "Bloomberg,OCC", all by default"""
+    if not formats:
+        return tp.RENDER_FORMATS
+    if isinstance(formats, str):
+        formats = formats.split(",")
+    return tp.check_formats(formats)
+
+
+def check_reference_data():
+    """pick up changes to the reference data file, if one is configured"""
+    if REFERENCE_DATA is not None:
+        REFERENCE_DATA.check()
+
+
+def is_metrics(params) -> bool:
+    return "metrics" in params
+
+
+def is_bulk(headers) -> bool:
+    return headers.get("content-type", "").startswith(ndjson_bulk.CONTENT_TYPE)
+
+
+def bulk_response(params, headers, body: bytes) -> Response:
+    """NDJSON in, NDJSON out, see ndjson_bulk"""
+    gzip_output = "gzip" in headers.get("accept-encoding", "")
+    try:
+        body = ndjson_bulk.convert_body(
+            body,
+            formats=selected_formats(params.get("formats")),
+            gzipped=headers.get("content-encoding", "").lower() == "gzip",
+            gzip_output=gzip_output,
+            max_rows=BULK_MAX_ROWS,
+            max_bytes=BULK_MAX_BYTES,
+        )
+    except ndjson_bulk.BulkRequestError as e:
+        return Response(str(e), status_code=e.status_code)
+    except ValueError as e:
+        return Response(str(e), status_code=400)
+    headers = {"Content-Encoding": "gzip"} if gzip_output else None
+    return Response(body, mimetype=ndjson_bulk.CONTENT_TYPE, headers=headers)
+
+
+def read_request(params, body: bytes) -> Union[TickerRequest, Response]:
+    """the tickers asked for by a (non bulk) request, or the error Response to answer with"""
+    ticker = params.get("ticker")
+    formats = params.get("formats")
+    if not ticker:
+        try:
+            req_body = json.loads(body)
+        except ValueError:
+            pass
+        else:
+            if isinstance(req_body, dict):
+                ticker = req_body.get("ticker")
+                formats = formats or req_body.get("formats")
+
+    try:
+        formats = selected_formats(formats)
+    except ValueError as e:
+        return Response(str(e), status_code=400)
+
+    if ticker:
+        # multiple tickers passed in via req body
+        if isinstance(ticker, (tuple, list)):
+            return TickerRequest(list(ticker), False, formats)
+        # multiple tickers passed in via req params, e.g. "AAPL,MSFT,IBM"
+        elif isinstance(ticker, str) and "," in ticker:
+            return TickerRequest(ticker.split(","), False, formats)
+        # single ticker passed
+        else:
+            return TickerRequest([ticker], True, formats)
+    else:
+        return Response(NO_INPUT_MESSAGE, status_code=400)
+
+
+def handle(params, headers, body: bytes) -> Response:
+    """
+    Answer one request. params are the query string parameters, headers a mapping with lower case keys
+    and body the raw request body. The body of a bulk Response is parsed as it is iterated over.
+    """
+    check_reference_data()
+    if is_metrics(params):
+        return Response(json.dumps(tp.metrics_snapshot()), mimetype="application/json")
+    if is_bulk(headers):
+        return bulk_response(params, headers, body)
+
+    request = read_request(params, body)
+    if isinstance(request, Response):
+        return request
+    if request.single:
+        return request.respond([tp.parse_ticker(request.tickers[0], request.formats)])
+    return request.respond(tp.parse_tickers(request.tickers, request.formats))
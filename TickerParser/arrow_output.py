@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk parse results as Apache Arrow record batches, with one fixed schema (SCHEMA) for every batch, written
+to Parquet or Arrow IPC files without going through dicts or JSON:
+
+    write_parquet(tickers, "positions.parquet")
+    python -m TickerParser convert positions.csv --column Symbol --parquet -o positions.parquet
+
+Every row has the Security fields, the ticker_occ, ticker_bloomberg and ticker_eze renderings, and an
+error_reason (one of PARSE_ERROR) that is only set, with every other field null, for tickers that could not
+be parsed.
+
+Requires pyarrow, which is not needed by the rest of the package.
+"""
+
+import sys
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    from . import bulk
+    from . import ticker_parser as tp
+except ImportError:  # imported as a top level module, like the tests do
+    import bulk
+    import ticker_parser as tp
+
+SCHEMA = pa.schema(
+    [
+        pa.field("ticker_original", pa.string(), nullable=False),
+        pa.field("format_type", pa.string()),
+        pa.field("asset_class", pa.string()),
+        pa.field("root_symbol", pa.string()),
+        pa.field("call_put", pa.string()),
+        pa.field("expiry_year", pa.int16()),
+        pa.field("expiry_month", pa.int8()),
+        pa.field("expiry_day", pa.int8()),
+        pa.field("strike_price", pa.float64()),
+        pa.field("exchange", pa.string()),
+        pa.field("bloomberg_suffix", pa.string()),
+        pa.field("ticker_occ", pa.string()),
+        pa.field("ticker_bloomberg", pa.string()),
+        pa.field("ticker_eze", pa.string()),
+        pa.field("error_reason", pa.string()),
+    ]
+)
+
+_SECURITY_FIELDS = [name for name in SCHEMA.names if name in tp.Security.__slots__]
+
+
+def record_batch(tickers) -> pa.RecordBatch:
+    """
+    Parse results for tickers as one record batch, one row per ticker in input order. Each distinct ticker
+    is looked up (and parsed if need be) once, and its row repeated for its duplicates.
+    """
+    tickers = list(tickers)
+    distinct = list(dict.fromkeys(tickers))
+    results = tp._lookup_many(tickers)
+    columns = {name: [] for name in SCHEMA.names}
+    for ticker in distinct:
+        result = results[ticker]
+        columns["ticker_original"].append(ticker)
+        if isinstance(result, tp.TickerError):
+            for name in SCHEMA.names[1:-1]:
+                columns[name].append(None)
+            columns["error_reason"].append(result.reason)
+            continue
+        s = result.security
+        for name in _SECURITY_FIELDS:
+            value = getattr(s, name)
+            columns[name].append(None if value == "" else value)
+        for fmt, key in tp.RENDERED_KEYS.items():
+            columns[key].append(result.render(fmt))
+        columns["error_reason"].append(None)
+
+    batch = pa.RecordBatch.from_arrays(
+        [pa.array(columns[field.name], type=field.type) for field in SCHEMA], schema=SCHEMA
+    )
+    if len(distinct) == len(tickers):
+        return batch
+    position = {ticker: i for i, ticker in enumerate(distinct)}
+    return batch.take(pa.array([position[ticker] for ticker in tickers], type=pa.int32()))
+
+
+def iter_record_batches(tickers, chunk_size=bulk.DEFAULT_CHUNK_SIZE):
+    """record_batch for each chunk of chunk_size tickers"""
+    for chunk in bulk.chunked(tickers, chunk_size):
+        yield record_batch(chunk)
+
+
+def to_table(tickers, chunk_size=bulk.DEFAULT_CHUNK_SIZE) -> pa.Table:
+    return pa.Table.from_batches(list(iter_record_batches(tickers, chunk_size)), schema=SCHEMA)
+
+
+def _write(tickers, writer, chunk_size) -> bulk.ConvertStats:
+    start = time.perf_counter()
+    rows = errors = 0
+    for batch in iter_record_batches(tickers, chunk_size):
+        writer.write_batch(batch)
+        rows += batch.num_rows
+        errors += batch.num_rows - batch.column("error_reason").null_count
+    return bulk.ConvertStats(rows, errors, time.perf_counter() - start)
+
+
+def _sink(where):
+    """where to write: a path, a binary file object, or "-" for stdout"""
+    return sys.stdout.buffer if where == "-" else where
+
+
+def write_parquet(
+    tickers, where, chunk_size=bulk.DEFAULT_CHUNK_SIZE, compression="zstd"
+) -> bulk.ConvertStats:
+    """write the parse results for tickers to a Parquet file, one row group per chunk"""
+    with pq.ParquetWriter(_sink(where), SCHEMA, compression=compression) as writer:
+        return _write(tickers, writer, chunk_size)
+
+
+def write_ipc(
+    tickers, where, chunk_size=bulk.DEFAULT_CHUNK_SIZE, stream=False
+) -> bulk.ConvertStats:
+    """
+    write the parse results for tickers in the Arrow IPC file format, or the IPC streaming format with
+    stream=True, one record batch per chunk
+    """
+    new_writer = pa.ipc.new_stream if stream else pa.ipc.new_file
+    with new_writer(_sink(where), SCHEMA) as writer:
+        return _write(tickers, writer, chunk_size)
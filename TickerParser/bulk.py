@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming conversion of ticker files, one ticker per line or one column of a CSV file.
+
+Rows are read and written in chunks through ticker_parser.parse_tickers/convert_tickers, so memory use
+depends on the chunk size and not on the size of the file.
+"""
+
+import contextlib
+import csv
+import itertools
+import json
+import sys
+import time
+from typing import NamedTuple
+
+try:
+    from . import ticker_parser as tp
+except ImportError:  # imported as a top level module, like the tests do
+    import ticker_parser as tp
+
+TARGET_FORMATS = ["OCC", "Bloomberg", "Eze"]
+DEFAULT_CHUNK_SIZE = 10_000
+IO_BUFFER_SIZE = 1 << 20
+
+
+class ConvertStats(NamedTuple):
+    rows: int
+    errors: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else float("inf")
+
+    def __str__(self):
+        return (
+            f"{self.rows} rows ({self.errors} errors) in {self.seconds:.2f}s, "
+            f"{self.rows_per_second:,.0f} rows/sec"
+        )
+
+
+def chunked(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def convert_fields(tickers, target_format=None):
+    """
+    Convert one chunk of tickers into output fields: the ticker in target_format (empty string if it could
+    not be parsed), or the parse_ticker result as a JSON string when target_format is None.
+    Returns (fields, failed), failed being True for each ticker that could not be parsed.
+    """
+    if target_format is None:
+        results = tp.parse_tickers(tickers)
+        fields = [json.dumps(r.to_dict() if isinstance(r, tp.TickerError) else r) for r in results]
+    else:
+        results = tp.convert_tickers(tickers, target_format)
+        fields = ["" if isinstance(r, tp.TickerError) else r for r in results]
+    return fields, [isinstance(r, tp.TickerError) for r in results]
+
+
+def convert_chunk(tickers, target_format=None):
+    """same as convert_fields, returning (fields, error_count)"""
+    fields, failed = convert_fields(tickers, target_format)
+    return fields, sum(failed)
+
+
+def column_index(header, column) -> int:
+    if isinstance(column, int):
+        return column
+    if column.isdigit():
+        return int(column)
+    try:
+        return header.index(column)
+    except ValueError:
+        raise ValueError(f"Column {column!r} not found in header {header}") from None
+
+
+def read_tickers(lines, column=None, delimiter=",", header=True):
+    """
+    Tickers from an iterable of lines, one per line, or from one column of CSV lines (column is a header
+    name or a 0-based index) skipping the header row if there is one.
+    """
+    if column is None:
+        return (line.rstrip("\r\n") for line in lines)
+    rows = csv.reader(lines, delimiter=delimiter)
+    index = column_index(next(rows, []) if header else [], column)
+    return (row[index] if index < len(row) else "" for row in rows)
+
+
+def convert_lines(lines, target_format=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Convert an iterable of lines, one ticker per line, yielding an output line for each input line.
+    Yields (output_lines, error_count) per chunk.
+    """
+    for chunk in chunked(lines, chunk_size):
+        tickers = [line.rstrip("\r\n") for line in chunk]
+        fields, errors = convert_chunk(tickers, target_format)
+        yield [f + "\n" for f in fields], errors
+
+
+def convert_csv_rows(rows, column, target_format=None, chunk_size=DEFAULT_CHUNK_SIZE, header=True):
+    """
+    Convert one column of an iterable of CSV rows (lists of fields), yielding the rows with the converted
+    field appended. column is a header name or a 0-based index. Yields (output_rows, error_count) per chunk,
+    starting with the header row if there is one.
+    """
+    rows = iter(rows)
+    if header:
+        header_row = next(rows, None)
+        if header_row is None:
+            return
+        index = column_index(header_row, column)
+        new_column = f"ticker_{target_format.lower()}" if target_format else "parsed"
+        yield [header_row + [new_column]], 0
+    else:
+        index = column_index([], column)
+
+    for chunk in chunked(rows, chunk_size):
+        tickers = [row[index] if index < len(row) else "" for row in chunk]
+        fields, errors = convert_chunk(tickers, target_format)
+        yield [row + [field] for row, field in zip(chunk, fields)], errors
+
+
+def open_text(path, mode):
+    """open path for buffered text I/O, "-" meaning stdin or stdout (which are left open afterwards)"""
+    if path == "-":
+        return contextlib.nullcontext(sys.stdin if "r" in mode else sys.stdout)
+    return open(path, mode, buffering=IO_BUFFER_SIZE, encoding="utf-8", newline="")
+
+
+def convert_file(
+    src,
+    dst,
+    target_format=None,
+    *,
+    column=None,
+    delimiter=",",
+    header=True,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+) -> ConvertStats:
+    """
+    Convert the file at path src into dst ("-" for stdin/stdout), writing each chunk as soon as it is done.
+
+    Without column, src has one ticker per line and dst gets one converted ticker per line (empty when the
+    ticker could not be parsed). With column, src is a CSV file and dst is the same CSV with the converted
+    ticker appended as a new column. With no target_format, the output field is the parse_ticker result
+    as JSON instead.
+    """
+    start = time.perf_counter()
+    rows = errors = 0
+    with open_text(src, "r") as fin, open_text(dst, "w") as fout:
+        if column is None:
+            for out_lines, chunk_errors in convert_lines(fin, target_format, chunk_size):
+                fout.writelines(out_lines)
+                rows += len(out_lines)
+                errors += chunk_errors
+        else:
+            reader = csv.reader(fin, delimiter=delimiter)
+            writer = csv.writer(fout, delimiter=delimiter, lineterminator="\n")
+            chunks = convert_csv_rows(reader, column, target_format, chunk_size, header)
+            for out_rows, chunk_errors in chunks:
+                writer.writerows(out_rows)
+                rows += len(out_rows)
+                errors += chunk_errors
+            if header and rows:
+                rows -= 1
+        fout.flush()
+    return ConvertStats(rows, errors, time.perf_counter() - start)
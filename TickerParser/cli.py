@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+Command line entry point, run as: python -m TickerParser <command> ...
+
+    python -m TickerParser convert positions.txt --to Bloomberg -o positions_bbg.txt
+    python -m TickerParser convert positions.csv --column Symbol --to OCC -o positions_occ.csv
+    python -m TickerParser convert positions.csv --column Symbol --parquet -o positions.parquet
+    python -m TickerParser delta positions.csv --column Symbol --to OCC -o positions_occ.csv
+    python -m TickerParser follow blotter.csv --column Symbol --to OCC -o blotter_occ.csv
+    python -m TickerParser populate symbols.sqlite universe.txt
+    python -m TickerParser serve --port 7071
+"""
+
+import argparse
+import importlib
+import logging
+import sys
+
+try:
+    from . import bulk, delta, follow, parallel, server, symbol_store
+except ImportError:  # imported as a top level module, like the tests do
+    import bulk
+    import delta
+    import follow
+    import parallel
+    import server
+    import symbol_store
+
+
+def _add_csv_options(parser):
+    parser.add_argument(
+        "--column",
+        help="treat the input as CSV and convert this column (header name or 0-based index)",
+    )
+    parser.add_argument("--delimiter", default=",", help="CSV delimiter (default ,)")
+    parser.add_argument(
+        "--no-header", dest="header", action="store_false", help="the CSV input has no header row"
+    )
+
+
+def _add_convert_parser(subparsers):
+    parser = subparsers.add_parser(
+        "convert",
+        help="convert a file of tickers, one per line or one column of a CSV file",
+        description=bulk.convert_file.__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("input", help='input file, "-" for stdin')
+    parser.add_argument("-o", "--output", default="-", help='output file, "-" for stdout (default)')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--to", dest="target_format", choices=bulk.TARGET_FORMATS)
+    target.add_argument(
+        "--parse",
+        action="store_true",
+        help="write every parsed field as JSON instead of converting",
+    )
+    for flag, description in [
+        ("--parquet", "write every parsed field and rendering to a Parquet file"),
+        ("--arrow", "same as --parquet, as an Arrow IPC file"),
+        ("--arrow-stream", "same as --parquet, as an Arrow IPC stream"),
+    ]:
+        target.add_argument(
+            flag, dest="columnar", action="store_const", const=flag.lstrip("-"), help=description
+        )
+    _add_csv_options(parser)
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=bulk.DEFAULT_CHUNK_SIZE,
+        help=f"rows converted at a time (default {bulk.DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="worker processes, 0 for one per CPU (default 1, no worker processes)",
+    )
+    parser.add_argument(
+        "--chunk-bytes",
+        type=int,
+        default=parallel.DEFAULT_CHUNK_BYTES,
+        help=f"bytes of input per worker task (default {parallel.DEFAULT_CHUNK_BYTES})",
+    )
+    parser.add_argument(
+        "--shared-cache",
+        metavar="NAME",
+        help="share parsed tickers between the worker processes through this shared memory cache",
+    )
+    parser.set_defaults(run=_run_convert)
+
+
+def _run_columnar(args) -> bulk.ConvertStats:
+    if args.workers != 1:
+        raise SystemExit(f"--workers is not supported with --{args.columnar}")
+    try:
+        # only imported when asked for, pyarrow is not needed by anything else
+        arrow_output = importlib.import_module(
+            f"{__package__}.arrow_output" if __package__ else "arrow_output"
+        )
+    except ImportError as e:
+        raise SystemExit(f"--{args.columnar} needs pyarrow ({e})")
+
+    with bulk.open_text(args.input, "r") as fin:
+        tickers = bulk.read_tickers(fin, args.column, args.delimiter, args.header)
+        if args.columnar == "parquet":
+            return arrow_output.write_parquet(tickers, args.output, args.chunk_size)
+        return arrow_output.write_ipc(
+            tickers, args.output, args.chunk_size, stream=args.columnar == "arrow-stream"
+        )
+
+
+def _run_convert(args):
+    options = dict(column=args.column, delimiter=args.delimiter, header=args.header)
+    if args.columnar:
+        stats = _run_columnar(args)
+    elif args.workers == 1:
+        stats = bulk.convert_file(
+            args.input, args.output, args.target_format, chunk_size=args.chunk_size, **options
+        )
+    else:
+        if args.input == "-":
+            raise SystemExit("--workers needs an input file, not stdin")
+        stats = parallel.convert_file_parallel(
+            args.input,
+            args.output,
+            args.target_format,
+            workers=args.workers or None,
+            chunk_bytes=args.chunk_bytes,
+            shared_cache=args.shared_cache,
+            **options,
+        )
+    print(f"Converted {stats}", file=sys.stderr)
+
+
+def _add_delta_parser(subparsers):
+    parser = subparsers.add_parser(
+        "delta",
+        help="convert a new snapshot of a file, only parsing the lines that changed since the last one",
+        description=delta.__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("input", help="input file")
+    parser.add_argument("-o", "--output", required=True, help="output file")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--to", dest="target_format", choices=bulk.TARGET_FORMATS)
+    target.add_argument(
+        "--parse",
+        action="store_true",
+        help="write every parsed field as JSON instead of converting",
+    )
+    _add_csv_options(parser)
+    parser.add_argument(
+        "--store", help=f"SQLite file of the previous snapshot (default OUTPUT{delta.STORE_SUFFIX})"
+    )
+    parser.set_defaults(run=_run_delta)
+
+
+def _run_delta(args):
+    stats = delta.convert_delta(
+        args.input,
+        args.output,
+        args.target_format,
+        column=args.column,
+        delimiter=args.delimiter,
+        header=args.header,
+        store=args.store,
+    )
+    print(f"Converted {stats}", file=sys.stderr)
+
+
+def _add_follow_parser(subparsers):
+    parser = subparsers.add_parser(
+        "follow",
+        help="keep converting the lines appended to a growing file, like a trade blotter",
+        description=follow.__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("input", help="file to follow")
+    parser.add_argument(
+        "-o", "--output", default="-", help='output file, appended to, "-" for stdout (default)'
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--to", dest="target_format", choices=bulk.TARGET_FORMATS)
+    target.add_argument(
+        "--parse",
+        action="store_true",
+        help="write every parsed field as JSON instead of converting",
+    )
+    _add_csv_options(parser)
+    parser.add_argument(
+        "--checkpoint", help="file to save the position in, to carry on from there after a restart"
+    )
+    parser.add_argument(
+        "--poll-ms",
+        type=float,
+        default=follow.DEFAULT_POLL_INTERVAL * 1000,
+        help=f"wait between looks at the file when it has not grown (default "
+        f"{follow.DEFAULT_POLL_INTERVAL * 1000:g})",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        help="stop once nothing was appended for this many seconds (default never)",
+    )
+    parser.set_defaults(run=_run_follow)
+
+
+def _run_follow(args):
+    logging.basicConfig(level=logging.INFO)
+    try:
+        stats = follow.follow(
+            args.input,
+            args.output,
+            args.target_format,
+            column=args.column,
+            delimiter=args.delimiter,
+            header=args.header,
+            checkpoint=args.checkpoint,
+            poll_interval=args.poll_ms / 1000,
+            idle_timeout=args.idle_timeout,
+        )
+    except KeyboardInterrupt:
+        return  # the checkpoint is saved after every batch
+    print(f"Converted {stats}", file=sys.stderr)
+
+
+def _add_populate_parser(subparsers):
+    parser = subparsers.add_parser(
+        "populate",
+        help="parse a symbol universe into a persistent symbol store",
+        description=symbol_store.__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("database", help="SQLite file of the symbol store, created if missing")
+    parser.add_argument("universe", help="file with one ticker per line")
+    parser.set_defaults(run=_run_populate)
+
+
+def _run_populate(args):
+    store = symbol_store.SymbolStore(args.database)
+    try:
+        stored = store.populate_from_file(args.universe)
+    finally:
+        store.close()
+    print(f"Stored {stored} tickers in {args.database}", file=sys.stderr)
+
+
+def _add_serve_parser(subparsers):
+    parser = subparsers.add_parser(
+        "serve",
+        help="run a standalone HTTP server with the same API as the function",
+        description=server.__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7071)
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=server.DEFAULT_MAX_BATCH,
+        help=f"most single ticker requests parsed together (default {server.DEFAULT_MAX_BATCH})",
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=server.DEFAULT_MAX_WAIT * 1000,
+        help=f"longest a request waits for its batch to fill (default {server.DEFAULT_MAX_WAIT * 1000:g})",
+    )
+    parser.set_defaults(run=_run_serve)
+
+
+def _run_serve(args):
+    logging.basicConfig(level=logging.INFO)
+    server.serve(args.host, args.port, args.max_batch, args.max_wait_ms / 1000)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m TickerParser")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _add_convert_parser(subparsers)
+    _add_delta_parser(subparsers)
+    _add_follow_parser(subparsers)
+    _add_populate_parser(subparsers)
+    _add_serve_parser(subparsers)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental conversion of successive snapshots of a file, like an hourly position file where most lines
+are the same as in the previous snapshot:
+
+    python -m TickerParser delta positions.csv --column Symbol --to Bloomberg -o positions_bbg.csv
+
+Next to the output, an SQLite file (the output path plus .delta.sqlite by default) keeps the output line
+of every line of the previous snapshot, keyed by a hash of the input line. A new snapshot only parses and
+renders the lines that are not in there, i.e. the ones that are new or changed, takes every other output
+line from the store, and writes the whole output in input order. Lines that are no longer in the snapshot
+are dropped from the store afterwards, so it stays the size of one snapshot. The store is read into memory
+for the run, only what changed is written back.
+
+The store records the conversion options, the format rules and the index and cash reference data, and
+starts over when any of them changes.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+from typing import NamedTuple
+
+try:
+    from . import bulk, symbol_store
+except ImportError:  # imported as a top level module, like the tests do
+    import bulk
+    import symbol_store
+
+STORE_SUFFIX = ".delta.sqlite"
+
+
+class DeltaStats(NamedTuple):
+    rows: int
+    errors: int
+    converted: int  # rows that were not in the previous snapshot
+    pruned: int  # stored lines that are no longer in the snapshot
+    seconds: float
+
+    def __str__(self):
+        return (
+            f"{self.rows} rows ({self.errors} errors, {self.converted} new or changed, "
+            f"{self.pruned} removed) in {self.seconds:.2f}s"
+        )
+
+
+def _line_hash(line: str) -> bytes:
+    return hashlib.blake2b(line.encode("utf-8"), digest_size=16).digest()
+
+
+def _version(target_format, index, delimiter) -> str:
+    """hash of everything that decides the output line of an input line"""
+    options = {
+        "target_format": target_format,
+        "column": index,
+        "delimiter": delimiter,
+        "rules": symbol_store.rules_version(),
+        "reference_data": symbol_store._reference_data(),
+    }
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()
+
+
+class DeltaStore:
+    """
+    Output line and error flag of each input line of the last snapshot, by hash of the input line, in an
+    SQLite file. They are all read at once, and only the differences are written back.
+    """
+
+    def __init__(self, path, version: str):
+        self.path = str(path)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS lines (hash BLOB PRIMARY KEY, output TEXT, error INTEGER)"
+        )
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        if meta.get("version") != version:
+            self._conn.execute("DELETE FROM lines")
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+
+    def load(self) -> dict:
+        """{hash: (output line, error flag)} of every stored line"""
+        rows = self._conn.execute("SELECT hash, output, error FROM lines")
+        return {h: (output, bool(error)) for h, output, error in rows}
+
+    def update(self, new: dict, stale) -> int:
+        """add {hash: (output line, error flag)} and drop the stale hashes, returns how many were dropped"""
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO lines VALUES (?, ?, ?)",
+            [(h, output, int(error)) for h, (output, error) in new.items()],
+        )
+        return self._conn.executemany(
+            "DELETE FROM lines WHERE hash = ?", [(h,) for h in stale]
+        ).rowcount
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM lines").fetchone()[0]
+
+    def commit(self):
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+def _csv_lines(rows, delimiter) -> list:
+    """each CSV row as a line of text"""
+    out = io.StringIO()
+    writer = csv.writer(out, delimiter=delimiter, lineterminator="\n")
+    lines = []
+    for row in rows:
+        writer.writerow(row)
+        lines.append(out.getvalue())
+        out.seek(0)
+        out.truncate()
+    return lines
+
+
+def convert_delta(
+    src,
+    dst,
+    target_format=None,
+    *,
+    column=None,
+    delimiter=",",
+    header=True,
+    store=None,
+    chunk_size=bulk.DEFAULT_CHUNK_SIZE,
+) -> DeltaStats:
+    """
+    Convert the file at path src into dst, like bulk.convert_file with the same options, only converting
+    the lines that were not in the snapshot converted last time, see the module docstring. store is the
+    path of the SQLite file to keep the lines in, dst plus STORE_SUFFIX by default. dst is replaced once
+    it is complete. CSV fields must not contain quoted line breaks.
+    """
+    start_time = time.perf_counter()
+    rows = errors = converted = 0
+    tmp_path = f"{dst}.tmp"
+    with open(src, encoding="utf-8", newline="") as fin:
+        index = header_row = None
+        if column is not None:
+            header_row = next(csv.reader([fin.readline()], delimiter=delimiter)) if header else []
+            index = bulk.column_index(header_row, column)
+        store = DeltaStore(
+            store or f"{dst}{STORE_SUFFIX}", _version(target_format, index, delimiter)
+        )
+        try:
+            with bulk.open_text(tmp_path, "w") as fout:
+                if header_row:
+                    new_column = f"ticker_{target_format.lower()}" if target_format else "parsed"
+                    fout.writelines(_csv_lines([header_row + [new_column]], delimiter))
+
+                known = store.load()
+                seen, new = set(), {}
+                for chunk in bulk.chunked(fin, chunk_size):
+                    hashes = [_line_hash(line) for line in chunk]
+                    seen.update(hashes)
+                    # each new line once, even if it is in the snapshot more than once
+                    missing = {h: line for h, line in zip(hashes, chunk) if h not in known}
+                    if missing:
+                        converted_lines = _convert(missing, target_format, index, delimiter)
+                        known.update(converted_lines)
+                        new.update(converted_lines)
+                        converted += sum(h in missing for h in hashes)
+                    fout.writelines(known[h][0] for h in hashes)
+                    rows += len(hashes)
+                    errors += sum(known[h][1] for h in hashes)
+
+            pruned = store.update(new, known.keys() - seen)
+            os.replace(tmp_path, dst)
+            store.commit()
+        finally:
+            store.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return DeltaStats(rows, errors, converted, pruned, time.perf_counter() - start_time)
+
+
+def _convert(lines: dict, target_format, index, delimiter) -> dict:
+    """{hash: (output line, error flag)} for {hash: input line}"""
+    if index is None:
+        tickers = [line.rstrip("\r\n") for line in lines.values()]
+        fields, failed = bulk.convert_fields(tickers, target_format)
+        outputs = [field + "\n" for field in fields]
+    else:
+        csv_rows = list(csv.reader(lines.values(), delimiter=delimiter))
+        tickers = [row[index] if index < len(row) else "" for row in csv_rows]
+        fields, failed = bulk.convert_fields(tickers, target_format)
+        outputs = _csv_lines((row + [field] for row, field in zip(csv_rows, fields)), delimiter)
+    return dict(zip(lines, zip(outputs, failed)))
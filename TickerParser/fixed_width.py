@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Parsing of tickers straight out of binary buffers (bytes, bytearray, memoryview, mmap, ...), like the
+ticker field of fixed-width records in a feed file:
+
+    with open("feed.dat", "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as feed:
+        for security in parse_records(feed, record_length=80, offset=12, length=21):
+            ...
+
+The format regexes are compiled for bytes and matched against the buffer in place, between the field's
+offsets, so neither the record nor the ticker is decoded or copied. Only the regex groups a format's
+to_Security actually uses are decoded into str, and the whole ticker only for tickers that do not parse
+(for their TickerError).
+
+Tickers must be ASCII, like every format in ticker_parser. Fields are stripped of the spaces they are
+padded with, and of the line break ending the record, by default. Results do not go through the parse
+cache, which is keyed by str.
+"""
+
+import re
+import time
+
+try:
+    from . import ticker_parser as tp
+except ImportError:  # imported as a top level module, like the tests do
+    import ticker_parser as tp
+
+_EQUITY_SUFFIX = re.compile(rb"\sEquity")
+_INDEX_SUFFIX = re.compile(rb"\sIndex")
+_SLASH = re.compile(rb"/")
+_LEADING_SPACES = re.compile(rb" *")
+_TRAILING_PADDING = re.compile(rb"[ \r\n]*\Z")  # spaces, and the line break ending a record
+
+
+def _compile_bytes(fmt) -> re.Pattern:
+    # match(buf, pos, endpos) is anchored at pos already, while ^ would only match at the start of buf
+    source = fmt.regex_string.lstrip()
+    if source.startswith("^"):
+        source = source[1:]
+    return re.compile(source.encode("ascii"), re.VERBOSE)
+
+
+# same dispatch as ticker_parser, with the regexes compiled for bytes
+_DISPATCH_TABLE = tp._build_dispatch_table(tp.FORMATS_TO_SEARCH, _compile_bytes)
+
+
+class _DecodingMatch:
+    """bytes regex match that decodes the groups to_Security asks for, and only those"""
+
+    __slots__ = ("_match",)
+
+    def __init__(self, match):
+        self._match = match
+
+    def groupdict(self):
+        return self
+
+    def __getitem__(self, name):
+        value = self._match.group(name)
+        return None if value is None else value.decode("ascii")
+
+
+class _Field:
+    """a ticker in a buffer, only decoded if it is logged"""
+
+    __slots__ = ("buf", "start", "end")
+
+    def __init__(self, buf, start, end):
+        self.buf, self.start, self.end = buf, start, end
+
+    def __str__(self):
+        return bytes(self.buf[self.start : self.end]).decode("utf-8", "replace")
+
+    def __repr__(self):
+        return repr(str(self))
+
+
+def _shape(buf, start: int, end: int) -> tp.TickerShape:
+    """ticker_parser._ticker_shape of the ticker in buf[start:end]"""
+    if end > start and buf[end - 1] == 0x0A:
+        end -= 1  # like _ticker_shape, measured without a trailing newline
+    n = end - start
+    if 1 <= n <= 10:
+        length = "short"
+    elif n == 21:
+        length = "occ"
+    else:
+        length = "other"
+
+    if n >= 7 and _EQUITY_SUFFIX.match(buf, end - 7, end):
+        suffix = "Equity"
+    elif n >= 6 and _INDEX_SUFFIX.match(buf, end - 6, end):
+        suffix = "Index"
+    else:
+        suffix = None
+
+    return tp.TickerShape(length, suffix, _SLASH.search(buf, start, end) is not None)
+
+
+def parse_field(buf, start=0, end=None, *, strip=True):
+    """
+    Security for the ticker in buf[start:end] (the whole buffer by default), or a TickerError saying why it
+    could not be parsed, like ticker_parser's parsing of the decoded ticker. With strip, spaces around the
+    ticker and a line break after it are ignored.
+    """
+    if end is None:
+        end = len(buf)
+    if strip:
+        start = _LEADING_SPACES.match(buf, start, end).end()
+        end = _TRAILING_PADDING.search(buf, start, end).start()
+
+    started = time.perf_counter_ns()
+    matching_formats = []
+    for fmt, pattern in _DISPATCH_TABLE[_shape(buf, start, end)]:
+        match = pattern.match(buf, start, end)
+        if match:
+            matching_formats.append((fmt, match))
+    if len(matching_formats) == 1:
+        fmt, match = matching_formats[0]
+        parsed = fmt.to_Security(_DecodingMatch(match))
+        outcome = fmt.__name__
+    else:
+        outcome = tp.PARSE_ERROR.Ambiguous if matching_formats else tp.PARSE_ERROR.NoMatch
+        parsed = tp.TickerError(str(_Field(buf, start, end)), outcome)
+    metrics = tp.METRICS
+    metrics.record_parse(_Field(buf, start, end), outcome, time.perf_counter_ns() - started)
+    metrics.record_outcome(outcome)
+    return parsed
+
+
+def parse_records(buf, record_length: int, offset=0, length=None, *, strip=True):
+    """
+    Security or TickerError (see parse_field) for the ticker field of every fixed-width record in buf, in
+    order. Records are record_length bytes each (including any line break), and the ticker field is the
+    length bytes at offset in each record (the rest of the record by default). A partial record at the end
+    of buf is ignored.
+    """
+    if length is None:
+        length = record_length - offset
+    if offset < 0 or length < 0 or offset + length > record_length:
+        raise ValueError(
+            f"Field at offset {offset} of length {length} does not fit a {record_length} byte record"
+        )
+    for record in range(0, len(buf) - record_length + 1, record_length):
+        yield parse_field(buf, record + offset, record + offset + length, strip=strip)
+
+
+def convert_records(
+    buf, record_length: int, target_format: str, offset=0, length=None, *, strip=True
+):
+    """
+    The ticker field of every fixed-width record in buf (see parse_records) converted to target_format
+    (one of FORMAT_TYPES), None for the ones that could not be parsed
+    """
+    rebuild = tp.FORMATS_FOR_REBUILD
+    return [
+        (
+            None
+            if isinstance(parsed, tp.TickerError)
+            else rebuild[parsed.asset_class][target_format].to_ticker_string(parsed)
+        )
+        for parsed in parse_records(buf, record_length, offset, length, strip=strip)
+    ]
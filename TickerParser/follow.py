@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Follow a growing file, like a trade blotter that is appended to all day, converting each line as soon as
+it is written:
+
+    python -m TickerParser follow blotter.csv --column Symbol --to Bloomberg -o blotter_bbg.csv \\
+        --checkpoint blotter.checkpoint
+
+Lines are converted in the batches they arrive in, through ticker_parser.parse_tickers/convert_tickers,
+and the output is flushed after every batch. A line is only read once it is complete, i.e. ends with a
+line break.
+
+With a checkpoint file, the byte offset of the end of the last converted line is saved after every batch,
+so a restart carries on from there (lines converted just before a crash may be converted again, none are
+skipped). The file is checked for rotation whenever the reader catches up with it: if the path now names
+another file (logrotate's default create mode), the rest of the old file is converted and then the new
+file is followed from its start. If the file got shorter (copytruncate mode), it is followed from its start
+again.
+"""
+
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+try:
+    from . import bulk
+except ImportError:  # imported as a top level module, like the tests do
+    import bulk
+
+DEFAULT_POLL_INTERVAL = 0.01  # seconds between looks at a file that has not grown
+READ_SIZE = 1 << 20  # most bytes read and converted at a time
+
+
+class Checkpoint:
+    """the followed file (inode) and offset reached in it, saved as JSON by replacing the file atomically"""
+
+    def __init__(self, path):
+        self.path = str(path)
+
+    def load(self) -> Optional[tuple]:
+        """(inode, offset) saved last, or None if nothing was saved yet"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return None
+        return saved["inode"], saved["offset"]
+
+    def save(self, inode: int, offset: int):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"inode": inode, "offset": offset}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class TailReader:
+    """
+    Complete lines appended to the file at path, read from offset on. Follows rotation and truncation of
+    the file, see the module docstring.
+    """
+
+    def __init__(self, path, offset=0):
+        self.path = str(path)
+        self._file = open(self.path, "rb")
+        self.inode = os.fstat(self._file.fileno()).st_ino
+        self._file.seek(offset)
+        self.offset = offset  # end of the last complete line read
+        self._partial = b""
+        self._rotated = False
+
+    def read(self) -> tuple:
+        """
+        (offset, lines): the complete lines appended since the last call, without their line breaks, at
+        most about READ_SIZE bytes of them. They all come from one file, starting at byte offset of it.
+        lines is empty if nothing new was written.
+        """
+        data = self._file.read(READ_SIZE)
+        if not data:
+            if not self._rotated:
+                self._check_file()
+                data = self._file.read(READ_SIZE)
+            if not data and self._rotated:
+                if not self._partial:
+                    return self._open_new_file()
+                # the writer moved on to the new file, so the last line of the old one will not be finished
+                data = b"\n"
+
+        start = self.offset
+        data = self._partial + data
+        end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+        self.offset += end
+        return start, data[:end].decode("utf-8").split("\n")[:-1]
+
+    def _check_file(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return  # between the rename and the creation of the new file
+        if st.st_ino != self.inode:
+            logging.info(f"{self.path} was rotated, finishing the old file")
+            self._rotated = True
+        elif st.st_size < self.offset + len(self._partial):
+            logging.info(f"{self.path} was truncated, following it from the start")
+            self._file.seek(0)
+            self.offset = 0
+            self._partial = b""
+
+    def _open_new_file(self) -> tuple:
+        self._file.close()
+        self._file = open(self.path, "rb")
+        self.inode = os.fstat(self._file.fileno()).st_ino
+        self.offset = 0
+        self._partial = b""
+        self._rotated = False
+        return 0, []
+
+    def close(self):
+        self._file.close()
+
+
+def _first_line(path) -> str:
+    with open(path, encoding="utf-8", newline="") as f:
+        return f.readline()
+
+
+def follow(
+    src,
+    dst,
+    target_format=None,
+    *,
+    column=None,
+    delimiter=",",
+    header=True,
+    checkpoint=None,
+    poll_interval=DEFAULT_POLL_INTERVAL,
+    idle_timeout=None,
+    stop: Optional[threading.Event] = None,
+) -> bulk.ConvertStats:
+    """
+    Follow the file at path src, converting every line appended to it into dst ("-" for stdout, a file is
+    appended to), with the same options and output as bulk.convert_file. CSV fields must not contain quoted
+    line breaks.
+
+    checkpoint is the path of a checkpoint file, see the module docstring. Without one, src is converted
+    from its start. Runs until stop is set, or until nothing was appended for idle_timeout seconds.
+    """
+    start_time = time.perf_counter()
+    rows = errors = 0
+    checkpoint = Checkpoint(checkpoint) if checkpoint else None
+    offset = 0
+    saved = checkpoint.load() if checkpoint else None
+    if saved is not None:
+        st = os.stat(src)
+        if saved[0] == st.st_ino and saved[1] <= st.st_size:
+            offset = saved[1]
+        else:
+            logging.warning(f"{src} was rotated or truncated since the checkpoint, starting over")
+
+    reader = TailReader(src, offset)
+    index = None
+    if column is not None and offset > 0:
+        header_row = next(csv.reader([_first_line(src)], delimiter=delimiter)) if header else []
+        index = bulk.column_index(header_row, column)
+    idle_since = time.monotonic()
+    # the header row is written once, not again for a rotated or truncated src that starts over
+    header_written = dst != "-" and os.path.exists(dst) and os.path.getsize(dst) > 0
+
+    with bulk.open_text(dst, "a") as fout:
+        writer = csv.writer(fout, delimiter=delimiter, lineterminator="\n")
+        try:
+            while stop is None or not stop.is_set():
+                start, lines = reader.read()
+                if not lines:
+                    if idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                idle_since = time.monotonic()
+
+                if column is None:
+                    tickers = [line.rstrip("\r") for line in lines]
+                    fields, chunk_errors = bulk.convert_chunk(tickers, target_format)
+                    fout.writelines(f + "\n" for f in fields)
+                else:
+                    csv_rows = list(csv.reader(lines, delimiter=delimiter))
+                    if start == 0:
+                        # a file followed from its start, its first line is the header if it has one
+                        header_row = csv_rows.pop(0) if header else []
+                        index = bulk.column_index(header_row, column)
+                        if header_row and not header_written:
+                            new_column = (
+                                f"ticker_{target_format.lower()}" if target_format else "parsed"
+                            )
+                            writer.writerow(header_row + [new_column])
+                            header_written = True
+                    tickers = [row[index] if index < len(row) else "" for row in csv_rows]
+                    fields, chunk_errors = bulk.convert_chunk(tickers, target_format)
+                    writer.writerows(row + [field] for row, field in zip(csv_rows, fields))
+                fout.flush()
+                rows += len(tickers)
+                errors += chunk_errors
+                if checkpoint:
+                    checkpoint.save(reader.inode, reader.offset)
+        finally:
+            reader.close()
+    return bulk.ConvertStats(rows, errors, time.perf_counter() - start_time)
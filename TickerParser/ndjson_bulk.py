@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk mode of the HTTP function: newline delimited JSON in, newline delimited JSON out.
+
+Each input line is either a JSON string ("AAPL") or an object with a ticker key ({"ticker": "AAPL"}), and
+the body may be gzip compressed. Each output line is the parse_ticker dict for the matching input line.
+Tickers are parsed and serialized a chunk at a time, so no list of result dicts is built for the request,
+and the response body is handed out a block at a time.
+"""
+
+import io
+import json
+import zlib
+from typing import Iterator
+
+try:
+    from . import bulk
+    from . import ticker_parser as tp
+except ImportError:  # imported as a top level module, like the tests do
+    import bulk
+    import ticker_parser as tp
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:
+    _encoder = json.JSONEncoder(separators=(",", ":"))
+
+    def _dumps(obj) -> bytes:
+        return _encoder.encode(obj).encode()
+
+
+CONTENT_TYPE = "application/x-ndjson"
+DEFAULT_MAX_ROWS = 250_000
+DEFAULT_MAX_BYTES = 32 << 20  # after decompression
+DEFAULT_CHUNK_SIZE = 5_000
+
+
+class BulkRequestError(ValueError):
+    """the request body can not be processed, status_code says which HTTP status to answer with"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def decode_body(body: bytes, gzipped=False, max_bytes=DEFAULT_MAX_BYTES) -> bytes:
+    """the request body, decompressed if needed, refusing anything over max_bytes once decompressed"""
+    if gzipped:
+        body = _gunzip(body, max_bytes + 1)
+    if len(body) > max_bytes:
+        raise BulkRequestError(f"Request body is larger than {max_bytes} bytes", status_code=413)
+    return body
+
+
+def _gunzip(body: bytes, max_length: int) -> bytes:
+    """
+    every member of a gzip body, stopping once max_length bytes are decompressed. Raises BulkRequestError
+    if the body is not gzip or is cut short.
+    """
+    parts = []
+    try:
+        while True:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            part = decompressor.decompress(body, max_length)
+            parts.append(part)
+            max_length -= len(part)
+            if not max_length:
+                break  # too large, whatever is left
+            if not decompressor.eof:
+                raise BulkRequestError("Invalid gzip body: truncated")
+            body = decompressor.unused_data
+            if not body:
+                break
+    except zlib.error as e:
+        raise BulkRequestError(f"Invalid gzip body: {e}") from None
+    return b"".join(parts)
+
+
+def iter_tickers(data: bytes, max_rows=DEFAULT_MAX_ROWS):
+    """tickers from NDJSON lines, blank lines are skipped"""
+    rows = 0
+    for line_number, line in enumerate(io.BytesIO(data), start=1):
+        if not line.strip():
+            continue
+        rows += 1
+        if rows > max_rows:
+            raise BulkRequestError(f"Request has more than {max_rows} rows", status_code=413)
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise BulkRequestError(f"Line {line_number} is not valid JSON") from None
+        ticker = row.get("ticker") if isinstance(row, dict) else row
+        if not isinstance(ticker, str):
+            raise BulkRequestError(f"Line {line_number} has no ticker string")
+        yield ticker
+
+
+def encode_results(tickers, formats=tp.RENDER_FORMATS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """NDJSON bytes for the parse results of tickers, one block per chunk of tickers"""
+    for chunk in bulk.chunked(tickers, chunk_size):
+        lines = [
+            _dumps(r.to_dict() if isinstance(r, tp.TickerError) else r)
+            for r in tp.parse_tickers(chunk, formats)
+        ]
+        lines.append(b"")
+        yield b"\n".join(lines)
+
+
+def convert_body(
+    body: bytes,
+    *,
+    formats=tp.RENDER_FORMATS,
+    gzipped=False,
+    gzip_output=False,
+    max_rows=DEFAULT_MAX_ROWS,
+    max_bytes=DEFAULT_MAX_BYTES,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    The response body for an NDJSON request body, as an iterator of blocks that parses one chunk of tickers
+    per block, so the whole output never has to be held at once. Raises BulkRequestError for bodies that
+    are too large or not valid NDJSON when called, before anything is parsed.
+    """
+    if len(body) > max_bytes:
+        raise BulkRequestError(f"Request body is larger than {max_bytes} bytes", status_code=413)
+    tickers = list(iter_tickers(decode_body(body, gzipped, max_bytes), max_rows))
+    blocks = encode_results(tickers, formats, chunk_size)
+    return _gzip_blocks(blocks) if gzip_output else blocks
+
+
+def _gzip_blocks(blocks) -> Iterator[bytes]:
+    """blocks compressed as one gzip stream"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for block in blocks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
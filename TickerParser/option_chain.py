@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+In-memory index of parsed option contracts for chain queries, like all AAPL puts expiring this month with
+strikes between 150 and 200:
+
+    chain = OptionChainIndex()
+    chain.add_tickers(book)
+    chain.query("AAPL", expiry_from=date(2018, 2, 1), expiry_to=date(2018, 2, 28), call_put="P",
+                strike_min=150, strike_max=200, target_format="Bloomberg")
+
+Contracts are kept per root, in a sorted list of expiry dates, and per expiry and call/put in a sorted list
+of strikes next to the matching contracts. A query bisects the expiry list for the expiry range, then each
+strike list for the strike range, so it only ever touches the contracts it returns.
+"""
+
+import bisect
+import datetime
+from typing import Optional
+
+try:
+    from . import ticker_parser as tp
+except ImportError:  # imported as a top level module, like the tests do
+    import ticker_parser as tp
+
+CALL_PUT = ("C", "P")
+
+
+class _Strikes:
+    """contracts of one root, expiry and call/put, sorted by strike"""
+
+    __slots__ = ("strikes", "contracts")
+
+    def __init__(self):
+        self.strikes = []
+        self.contracts = []
+
+    def add(self, strike: float, contract) -> bool:
+        """add or replace the contract at strike, returns True if it is new"""
+        i = bisect.bisect_left(self.strikes, strike)
+        if i < len(self.strikes) and self.strikes[i] == strike:
+            self.contracts[i] = contract
+            return False
+        self.strikes.insert(i, strike)
+        self.contracts.insert(i, contract)
+        return True
+
+    def between(self, strike_min=None, strike_max=None) -> list:
+        lo = 0 if strike_min is None else bisect.bisect_left(self.strikes, strike_min)
+        hi = (
+            len(self.strikes)
+            if strike_max is None
+            else bisect.bisect_right(self.strikes, strike_max)
+        )
+        return self.contracts[lo:hi]
+
+
+class _Root:
+    """contracts of one root, by expiry then call/put"""
+
+    __slots__ = ("expiries", "chains")
+
+    def __init__(self):
+        self.expiries = []  # sorted
+        self.chains = {}  # {expiry: {call_put: _Strikes}}
+
+    def chain(self, expiry: datetime.date, call_put: str) -> _Strikes:
+        by_call_put = self.chains.get(expiry)
+        if by_call_put is None:
+            bisect.insort(self.expiries, expiry)
+            by_call_put = self.chains[expiry] = {}
+        strikes = by_call_put.get(call_put)
+        if strikes is None:
+            strikes = by_call_put[call_put] = _Strikes()
+        return strikes
+
+    def between(self, expiry_from=None, expiry_to=None) -> list:
+        lo = 0 if expiry_from is None else bisect.bisect_left(self.expiries, expiry_from)
+        hi = (
+            len(self.expiries)
+            if expiry_to is None
+            else bisect.bisect_right(self.expiries, expiry_to)
+        )
+        return self.expiries[lo:hi]
+
+
+class OptionChainIndex:
+    """
+    Option contracts, i.e. ParsedTicker results of option tickers, indexed by root, expiry, call/put and
+    strike. The same contract written in different formats is only indexed once, the last one added wins.
+    """
+
+    def __init__(self):
+        self._roots = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, parsed) -> bool:
+        """
+        Index one parsed option, a ParsedTicker or a Security. Returns False, without indexing anything, for
+        results that are not options (equities, TickerErrors, ...) or whose expiry is not a valid date.
+        """
+        security = parsed if isinstance(parsed, tp.Security) else getattr(parsed, "security", None)
+        if security is None or security.asset_class != tp.ASSET_CLASS.Option:
+            return False
+        if isinstance(parsed, tp.Security):
+            # a bare Security has no original ticker, use its OCC symbol
+            parsed = tp.ParsedTicker("", security)
+            parsed.ticker_original = parsed.render(tp.FORMAT_TYPES.OCC)
+        expiry = tp._expiry_date(parsed)
+        if expiry is None:
+            return False
+
+        s = parsed.security
+        root = self._roots.get(s.root_symbol.upper())
+        if root is None:
+            root = self._roots[s.root_symbol.upper()] = _Root()
+        if root.chain(expiry, s.call_put.upper()).add(s.strike_price, parsed):
+            self._size += 1
+        return True
+
+    def add_tickers(self, tickers) -> int:
+        """parse (through the parse cache) and index tickers, returns how many were indexed"""
+        return sum(self.add(result) for result in tp._lookup_many(tickers).values())
+
+    def roots(self) -> list:
+        return sorted(self._roots)
+
+    def expiries(self, root: str) -> list:
+        """expiry dates with at least one contract for root, in order"""
+        root = self._roots.get(root.upper())
+        return [] if root is None else list(root.expiries)
+
+    def query(
+        self,
+        root: str,
+        *,
+        expiry_from: Optional[datetime.date] = None,
+        expiry_to: Optional[datetime.date] = None,
+        call_put: Optional[str] = None,
+        strike_min: Optional[float] = None,
+        strike_max: Optional[float] = None,
+        target_format: Optional[str] = None,
+    ) -> list:
+        """
+        Contracts of root with an expiry and strike in the given ranges (both ends included, None for no
+        bound) and of the given call_put ("C" or "P", None for both). Ordered by expiry, then calls before
+        puts, then strike. Returns ParsedTicker objects, or ticker strings when target_format (one of
+        FORMAT_TYPES) is given.
+        """
+        indexed = self._roots.get(root.upper())
+        if indexed is None:
+            return []
+        if call_put is None:
+            sides = CALL_PUT
+        elif call_put.upper() in CALL_PUT:
+            sides = (call_put.upper(),)
+        else:
+            raise ValueError(f"call_put must be one of {CALL_PUT} or None, got {call_put!r}")
+
+        contracts = []
+        for expiry in indexed.between(expiry_from, expiry_to):
+            by_call_put = indexed.chains[expiry]
+            for side in sides:
+                strikes = by_call_put.get(side)
+                if strikes is not None:
+                    contracts += strikes.between(strike_min, strike_max)
+
+        if target_format is None:
+            return contracts
+        fmt = getattr(tp.FORMAT_TYPES, target_format)
+        return [contract.render(fmt) for contract in contracts]
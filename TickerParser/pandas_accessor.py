@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+pandas Series accessor for converting and parsing whole columns of tickers. Importing this module
+registers it as Series.ticker:
+
+    import pandas_accessor  # noqa: F401
+
+    positions["bbg"] = positions["symbol"].ticker.convert("Bloomberg")
+    fields = positions["symbol"].ticker.parse()
+
+The column is factorized first, every distinct ticker is parsed once through the batch path of
+ticker_parser (and its parse cache), and the results are broadcast back to the rows. Books repeat the same
+tickers over and over, so this is much faster than Series.map(convert_ticker).
+
+Requires pandas, which is not needed by the rest of the package.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import ticker_parser as tp
+except ImportError:  # imported as a top level module, like the tests do
+    import ticker_parser as tp
+
+# columns of TickerAccessor.parse and their dtypes
+PARSED_COLUMNS = {
+    "asset_class": "category",
+    "format_type": "category",
+    "root_symbol": "string",
+    "exchange": "string",
+    "bloomberg_suffix": "string",
+    "call_put": "category",
+    "expiry": "datetime64[ns]",
+    "strike_price": "float64",
+    "error_reason": "category",
+}
+
+
+def _parsed_row(result) -> tuple:
+    if isinstance(result, tp.TickerError):
+        return (None,) * (len(PARSED_COLUMNS) - 1) + (result.reason,)
+    s = result.security
+    expiry = tp._expiry_date(result)
+    return (
+        s.asset_class,
+        s.format_type,
+        s.root_symbol,
+        s.exchange,
+        s.bloomberg_suffix or None,
+        s.call_put.upper() if s.call_put else None,
+        pd.NaT if expiry is None else pd.Timestamp(expiry),
+        np.nan if s.strike_price is None else s.strike_price,
+        None,
+    )
+
+
+@pd.api.extensions.register_series_accessor("ticker")
+class TickerAccessor:
+    def __init__(self, series: pd.Series):
+        self._series = series
+
+    def _factorize(self):
+        """(codes, distinct tickers), missing values get code -1 and are left out of the tickers"""
+        codes, uniques = pd.factorize(self._series)
+        return codes, [str(ticker) for ticker in uniques]
+
+    def convert(self, target_format: str, errors="coerce") -> pd.Series:
+        """
+        The tickers converted to target_format (one of FORMAT_TYPES). Tickers that can not be parsed, and
+        missing values, become <NA>, or with errors="raise" raise RegexMatchNotFoundException.
+        """
+        if errors not in ("coerce", "raise"):
+            raise ValueError(f'errors must be "coerce" or "raise", got {errors!r}')
+        codes, tickers = self._factorize()
+        converted = tp.convert_tickers(tickers, target_format)
+        if errors == "raise":
+            bad = next((c for c in converted if isinstance(c, tp.TickerError)), None)
+            if bad is not None:
+                raise tp.RegexMatchNotFoundException(
+                    f"No regex matches found for: {bad.ticker_original}"
+                )
+
+        # one extra slot at the end, which is where code -1 (missing values) points
+        values = np.empty(len(converted) + 1, dtype=object)
+        values[:-1] = [None if isinstance(c, tp.TickerError) else c for c in converted]
+        values[-1] = None
+        return pd.Series(
+            values[codes], index=self._series.index, name=self._series.name, dtype="string"
+        )
+
+    def validate(self) -> pd.Series:
+        """
+        Reason code per ticker (see ticker_parser.validate_tickers) as a categorical, missing values stay
+        missing. Nothing is parsed or cached, so this is a cheap way to screen a column.
+        """
+        codes, tickers = self._factorize()
+        distinct = pd.Categorical(tp.validate_tickers(tickers))
+        # one extra slot at the end, which is where code -1 (missing values) points
+        category_codes = np.append(distinct.codes, -1)[codes]
+        return pd.Series(
+            pd.Categorical.from_codes(category_codes, distinct.categories),
+            index=self._series.index,
+            name=self._series.name,
+        )
+
+    def is_valid(self) -> pd.Series:
+        """True for tickers that parse, False for the others and for missing values"""
+        codes, tickers = self._factorize()
+        # one extra slot at the end, which is where code -1 (missing values) points
+        mask = np.append(np.array(tp.valid_mask(tickers), dtype=bool), False)
+        return pd.Series(mask[codes], index=self._series.index, name=self._series.name)
+
+    def parse(self) -> pd.DataFrame:
+        """
+        One row of parsed fields per ticker, with the dtypes in PARSED_COLUMNS. Fields that do not apply
+        (like the strike of an equity) are missing, and error_reason is set (one of PARSE_ERROR) for tickers
+        that could not be parsed. Missing values in the column give rows with every field missing.
+        """
+        codes, tickers = self._factorize()
+        results = tp._lookup_many(tickers)
+        rows = [_parsed_row(results[ticker]) for ticker in tickers]
+        rows.append((None,) * len(PARSED_COLUMNS))  # for code -1
+
+        distinct = pd.DataFrame.from_records(rows, columns=list(PARSED_COLUMNS))
+        distinct = distinct.astype(PARSED_COLUMNS)
+        parsed = distinct.take(codes)  # -1 takes the last row
+        parsed.index = self._series.index
+        return parsed
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-process version of bulk.convert_file for large files.
+
+The input file is split into chunks at byte offsets (moved forward to the next line break), each chunk is
+read and converted by a worker process, and the converted chunks are written out in input order.
+"""
+
+import csv
+import importlib
+import io
+import multiprocessing
+import os
+import time
+
+try:
+    from . import bulk
+    from . import ticker_parser as tp
+except ImportError:  # imported as a top level module, like the tests do
+    import bulk
+    import ticker_parser as tp
+
+DEFAULT_CHUNK_BYTES = 4 << 20
+
+# a few tickers of every format, parsed once in each worker so its first real chunk does not pay for warm up
+_WARM_UP_TICKERS = [
+    "AAPL",
+    "SPX",
+    "AAPL US Equity",
+    "SPX Index",
+    "AAPL  180216C00170000",
+    "AAPL US 02/16/18 C170.0 Equity",
+    "AAPL US 02/16/18 C170.0",
+]
+
+
+def _init_worker(shared_cache_name=None):
+    if shared_cache_name:
+        # imported here, shared_cache needs a POSIX host
+        shared_cache = importlib.import_module(
+            f"{__package__}.shared_cache" if __package__ else "shared_cache"
+        )
+        tp.PARSE_CACHE.store = shared_cache.SharedParseCache(shared_cache_name)
+    for target_format in bulk.TARGET_FORMATS:
+        tp.convert_tickers(_WARM_UP_TICKERS, target_format)
+
+
+def chunk_offsets(path, chunk_bytes=DEFAULT_CHUNK_BYTES, start=0) -> list:
+    """
+    Split the file at path into (start, end) byte ranges of about chunk_bytes each, starting at byte start.
+    Every range ends right after a line break (or at the end of the file), so no line is split.
+    """
+    size = os.path.getsize(path)
+    offsets = []
+    with open(path, "rb") as f:
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            offsets.append((start, end))
+            start = end
+    return offsets
+
+
+def _convert_range(task):
+    path, start, end, target_format, column_index, delimiter = task
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+
+    lines = io.StringIO(text, newline="")
+    out = io.StringIO()
+    rows = errors = 0
+    if column_index is None:
+        for out_lines, chunk_errors in bulk.convert_lines(lines, target_format):
+            out.writelines(out_lines)
+            rows += len(out_lines)
+            errors += chunk_errors
+    else:
+        reader = csv.reader(lines, delimiter=delimiter)
+        writer = csv.writer(out, delimiter=delimiter, lineterminator="\n")
+        for out_rows, chunk_errors in bulk.convert_csv_rows(
+            reader, column_index, target_format, header=False
+        ):
+            writer.writerows(out_rows)
+            rows += len(out_rows)
+            errors += chunk_errors
+    return out.getvalue(), rows, errors
+
+
+def convert_file_parallel(
+    src,
+    dst,
+    target_format=None,
+    *,
+    column=None,
+    delimiter=",",
+    header=True,
+    workers=None,
+    chunk_bytes=DEFAULT_CHUNK_BYTES,
+    shared_cache=None,
+) -> bulk.ConvertStats:
+    """
+    Same as bulk.convert_file, using a pool of worker processes (os.cpu_count() by default).
+    src must be a regular file, and CSV fields must not contain quoted line breaks.
+
+    With shared_cache, the name of a shared_cache.SharedParseCache, the workers share the tickers they
+    parse through it instead of each parsing them again. The table is left in place for later runs.
+    """
+    start = time.perf_counter()
+    rows = errors = 0
+    data_start = 0
+    column_index = None
+
+    with bulk.open_text(dst, "w") as fout:
+        if column is not None:
+            with open(src, "r", encoding="utf-8", newline="") as fin:
+                header_line = fin.readline() if header else ""
+                data_start = len(header_line.encode("utf-8"))
+            header_row = next(csv.reader([header_line], delimiter=delimiter), [])
+            column_index = bulk.column_index(header_row, column)
+            if header_row:
+                new_column = f"ticker_{target_format.lower()}" if target_format else "parsed"
+                csv.writer(fout, delimiter=delimiter, lineterminator="\n").writerow(
+                    header_row + [new_column]
+                )
+
+        tasks = [
+            (src, chunk_start, chunk_end, target_format, column_index, delimiter)
+            for chunk_start, chunk_end in chunk_offsets(src, chunk_bytes, data_start)
+        ]
+        with multiprocessing.Pool(
+            workers, initializer=_init_worker, initargs=(shared_cache,)
+        ) as pool:
+            # imap keeps results in task order, i.e. in input order
+            for text, chunk_rows, chunk_errors in pool.imap(_convert_range, tasks):
+                fout.write(text)
+                rows += chunk_rows
+                errors += chunk_errors
+        fout.flush()
+
+    return bulk.ConvertStats(rows, errors, time.perf_counter() - start)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Index and cash reference data, i.e. which plain tickers (like SPX or DGCXX) are indices or cash rather than
+equities, loaded from a local CSV file instead of the lists built into ticker_parser:
+
+    symbol,asset_class
+    SPX,Index
+    DGCXX,Cash
+
+The header row is optional, blank lines and lines starting with # are skipped. The file replaces both
+built in lists. ReferenceDataFile.check() reloads it once it changes, dropping only the cached results of
+the tickers it reclassifies. Replace the file atomically (write a new file, then rename it over the old
+one) so a reload never sees a half written file.
+
+The function app loads the file named by TICKER_PARSER_REFERENCE_DATA, see api.configure_from_environ.
+"""
+
+import csv
+import logging
+import os
+import time
+
+try:
+    from . import ticker_parser as tp
+except ImportError:  # imported as a top level module, like the tests do
+    import ticker_parser as tp
+
+DEFAULT_CHECK_INTERVAL = 5.0  # seconds
+CLASSES = (tp.ASSET_CLASS.Index, tp.ASSET_CLASS.Cash)
+
+
+def load(path) -> dict:
+    """{asset class: frozenset of symbols} for each of CLASSES, raises ValueError for malformed rows"""
+    symbols = {asset_class: set() for asset_class in CLASSES}
+    with open(path, encoding="utf-8", newline="") as f:
+        for line_number, row in enumerate(csv.reader(f), start=1):
+            if not row or not row[0].strip() or row[0].startswith("#"):
+                continue
+            if line_number == 1 and row[0].strip().lower() == "symbol":
+                continue
+            if len(row) != 2 or row[1].strip() not in symbols:
+                raise ValueError(
+                    f"{path}, line {line_number}: expected a symbol and one of {', '.join(CLASSES)}"
+                )
+            symbols[row[1].strip()].add(row[0].strip())
+    return {asset_class: frozenset(s) for asset_class, s in symbols.items()}
+
+
+class ReferenceDataFile:
+    """
+    Reference data file applied to ticker_parser, see the module docstring. Call check() as often as
+    convenient (e.g. on every request), it only looks at the file once every check_interval seconds.
+    """
+
+    def __init__(self, path, check_interval=DEFAULT_CHECK_INTERVAL):
+        self.path = str(path)
+        self.check_interval = check_interval
+        self._signature = None
+        self._next_check = 0.0
+
+    def _stat(self) -> tuple:
+        st = os.stat(self.path)
+        # a rename over the file changes the inode even when mtime and size happen to match
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def reload(self) -> frozenset:
+        """load the file and apply it, returns the symbols whose classification changed"""
+        signature = self._stat()
+        symbols = load(self.path)
+        self._signature = signature
+        changed = tp.set_reference_data(
+            index=symbols[tp.ASSET_CLASS.Index], cash=symbols[tp.ASSET_CLASS.Cash]
+        )
+        logging.info(f"Loaded reference data from {self.path}, {len(changed)} symbols reclassified")
+        return changed
+
+    def check(self):
+        """reload if the file changed since it was loaded, returns the reclassified symbols or None"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return None
+        self._next_check = now + self.check_interval
+        try:
+            if self._stat() == self._signature:
+                return None
+            return self.reload()
+        except (OSError, ValueError) as e:
+            # keep classifying with what was loaded last, and do not retry until the file changes again
+            logging.error(f"Could not reload reference data, keeping the current one: {e}")
+            try:
+                self._signature = self._stat()
+            except OSError:
+                pass
+            return None
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Standalone asyncio HTTP server with the same contract as the Azure Functions trigger (see api), for running
+and load testing the parser without the Functions host:
+
+    python -m TickerParser serve --port 7071
+
+Concurrent single ticker requests are collected into micro-batches: the first request of a batch waits at
+most max_wait seconds for others to join it, then the whole batch is parsed with one parse_tickers call.
+"""
+
+import asyncio
+import logging
+import urllib.parse
+
+try:
+    from . import api
+    from . import ticker_parser as tp
+except ImportError:  # imported as a top level module, like the tests do
+    import api
+    import ticker_parser as tp
+
+DEFAULT_MAX_BATCH = 512
+DEFAULT_MAX_WAIT = 0.002  # seconds
+MAX_HEADER_LINES = 100
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class MicroBatcher:
+    """
+    Collects tickers submitted from concurrent requests and parses them together. A batch is parsed when
+    it reaches max_batch tickers, or max_wait seconds after its first ticker was submitted.
+    """
+
+    def __init__(self, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self._pending = []  # (ticker, formats, future)
+        self._timer = None
+
+    def submit(self, ticker: str, formats=tp.RENDER_FORMATS) -> asyncio.Future:
+        """future for the parse_tickers result of ticker, must be called from the event loop"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((ticker, formats, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self.flush)
+        return future
+
+    def flush(self):
+        """parse everything submitted so far"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+
+        by_formats = {}
+        for item in batch:
+            by_formats.setdefault(item[1], []).append(item)
+        for formats, items in by_formats.items():
+            try:
+                results = tp.parse_tickers([ticker for ticker, _, _ in items], formats)
+            except Exception as e:
+                for _, _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, _, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class TickerServer:
+    def __init__(self, batcher: MicroBatcher):
+        self.batcher = batcher
+
+    async def respond(self, params, headers, body: bytes) -> api.Response:
+        api.check_reference_data()
+        if not (api.is_metrics(params) or api.is_bulk(headers)):
+            request = api.read_request(params, body)
+            if isinstance(request, api.Response):
+                return request
+            if request.single:
+                result = await self.batcher.submit(request.tickers[0], request.formats)
+                return request.respond([result])
+        # lists and bulk requests are already batches, parse them as they are, off the event loop so they
+        # do not hold up the single ticker requests in the meantime
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, api.handle, params, headers, body)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                request = await _read_request(reader, writer)
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                url = urllib.parse.urlsplit(target)
+                params = dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True))
+                if method not in ("GET", "POST"):
+                    resp = api.Response(f"Method {method} not allowed", status_code=400)
+                else:
+                    try:
+                        resp = await self.respond(params, headers, body)
+                    except Exception:
+                        logging.exception(f"Failed to handle {method} {target}")
+                        resp = api.Response("Internal server error", status_code=500)
+                keep_alive = _keep_alive(version, headers)
+                if isinstance(resp.body, (str, bytes)):
+                    writer.write(_encode_response(resp, keep_alive))
+                elif version == "HTTP/1.0":
+                    # no chunked transfer encoding in HTTP/1.0, send the body in one piece
+                    try:
+                        resp = resp._replace(
+                            body=await loop.run_in_executor(None, b"".join, resp.body)
+                        )
+                    except Exception:
+                        logging.exception(f"Failed to handle {method} {target}")
+                        resp = api.Response("Internal server error", status_code=500)
+                    writer.write(_encode_response(resp, keep_alive))
+                elif not await _send_chunked(writer, resp, keep_alive):
+                    break
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except _BadRequest as e:
+            writer.write(_encode_response(api.Response(str(e), status_code=e.status_code), False))
+        finally:
+            writer.close()
+
+
+class _BadRequest(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+async def _read_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """
+    (method, target, HTTP version, headers, body) of the next request on the connection, None once it is
+    closed
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, version = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise _BadRequest("Malformed request line") from None
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise _BadRequest("Too many headers")
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise _BadRequest("Chunked request bodies are not supported", status_code=411)
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise _BadRequest("Invalid Content-Length")
+    if length > api.BULK_MAX_BYTES:
+        raise _BadRequest("Request body too large", status_code=413)
+    if length and headers.get("expect", "").lower() == "100-continue":
+        # the client waits for this before sending the body, curl does for bodies over 1KB
+        writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        await writer.drain()
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, version.strip().upper(), headers, body
+
+
+def _keep_alive(version: str, headers: dict) -> bool:
+    """whether the connection stays open after the response, HTTP/1.0 closes it unless asked not to"""
+    connection = {token.strip() for token in headers.get("connection", "").lower().split(",")}
+    if version == "HTTP/1.0":
+        return "keep-alive" in connection
+    return "close" not in connection
+
+
+def _encode_head(resp: api.Response, keep_alive: bool, length=None) -> bytes:
+    """status line and headers, for a chunked body if length is None"""
+    head = [
+        f"HTTP/1.1 {resp.status_code} {_REASONS.get(resp.status_code, '')}",
+        f"Content-Type: {resp.mimetype}",
+        "Transfer-Encoding: chunked" if length is None else f"Content-Length: {length}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    head += [f"{name}: {value}" for name, value in (resp.headers or {}).items()]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1")
+
+
+def _encode_response(resp: api.Response, keep_alive: bool) -> bytes:
+    body = resp.body.encode() if isinstance(resp.body, str) else resp.body
+    return _encode_head(resp, keep_alive, len(body)) + body
+
+
+async def _send_chunked(writer: asyncio.StreamWriter, resp: api.Response, keep_alive: bool) -> bool:
+    """
+    Send a response whose body is an iterator of blocks with chunked transfer encoding, one chunk per
+    block. Blocks are made off the event loop, and each one is only made once the previous one has been
+    taken by the client. Returns False if making a block failed, the response is then left unfinished so
+    the client can tell it is incomplete, and the connection has to be closed.
+    """
+    loop = asyncio.get_running_loop()
+    blocks = iter(resp.body)
+    writer.write(_encode_head(resp, keep_alive))
+    while True:
+        try:
+            block = await loop.run_in_executor(None, next, blocks, None)
+        except Exception:
+            logging.exception("Failed to make the response body")
+            return False
+        if block is None:
+            break
+        if block:  # an empty chunk would end the body
+            writer.write(b"%x\r\n%b\r\n" % (len(block), block))
+            await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    return True
+
+
+async def start_server(
+    host="127.0.0.1", port=7071, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT
+) -> asyncio.AbstractServer:
+    server = TickerServer(MicroBatcher(max_batch, max_wait))
+    return await asyncio.start_server(server.handle_connection, host, port)
+
+
+def serve(host="127.0.0.1", port=7071, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT):
+    """run the server until interrupted"""
+    api.configure_from_environ()
+
+    async def run():
+        server = await start_server(host, port, max_batch, max_wait)
+        logging.info(f"Serving on {', '.join(str(s.getsockname()) for s in server.sockets)}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""
+Parse cache shared by every worker process on a host, in a fixed size hash table in shared memory.
+
+Each worker process keeps its own ticker_parser.PARSE_CACHE, so with several Python workers (or a process
+pool, see parallel.py) every process parses the same book again and keeps its own copy of the results.
+Used as the second level of PARSE_CACHE, a process that misses its own cache looks in the shared table
+before parsing, and every result one process parses is there for the others:
+
+    tp.PARSE_CACHE.store = SharedParseCache("ticker_parser")
+
+The first process to open a name creates the table, the others attach to it, and it stays until unlink()
+is called (or the host restarts), so workers that are recycled find it warm.
+
+The table has entries slots, in buckets of ways slots. A ticker can only go in the bucket its hash points
+to, and when that bucket is full the entry that was put there first is replaced (FIFO within the bucket).
+Every slot has a fixed size of slot_bytes, results that do not fit are not shared. A result is stored as
+its Security fields and its three renderings, and the table is emptied when it was filled with other
+format rules. Every result is tagged with the version of the index and cash reference data it was
+classified with (see symbol_store.reference_version), and only used while that is the current one: the
+processes sharing the table each load new reference data at their own time. The first process to load new
+reference data drops the entries of the tickers it classifies differently and tags the others with it.
+
+Reads take no lock. Every slot has a sequence number that a writer makes odd before changing the slot and
+even again after, and a reader only accepts a slot if its sequence number was the same even number before
+and after reading it. Writers take a file lock, so one process writes at a time.
+
+Needs a POSIX host (like the Linux Functions hosts), for shared memory and the file lock.
+"""
+
+import contextlib
+import fcntl
+import os
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+from typing import NamedTuple
+
+try:
+    from . import symbol_store
+    from . import ticker_parser as tp
+except ImportError:  # imported as a top level module, like the tests do
+    import symbol_store
+    import ticker_parser as tp
+
+DEFAULT_NAME = "ticker_parser"
+DEFAULT_ENTRIES = 65536
+DEFAULT_WAYS = 8
+DEFAULT_SLOT_BYTES = 256
+
+MAGIC = b"TPSC"
+# bump when the layout of the table changes
+LAYOUT_VERSION = 2
+# magic, layout version, buckets, ways, slot bytes, sha256 of the format rules
+HEADER = struct.Struct("<4sIIII32s")
+# counter of the entries put in the bucket, stamped on each of them to tell which came first
+BUCKET_HEADER = struct.Struct("<Q")
+# sequence number, key length (0 for an empty slot), value length, stamp
+SLOT_HEADER = struct.Struct("<IHHQ")
+SEQUENCE = struct.Struct("<I")
+# the reference data version every value starts with
+REFERENCE_BYTES = 8
+READ_RETRIES = 8
+# between the fields of a stored result, never part of a parsed field or a rendering
+SEPARATOR = "\x1f"
+
+
+class SharedCacheStats(NamedTuple):
+    """counts of this process, not of every process using the table"""
+
+    hits: int
+    store_hits: int  # misses of the table found in its store
+    misses: int
+    evictions: int  # entries replaced to make room in a full bucket
+    rejections: int  # results too large for a slot
+
+
+def _open_segment(name: str, create: bool, size=0) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, create=create, size=size, track=False)
+    segment = shared_memory.SharedMemory(name, create=create, size=size)
+    # the resource tracker would unlink the table when this process exits, while other workers still use it
+    resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+
+def _key(ticker: str) -> bytes:
+    # surrogatepass, a ticker from JSON input can have lone surrogates, which are not valid UTF-8
+    return ticker.encode("utf-8", "surrogatepass")
+
+
+def _encode(result) -> bytes:
+    """the reason of a TickerError, or the Security fields of a ParsedTicker followed by its renderings"""
+    if isinstance(result, tp.TickerError):
+        return result.reason.encode("utf-8")
+    s = result.security
+    fields = [getattr(s, field) for field in tp.Security.__slots__]
+    fields = ["" if value is None else str(value) for value in fields]
+    fields += [result.render(target_format) for target_format in tp.RENDER_FORMATS]
+    return SEPARATOR.join(fields).encode("utf-8", "surrogatepass")
+
+
+def _decode(ticker: str, value: bytes):
+    fields = value.decode("utf-8", "surrogatepass").split(SEPARATOR)
+    if len(fields) == 1:
+        return tp.TickerError(ticker, fields[0])
+    format_type, asset_class, root, call_put, year, month, day, strike, exchange, suffix = fields[
+        : len(tp.Security.__slots__)
+    ]
+    security = tp.Security(
+        format_type,
+        asset_class,
+        root,
+        call_put=call_put or None,
+        expiry_year=int(year) if year else None,
+        expiry_month=int(month) if month else None,
+        expiry_day=int(day) if day else None,
+        strike_price=float(strike) if strike else None,
+        exchange=exchange or None,
+        bloomberg_suffix=suffix,
+    )
+    rendered = dict(zip(tp.RENDER_FORMATS, fields[len(tp.Security.__slots__) :]))
+    return tp.ParsedTicker(ticker, security, rendered)
+
+
+class SharedParseCache:
+    """
+    Cross-process parse cache, see the module docstring. Has the get(ticker), put(ticker, result) and
+    delete(tickers) methods of a ParseCache store, and can have a store of its own, like a SymbolStore,
+    which it looks in on a miss and writes through to.
+
+    entries, ways and slot_bytes only apply when the table is created, processes attaching to an existing
+    table use its layout.
+    """
+
+    def __init__(
+        self,
+        name=DEFAULT_NAME,
+        entries=DEFAULT_ENTRIES,
+        ways=DEFAULT_WAYS,
+        slot_bytes=DEFAULT_SLOT_BYTES,
+        store=None,
+    ):
+        if entries < 1 or ways < 1:
+            raise ValueError(f"entries and ways must be at least 1, got {entries} and {ways}")
+        if slot_bytes <= SLOT_HEADER.size:
+            raise ValueError(f"slot_bytes must be more than {SLOT_HEADER.size}, got {slot_bytes}")
+        self.name = name
+        self.store = store
+        self._reference = (
+            None  # symbol_store._reference_state() the table was last brought up to date with
+        )
+        self._thread_lock = threading.Lock()
+        self._lock_file = open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), "ab")
+        self._hits = self._store_hits = self._misses = self._evictions = self._rejections = 0
+
+        with self._write_lock():
+            buckets = -(-entries // ways)
+            try:
+                size = HEADER.size + buckets * (BUCKET_HEADER.size + ways * slot_bytes)
+                self._segment = _open_segment(name, create=True, size=size)
+                HEADER.pack_into(
+                    self._segment.buf, 0, MAGIC, LAYOUT_VERSION, buckets, ways, slot_bytes, b""
+                )
+            except FileExistsError:
+                self._segment = _open_segment(name, create=False)
+            self._buf = self._segment.buf
+
+            magic, layout, buckets, ways, slot_bytes, rules = HEADER.unpack_from(self._buf)
+            if (magic, layout) != (MAGIC, LAYOUT_VERSION):
+                self._segment.close()
+                raise ValueError(f"Shared memory {name} is not a parse cache of this version")
+            self.buckets, self.ways, self.slot_bytes = buckets, ways, slot_bytes
+            self._bucket_bytes = BUCKET_HEADER.size + ways * slot_bytes
+            current_rules = bytes.fromhex(symbol_store.rules_version())
+            if rules != current_rules:
+                self._clear()
+                HEADER.pack_into(
+                    self._buf, 0, MAGIC, LAYOUT_VERSION, buckets, ways, slot_bytes, current_rules
+                )
+
+    @contextlib.contextmanager
+    def _write_lock(self):
+        # flock only keeps other processes out, the thread lock keeps out the other threads of this one
+        with self._thread_lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _bucket(self, key: bytes) -> int:
+        """offset of the bucket of key"""
+        return HEADER.size + zlib.crc32(key) % self.buckets * self._bucket_bytes
+
+    def _slots(self, bucket: int) -> range:
+        """offsets of the slots of the bucket at offset bucket"""
+        first = bucket + BUCKET_HEADER.size
+        return range(first, first + self.ways * self.slot_bytes, self.slot_bytes)
+
+    def _buckets(self) -> range:
+        return range(
+            HEADER.size, HEADER.size + self.buckets * self._bucket_bytes, self._bucket_bytes
+        )
+
+    def _read(self, key: bytes):
+        """the encoded value stored for key, or None, without taking the lock"""
+        buf = self._buf
+        for slot in self._slots(self._bucket(key)):
+            for _ in range(READ_RETRIES):
+                sequence, key_len, value_len, _ = SLOT_HEADER.unpack_from(buf, slot)
+                if sequence & 1:
+                    continue  # being written
+                key_start = slot + SLOT_HEADER.size
+                value = None
+                if key_len == len(key) and buf[key_start : key_start + key_len] == key:
+                    value_start = key_start + key_len
+                    value = bytes(buf[value_start : value_start + value_len])
+                if SEQUENCE.unpack_from(buf, slot)[0] == sequence:
+                    if value is not None:
+                        return value
+                    break
+        return None
+
+    def _find(self, key: bytes):
+        """(slot of key or None, slot to put key in if it is not there), the caller holds the lock"""
+        empty = oldest = oldest_stamp = None
+        for slot in self._slots(self._bucket(key)):
+            _, key_len, _, stamp = SLOT_HEADER.unpack_from(self._buf, slot)
+            key_start = slot + SLOT_HEADER.size
+            if key_len == len(key) and self._buf[key_start : key_start + key_len] == key:
+                return slot, slot
+            if key_len == 0:
+                if empty is None:
+                    empty = slot
+            elif oldest is None or stamp < oldest_stamp:
+                oldest, oldest_stamp = slot, stamp
+        return None, empty if empty is not None else oldest
+
+    def _write_slot(self, slot: int, key: bytes, value: bytes, stamp: int):
+        """the caller holds the lock"""
+        buf = self._buf
+        sequence = SEQUENCE.unpack_from(buf, slot)[0]
+        SEQUENCE.pack_into(buf, slot, (sequence + 1) & 0xFFFFFFFF)
+        SLOT_HEADER.pack_into(buf, slot, (sequence + 1) & 0xFFFFFFFF, len(key), len(value), stamp)
+        key_start = slot + SLOT_HEADER.size
+        buf[key_start : key_start + len(key)] = key
+        buf[key_start + len(key) : key_start + len(key) + len(value)] = value
+        SEQUENCE.pack_into(buf, slot, (sequence + 2) & 0xFFFFFFFF)
+
+    def _put_shared(self, ticker: str, result):
+        key = _key(ticker)
+        value = self._sync_reference() + _encode(result)
+        if not key or SLOT_HEADER.size + len(key) + len(value) > self.slot_bytes:
+            self._rejections += 1
+            return
+        with self._write_lock():
+            found, slot = self._find(key)
+            if found is not None:
+                # replaced in place, it keeps its place in the order the bucket was filled
+                stamp = SLOT_HEADER.unpack_from(self._buf, found)[3]
+            else:
+                if SLOT_HEADER.unpack_from(self._buf, slot)[1]:
+                    self._evictions += 1
+                bucket = self._bucket(key)
+                stamp = BUCKET_HEADER.unpack_from(self._buf, bucket)[0] + 1
+                BUCKET_HEADER.pack_into(self._buf, bucket, stamp)
+            self._write_slot(slot, key, value, stamp)
+
+    def _clear(self):
+        """empty every slot, the caller holds the lock"""
+        for bucket in self._buckets():
+            for slot in self._slots(bucket):
+                if SLOT_HEADER.unpack_from(self._buf, slot)[1]:
+                    self._write_slot(slot, b"", b"", 0)
+
+    def _sync_reference(self) -> bytes:
+        """
+        the current reference data version, after dropping the entries of the tickers new reference data
+        classifies differently and tagging the others with it
+        """
+        state = symbol_store._reference_state()
+        if self._reference is not state:
+            if self._reference is not None and self._reference[2] != state[2]:
+                self._retag(self._reference, state)
+            self._reference = state
+        return bytes.fromhex(state[2])
+
+    def _retag(self, old_state, state):
+        index, cash, old = old_state
+        old, new = bytes.fromhex(old), bytes.fromhex(state[2])
+        reclassified = {
+            _key(t) for t in tp.classified_tickers((index ^ state[0]) | (cash ^ state[1]))
+        }
+        with self._write_lock():
+            for bucket in self._buckets():
+                for slot in self._slots(bucket):
+                    _, key_len, value_len, stamp = SLOT_HEADER.unpack_from(self._buf, slot)
+                    value_start = slot + SLOT_HEADER.size + key_len
+                    if not key_len or self._buf[value_start : value_start + REFERENCE_BYTES] != old:
+                        continue
+                    key = bytes(self._buf[slot + SLOT_HEADER.size : value_start])
+                    if key in reclassified:
+                        self._write_slot(slot, b"", b"", 0)
+                    else:
+                        value = bytes(self._buf[value_start : value_start + value_len])
+                        self._write_slot(slot, key, new + value[REFERENCE_BYTES:], stamp)
+
+    def get(self, ticker: str):
+        """
+        the shared ParsedTicker or TickerError for ticker, or None, also when it was put with other
+        reference data
+        """
+        reference = self._sync_reference()
+        value = self._read(_key(ticker))
+        if value is not None and value[:REFERENCE_BYTES] == reference:
+            self._hits += 1
+            return _decode(ticker, value[REFERENCE_BYTES:])
+        if self.store is not None:
+            result = self.store.get(ticker)
+            if result is not None:
+                self._store_hits += 1
+                self._put_shared(ticker, result)
+                return result
+        self._misses += 1
+        return None
+
+    def put(self, ticker: str, result):
+        self._put_shared(ticker, result)
+        if self.store is not None:
+            self.store.put(ticker, result)
+
+    def delete(self, tickers):
+        tickers = list(tickers)
+        with self._write_lock():
+            for ticker in tickers:
+                found, _ = self._find(_key(ticker))
+                if found is not None:
+                    self._write_slot(found, b"", b"", 0)
+        if self.store is not None:
+            self.store.delete(tickers)
+
+    def clear(self):
+        """empty the table for every process, the store is left alone"""
+        with self._write_lock():
+            self._clear()
+
+    def __len__(self):
+        """entries in the table, counted by scanning it"""
+        return sum(
+            SLOT_HEADER.unpack_from(self._buf, slot)[1] != 0
+            for bucket in self._buckets()
+            for slot in self._slots(bucket)
+        )
+
+    def stats(self) -> SharedCacheStats:
+        return SharedCacheStats(
+            hits=self._hits,
+            store_hits=self._store_hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            rejections=self._rejections,
+        )
+
+    def close(self):
+        """detach this process from the table, which stays for the others, and close the store"""
+        if self._buf is not None:
+            self._buf = None
+            self._segment.close()
+            self._lock_file.close()
+        if self.store is not None:
+            self.store.close()
+
+    def unlink(self):
+        """remove the table from the host, processes still attached keep their view of it until they close"""
+        if sys.version_info < (3, 13):
+            # unlink() unregisters the table from the resource tracker, which does not know it any more
+            resource_tracker.register(self._segment._name, "shared_memory")
+        self._segment.unlink()
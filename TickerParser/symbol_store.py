@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent store of parse results in an SQLite file, keyed by the original ticker.
+
+Used as the second level of ticker_parser.PARSE_CACHE so a freshly started worker can answer from the
+store instead of parsing the whole book again:
+
+    tp.PARSE_CACHE.store = SymbolStore("/home/data/symbols.sqlite")
+
+Every entry is stored with all three renderings (ticker_occ, ticker_bloomberg, ticker_eze). The store
+records a hash of the format rules it was filled with, and drops every entry when those rules change.
+Every entry is also tagged with the version of the index and cash reference data it was classified with,
+and only used while that is still the current one, since processes sharing the store load new reference
+data each at their own time. When a process sees new reference data, it drops the entries of the tickers
+that are now classified differently and tags the others with the new version.
+"""
+
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+
+try:
+    from . import bulk
+    from . import ticker_parser as tp
+except ImportError:  # imported as a top level module, like the tests do
+    import bulk
+    import ticker_parser as tp
+
+# bump when the layout of stored results changes
+SCHEMA_VERSION = 2
+
+
+def _source(obj) -> str:
+    """source code of a function or class, or its bytecode where the source is not deployed"""
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return inspect.unwrap(obj).__code__.co_code.hex()
+
+
+def rules_version() -> str:
+    """hash of everything that decides how a ticker is parsed and rendered, apart from the reference data"""
+    format_classes = set(tp.FORMATS_TO_SEARCH)
+    format_classes.update(
+        fmt for by_type in tp.FORMATS_FOR_REBUILD.values() for fmt in by_type.values()
+    )
+    rules = {
+        "schema": SCHEMA_VERSION,
+        "formats": [(fmt.__name__, fmt.regex_string) for fmt in tp.FORMATS_TO_SEARCH],
+        "rebuild": {
+            asset_class: {fmt_type: fmt.__name__ for fmt_type, fmt in formats.items()}
+            for asset_class, formats in tp.FORMATS_FOR_REBUILD.items()
+        },
+        # what is stored is decoded and rendered by these, a change to any of them changes the results
+        "code": {
+            fmt.__name__: [_source(fmt.to_Security), _source(fmt.to_ticker_string)]
+            for fmt in format_classes
+        },
+        "strike": _source(tp._format_strike),
+        "security": _source(tp.Security),
+    }
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode()).hexdigest()
+
+
+def _storable(ticker: str) -> bool:
+    """whether ticker can be a key in SQLite, which only takes valid unicode (no lone surrogates)"""
+    try:
+        ticker.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _reference_json(index, cash) -> str:
+    return json.dumps({"index": sorted(index), "cash": sorted(cash)})
+
+
+def _reference_data() -> str:
+    return _reference_json(tp.INDEX_LIST, tp.CASH_LIST)
+
+
+def _hash_reference(reference_json: str) -> str:
+    return hashlib.sha256(reference_json.encode()).hexdigest()[:16]
+
+
+# (INDEX_LIST, CASH_LIST, version) of the last _reference_state call
+_last_reference_state = (None, None, "")
+
+
+def _reference_state() -> tuple:
+    """(INDEX_LIST, CASH_LIST, their version), the version is only recomputed when they change"""
+    global _last_reference_state
+    state = _last_reference_state
+    if state[0] is not tp.INDEX_LIST or state[1] is not tp.CASH_LIST:
+        index, cash = tp.INDEX_LIST, tp.CASH_LIST
+        state = (index, cash, _hash_reference(_reference_json(index, cash)))
+        _last_reference_state = state
+    return state
+
+
+def reference_version() -> str:
+    """short hash of the current index and cash reference data"""
+    return _reference_state()[2]
+
+
+def _encode(result) -> str:
+    if isinstance(result, tp.TickerError):
+        return json.dumps(
+            {"ticker_original": result.ticker_original, "error_reason": result.reason}
+        )
+    return json.dumps(result.to_dict())
+
+
+def _decode(value: str):
+    result = json.loads(value)
+    if "error_reason" in result:
+        return tp.TickerError(result["ticker_original"], result["error_reason"])
+    return tp.ParsedTicker.from_dict(result)
+
+
+class SymbolStore:
+    """
+    SQLite backed store of parse results, see the module docstring.
+
+    The database is only opened on first use. Puts are queued in memory and written in one short
+    transaction every commit_every puts, and on flush() or close(), so filling the store does not pay for
+    one transaction per ticker, and the database is never left locked for writing between two puts.
+    """
+
+    def __init__(self, path, commit_every=1000):
+        self.path = str(path)
+        self.commit_every = commit_every
+        self._conn = None
+        self._queued = {}  # ticker: (encoded result, reference version), not written yet
+        self._reference = None  # _reference_state() the entries were last brought up to date with
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            # let workers in other processes read while one of them writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            version = rules_version()
+            if meta.get("rules_version") != version:
+                # the rules or the layout changed, start over
+                conn.execute("DROP TABLE IF EXISTS symbols")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('rules_version', ?)", (version,))
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS symbols "
+                "(ticker TEXT PRIMARY KEY, result TEXT, reference TEXT)"
+            )
+            if meta.get("rules_version") == version and "reference_data" in meta:
+                stored = json.loads(meta["reference_data"])
+                self._reference = (
+                    frozenset(stored["index"]),
+                    frozenset(stored["cash"]),
+                    _hash_reference(meta["reference_data"]),
+                )
+            self._conn = conn
+            self._sync_reference()
+        return self._conn
+
+    def _sync_reference(self):
+        """
+        after the reference data changed, drop the entries of the tickers it classifies differently and
+        tag the others with the new version. The caller holds self._lock.
+        """
+        state = _reference_state()
+        if self._reference is not None and self._reference[2] == state[2]:
+            self._reference = state
+            return
+        conn = self._conn
+        with conn:
+            if self._reference is not None:
+                index, cash, old = self._reference
+                changed = (index ^ state[0]) | (cash ^ state[1])
+                reclassified = tp.classified_tickers(changed)
+                conn.executemany(
+                    "DELETE FROM symbols WHERE ticker = ? AND reference = ?",
+                    [(t, old) for t in reclassified],
+                )
+                conn.execute(
+                    "UPDATE symbols SET reference = ? WHERE reference = ?", (state[2], old)
+                )
+                reclassified = set(reclassified)
+                self._queued = {
+                    ticker: (value, state[2] if reference == old else reference)
+                    for ticker, (value, reference) in self._queued.items()
+                    if reference != old or ticker not in reclassified
+                }
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('reference_data', ?)",
+                (_reference_json(state[0], state[1]),),
+            )
+        self._reference = state
+
+    def _write_queued(self):
+        """write the queued puts in one transaction, with self._lock held"""
+        conn = self._connect()
+        self._sync_reference()
+        if self._queued:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO symbols VALUES (?, ?, ?)",
+                    [
+                        (ticker, value, reference)
+                        for ticker, (value, reference) in self._queued.items()
+                    ],
+                )
+            self._queued = {}
+        return conn
+
+    def get(self, ticker: str):
+        """
+        the stored ParsedTicker or TickerError for ticker, or None, also when it was stored with other
+        reference data
+        """
+        if not _storable(ticker):
+            return None
+        with self._lock:
+            if self._conn is not None:
+                self._sync_reference()
+            reference = reference_version()
+            queued = self._queued.get(ticker)
+            if queued is not None:
+                value = queued[0] if queued[1] == reference else None
+            else:
+                row = (
+                    self._connect()
+                    .execute(
+                        "SELECT result FROM symbols WHERE ticker = ? AND reference = ?",
+                        (ticker, reference),
+                    )
+                    .fetchone()
+                )
+                value = None if row is None else row[0]
+        return None if value is None else _decode(value)
+
+    def put(self, ticker: str, result):
+        self.put_many([(ticker, result)])
+
+    def put_many(self, items):
+        """store an iterable of (ticker, result) pairs"""
+        reference = reference_version()
+        rows = {
+            ticker: (_encode(result), reference) for ticker, result in items if _storable(ticker)
+        }
+        with self._lock:
+            self._queued.update(rows)
+            if len(self._queued) >= self.commit_every:
+                self._write_queued()
+
+    def delete(self, tickers):
+        with self._lock:
+            tickers = [ticker for ticker in tickers if _storable(ticker)]
+            for ticker in tickers:
+                self._queued.pop(ticker, None)
+            with self._connect() as conn:
+                conn.executemany("DELETE FROM symbols WHERE ticker = ?", [(t,) for t in tickers])
+
+    def __len__(self):
+        with self._lock:
+            return self._write_queued().execute("SELECT COUNT(*) FROM symbols").fetchone()[0]
+
+    def items(self, limit=-1):
+        """stored (ticker, result) pairs of the current reference data, all of them by default"""
+        with self._lock:
+            rows = (
+                self._write_queued()
+                .execute(
+                    "SELECT ticker, result FROM symbols WHERE reference = ? LIMIT ?",
+                    (reference_version(), limit),
+                )
+                .fetchall()
+            )
+        return [(ticker, _decode(value)) for ticker, value in rows]
+
+    def populate(self, tickers, chunk_size=bulk.DEFAULT_CHUNK_SIZE) -> int:
+        """parse and store every ticker in an iterable, returns how many tickers were stored"""
+        stored = 0
+        for chunk in bulk.chunked(tickers, chunk_size):
+            parsed = tp._parse_distinct(chunk)
+            self.put_many((ticker, tp._to_result(ticker, sec)) for ticker, sec in parsed.items())
+            stored += len(parsed)
+        self.flush()
+        return stored
+
+    def populate_from_file(self, path) -> int:
+        """populate from a symbol universe file with one ticker per line"""
+        with open(path, encoding="utf-8") as f:
+            return self.populate(line.rstrip("\r\n") for line in f if line.strip())
+
+    def warm(self, cache) -> int:
+        """preload a ParseCache with as many stored results as it can hold, returns how many"""
+        return cache.preload(self.items(limit=cache.maxsize))
+
+    def flush(self):
+        with self._lock:
+            if self._queued:
+                self._write_queued()
+
+    def close(self):
+        with self._lock:
+            if self._queued:
+                self._write_queued()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
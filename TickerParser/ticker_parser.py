@@ -5,13 +5,27 @@ Created on Tue Feb 19 22:08:50 2019
 @author: JDimarsky
 """
 
+import collections
+import datetime
+import functools
+import heapq
+import itertools
 import logging
 import math
 import re
-from functools import lru_cache
+import sys
+import threading
+import time
+from typing import NamedTuple, Optional
 
-INDEX_LIST = ["SPX", "NDX", "INDU", "COMPX", "COMPQX", "RTY", "RUT", "MNX", "VIX", "/VXG18"]
-CASH_LIST = ["USD", "GBP", "WFUSUDI LX", "DGCXX", "FGTXX", "FTIXX", "IJTXX", "MISXX", "TFDXX"]
+# plain tickers classified as indices and cash, the rest are equities. Replace them with
+# set_reference_data (see reference_data for loading them from a file), not by assigning to them.
+INDEX_LIST = frozenset(
+    ["SPX", "NDX", "INDU", "COMPX", "COMPQX", "RTY", "RUT", "MNX", "VIX", "/VXG18"]
+)
+CASH_LIST = frozenset(
+    ["USD", "GBP", "WFUSUDI LX", "DGCXX", "FGTXX", "FTIXX", "IJTXX", "MISXX", "TFDXX"]
+)
 
 
 class FORMAT_TYPES:
@@ -30,6 +44,24 @@ class ASSET_CLASS:
 
 
 class Security:
+    """
+    Fields of a parsed ticker. Slotted, so every instance has the same fixed layout and no __dict__, and
+    the strings that repeat across a book (root, exchange, suffix, ...) are interned so they are shared.
+    """
+
+    __slots__ = (
+        "format_type",
+        "asset_class",
+        "root_symbol",
+        "call_put",
+        "expiry_year",
+        "expiry_month",
+        "expiry_day",
+        "strike_price",
+        "exchange",
+        "bloomberg_suffix",
+    )
+
     def __init__(
         self,
         format_type,
@@ -44,18 +76,64 @@ class Security:
         exchange=None,
         bloomberg_suffix="",
     ):
-        for key, val in locals().items():
-            if val and key != "self":
-                setattr(self, key, val)
+        self.format_type = _intern(format_type)
+        self.asset_class = _intern(asset_class)
+        self.root_symbol = _intern(root_symbol)
+        self.call_put = _intern(call_put)
+        self.expiry_year = expiry_year
+        self.expiry_month = expiry_month
+        self.expiry_day = expiry_day
+        self.strike_price = strike_price
+        self.exchange = _intern(exchange)
+        self.bloomberg_suffix = _intern(bloomberg_suffix)
+
+    def to_dict(self) -> dict:
+        """the fields that are set, i.e. not None or empty, used for the JSON output"""
+        d = {}
+        for key in self.__slots__:
+            val = getattr(self, key)
+            if val is not None and val != "":
+                d[key] = val
+        return d
 
     def __repr__(self):
         """shamelessly copied from ib_insync library"""
         clsName = self.__class__.__qualname__
-        kwargs = ", ".join(f"{k}={v!r}" for k, v in self.__dict__.items())
+        kwargs = ", ".join(f"{k}={v!r}" for k, v in self.to_dict().items())
         return f"{clsName}({kwargs})"
 
 
+def _intern(val):
+    return sys.intern(val) if type(val) is str else val
+
+
+class TickerShape(NamedTuple):
+    """
+    Coarse features of a ticker used to pick which formats are worth running a regex against.
+    Computed by _ticker_shape, see there for the meaning of each field.
+    """
+
+    length: str  # one of "short" (1 to 10 chars), "occ" (exactly 21 chars) or "other"
+    suffix: Optional[str]  # "Equity" or "Index" when preceded by whitespace, else None
+    has_slash: bool
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_strike(strike_price: float) -> str:
+    """strike as written in Bloomberg and Eze tickers, cached since a book only has so many strikes"""
+    # if first digit after the decimal is 0 or 5, then round to 1 decimal place, otherwise 2 places
+    if round((strike_price - math.trunc(strike_price)), 4) in (float(0.5), float(0.0)):
+        return format(strike_price, ".1f")
+    else:
+        return format(strike_price, ".2f")
+
+
 class BaseTickerFormat:
+    @staticmethod
+    def could_match(shape: TickerShape) -> bool:
+        """cheap prefilter, must return True for every shape this format's regex can match"""
+        return True
+
     @staticmethod
     def to_Security(regex_match) -> Security:
         raise NotImplementedError()
@@ -83,6 +161,10 @@ class OCC_Option(BaseTickerFormat):
         (?P<strike>\d{8})$                              # 8 digits for strike price
     """
 
+    @staticmethod
+    def could_match(shape):
+        return shape.length == "occ" and shape.suffix is None
+
     @staticmethod
     def to_Security(regex_match):
         return Security(
@@ -132,6 +214,10 @@ class Bloomberg_Option(BaseTickerFormat):
         (?P<bb_suffix>Equity)$              # the word 'Equity'
     """
 
+    @staticmethod
+    def could_match(shape):
+        return shape.length != "short" and shape.suffix == "Equity" and shape.has_slash
+
     @staticmethod
     def to_Security(regex_match):
         return Security(
@@ -149,16 +235,10 @@ class Bloomberg_Option(BaseTickerFormat):
 
     @staticmethod
     def to_ticker_string(s: Security) -> str:
-        # if first digit after the decimal is 0 or 5, then round to 1 decimal place, otherwise 2 places
-        if round((s.strike_price - math.trunc(s.strike_price)), 4) in (float(0.5), float(0.0)):
-            fmt = ".1f"
-        else:
-            fmt = ".2f"
-
         return (
             f"{s.root_symbol.upper()} {s.exchange} "
             f"{s.expiry_month:0>2d}/{s.expiry_day:0>2d}/{s.expiry_year:0>2d} "
-            f"{s.call_put}{format(s.strike_price, fmt)} {s.bloomberg_suffix}"
+            f"{s.call_put}{_format_strike(s.strike_price)} {s.bloomberg_suffix}"
         )
 
 
@@ -184,6 +264,10 @@ class Eze_Option(BaseTickerFormat):
         (?P<strike>\d+\.?\d+|\d+)$          # one or more digits for strike price
     """
 
+    @staticmethod
+    def could_match(shape):
+        return shape.length != "short" and shape.suffix is None and shape.has_slash
+
     @staticmethod
     def to_Security(regex_match):
         return Security(
@@ -201,16 +285,10 @@ class Eze_Option(BaseTickerFormat):
 
     @staticmethod
     def to_ticker_string(s: Security) -> str:
-        # if first digit after the decimal is 0 or 5, then round to 1 decimal place, otherwise 2 places
-        if round((s.strike_price - math.trunc(s.strike_price)), 4) in (float(0.5), float(0.0)):
-            fmt = ".1f"
-        else:
-            fmt = ".2f"
-
         return (
             f"{s.root_symbol.upper()} {s.exchange} "
             f"{s.expiry_month:0>2d}/{s.expiry_day:0>2d}/{s.expiry_year:0>2d} "
-            f"{s.call_put}{format(s.strike_price, fmt)}"
+            f"{s.call_put}{_format_strike(s.strike_price)}"
         )
 
 
@@ -222,6 +300,10 @@ class Generic_Non_Option(BaseTickerFormat):
         ^(?P<root>[a-zA-Z0-9._\-/]{1,10})$        #  ticker, 1 to 10 word characters or one of [.-/]
     """
 
+    @staticmethod
+    def could_match(shape):
+        return shape.length == "short" and shape.suffix is None
+
     @staticmethod
     def to_Security(regex_match):
         sec = Security(
@@ -257,13 +339,17 @@ class Bloomberg_Equity(BaseTickerFormat):
         (?P<bb_suffix>Equity)$              # the word 'Equity'
     """
 
+    @staticmethod
+    def could_match(shape):
+        return shape.suffix == "Equity"
+
     @staticmethod
     def to_Security(regex_match):
         return Security(
             asset_class=ASSET_CLASS.Equity,
             format_type=FORMAT_TYPES.Bloomberg,
             bloomberg_suffix="Equity",
-            exchange=regex_match.groupdict().get("exch", "US"),
+            exchange=regex_match.groupdict()["exch"] or "US",  # exchange is optional
             root_symbol=regex_match.groupdict()["root"],
         )
 
@@ -282,6 +368,10 @@ class Bloomberg_Index(BaseTickerFormat):
         (?P<bb_suffix>Index)$               # the word 'Index'
     """
 
+    @staticmethod
+    def could_match(shape):
+        return shape.suffix == "Index"
+
     @staticmethod
     def to_Security(regex_match):
         return Security(
@@ -332,12 +422,71 @@ FORMATS_FOR_REBUILD = {
 }
 
 
-def _parse_ticker(ticker: str) -> Security:
+def _ticker_shape(ticker: str) -> TickerShape:
+    # the regexes end in $, which also matches right before a single trailing newline, so measure without it
+    body = ticker[:-1] if ticker.endswith("\n") else ticker
+
+    n = len(body)
+    if 1 <= n <= 10:
+        length = "short"
+    elif n == 21:
+        length = "occ"
+    else:
+        length = "other"
+
+    # every format with a suffix has whitespace right before it, which Generic_Non_Option can never match
+    if body.endswith("Equity") and body[-7:-6].isspace():
+        suffix = "Equity"
+    elif body.endswith("Index") and body[-6:-5].isspace():
+        suffix = "Index"
+    else:
+        suffix = None
+
+    return TickerShape(length, suffix, "/" in body)
+
+
+def _compile_format(fmt) -> re.Pattern:
+    return re.compile(fmt.regex_string, re.VERBOSE)
+
+
+def _build_dispatch_table(formats, compile_format=_compile_format) -> dict:
+    """
+    Precompute, for every possible TickerShape, which formats could match a ticker of that shape, in
+    FORMATS_TO_SEARCH order and with their regexes already compiled (by compile_format). Most shapes map to
+    a single format, the rest list every format that could be ambiguous with it so "exactly one match" can
+    still be checked.
+    """
+    compiled = {fmt: compile_format(fmt) for fmt in formats}
+    all_shapes = itertools.product(
+        ("short", "occ", "other"), ("Equity", "Index", None), (True, False)
+    )
+    return {
+        shape: tuple((fmt, compiled[fmt]) for fmt in formats if fmt.could_match(shape))
+        for shape in itertools.starmap(TickerShape, all_shapes)
+    }
+
+
+# built once at import from FORMATS_TO_SEARCH
+_DISPATCH_TABLE = _build_dispatch_table(FORMATS_TO_SEARCH)
+
+
+def _match_ticker(ticker: str, candidates=None) -> list:
+    """
+    Return a (format, regex match) pair for every format in FORMATS_TO_SEARCH whose regex matches.
+    candidates is the dispatch table entry for the ticker's shape, when the caller already has it.
+    """
+    if candidates is None:
+        candidates = _DISPATCH_TABLE[_ticker_shape(ticker)]
     matching_formats = []
-    for fmt in FORMATS_TO_SEARCH:
-        match = re.match(fmt.regex_string, ticker, re.VERBOSE)
+    for fmt, pattern in candidates:
+        match = pattern.match(ticker)
         if match:
             matching_formats.append((fmt, match))
+    return matching_formats
+
+
+def _parse_ticker(ticker: str) -> Security:
+    matching_formats = _match_ticker(ticker)
 
     if len(matching_formats) == 1:
         return matching_formats[0][0].to_Security(matching_formats[0][1])
@@ -345,25 +494,621 @@ def _parse_ticker(ticker: str) -> Security:
         return f"Could not find exactly one regex match for ticker: {ticker}"
 
 
-@lru_cache(maxsize=128, typed=False)
-def parse_ticker(ticker: str) -> dict:
-    logging.info(f"Parsing ticker: {ticker}")
-    sec = _parse_ticker(ticker)
-    if isinstance(sec, Security):
-        d = dict(sec.__dict__)
-        d["ticker_original"] = ticker
-        d["ticker_occ"] = FORMATS_FOR_REBUILD[sec.asset_class][FORMAT_TYPES.OCC].to_ticker_string(
-            sec
-        )
-        d["ticker_bloomberg"] = FORMATS_FOR_REBUILD[sec.asset_class][
-            FORMAT_TYPES.Bloomberg
-        ].to_ticker_string(sec)
-        d["ticker_eze"] = FORMATS_FOR_REBUILD[sec.asset_class][FORMAT_TYPES.Eze].to_ticker_string(
-            sec
-        )
+class PARSE_ERROR:
+    NoMatch = "NoMatch"
+    Ambiguous = "Ambiguous"
+
+
+class TickerError(NamedTuple):
+    """Result for a ticker that could not be parsed, returned by the batch functions instead of raising"""
+
+    ticker_original: str
+    reason: str  # one of PARSE_ERROR
+
+    @property
+    def outcome(self) -> str:
+        """what METRICS counts this result under"""
+        return self.reason
+
+    @property
+    def error_message(self) -> str:
+        return f"Could not find exactly one regex match for ticker: {self.ticker_original}"
+
+    def to_dict(self) -> dict:
+        """same shape as the error dict returned by parse_ticker"""
+        return {"ticker_original": self.ticker_original, "error_message": self.error_message}
+
+
+class LatencyHistogram:
+    """
+    Counts of durations in power of two buckets of nanoseconds, from under 1 microsecond up to about a
+    second (anything slower lands in the last bucket). Cheap enough to update for every ticker.
+    """
+
+    # bucket i counts durations below 2 ** (i + FIRST_BUCKET_BITS) ns
+    FIRST_BUCKET_BITS = 10
+    BUCKETS = 21
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.total_ns = 0
+
+    def observe(self, ns: int):
+        bucket = ns.bit_length() - self.FIRST_BUCKET_BITS
+        if bucket < 0:
+            bucket = 0
+        elif bucket >= self.BUCKETS:
+            bucket = self.BUCKETS - 1
+        self.counts[bucket] += 1
+        self.total_ns += ns
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, q: float) -> Optional[int]:
+        """upper bound in ns of the bucket holding the q-th quantile (0 < q <= 1), None when empty"""
+        rank = q * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return 2 ** (bucket + self.FIRST_BUCKET_BITS)
+        return None
+
+    def to_dict(self) -> dict:
+        count = self.count
+        return {
+            "count": count,
+            "mean_ns": self.total_ns // count if count else None,
+            "p50_ns": self.percentile(0.5),
+            "p90_ns": self.percentile(0.9),
+            "p99_ns": self.percentile(0.99),
+            # upper bound in ns of each non empty bucket, the last one is open ended
+            "buckets": {
+                2 ** (bucket + self.FIRST_BUCKET_BITS): n
+                for bucket, n in enumerate(self.counts)
+                if n
+            },
+        }
+
+
+class ParseMetrics:
+    """
+    Counters and latency histograms for the parse hot path, dumped by metrics_snapshot().
+
+    Every ticker looked up, whether answered from the cache or parsed, is counted under the name of the
+    format that matched it, or under PARSE_ERROR.NoMatch / PARSE_ERROR.Ambiguous. Only the tickers actually
+    parsed are timed, and renderings are timed per target format. Updates are not locked, so with several
+    threads counts can be very slightly low, which is fine for monitoring and keeps the hot path cheap.
+
+    Instead of logging every parsed ticker, one in log_every is logged (0 turns that off).
+    """
+
+    def __init__(self, log_every=1000):
+        self.log_every = log_every
+        self.reset()
+
+    def reset(self):
+        self.outcomes = collections.defaultdict(int)  # cheaper to increment than a Counter
+        self.parse_latency = LatencyHistogram()
+        self.render_latency = collections.defaultdict(LatencyHistogram)
+        self._parsed = 0
+
+    def record_outcome(self, outcome: str, n=1):
+        self.outcomes[outcome] += n
+
+    def record_parse(self, ticker: str, outcome: str, ns: int):
+        self.parse_latency.observe(ns)
+        self._parsed += 1
+        if self.log_every and self._parsed % self.log_every == 0:
+            logging.info(f"Parsed ticker {ticker!r} as {outcome} ({self._parsed} parsed so far)")
+
+    def record_render(self, target_format: str, ns: int):
+        self.render_latency[target_format].observe(ns)
+
+    def to_dict(self) -> dict:
+        return {
+            "parsed": self._parsed,
+            "formats": {
+                fmt.__name__: self.outcomes.get(fmt.__name__, 0) for fmt in FORMATS_TO_SEARCH
+            },
+            "errors": {
+                reason: self.outcomes.get(reason, 0)
+                for reason in (PARSE_ERROR.NoMatch, PARSE_ERROR.Ambiguous)
+            },
+            "parse_latency": self.parse_latency.to_dict(),
+            "render_latency": {
+                fmt: histogram.to_dict() for fmt, histogram in self.render_latency.items()
+            },
+        }
+
+
+METRICS = ParseMetrics()
+
+
+def metrics_snapshot() -> dict:
+    """METRICS and the PARSE_CACHE statistics as a JSON serializable dict"""
+    stats = PARSE_CACHE.stats()
+    snapshot = METRICS.to_dict()
+    snapshot["cache"] = dict(stats._asdict(), hit_rate=stats.hit_rate)
+    return snapshot
+
+
+# key of each target format's rendering in the parse_ticker dict
+RENDERED_KEYS = {
+    FORMAT_TYPES.OCC: "ticker_occ",
+    FORMAT_TYPES.Bloomberg: "ticker_bloomberg",
+    FORMAT_TYPES.Eze: "ticker_eze",
+}
+RENDER_FORMATS = tuple(RENDERED_KEYS)
+
+
+# format each Security came from, known from its fields so results read back from a store have it too
+_FORMAT_NAMES = {
+    (FORMAT_TYPES.OCC, ASSET_CLASS.Option): OCC_Option.__name__,
+    (FORMAT_TYPES.Bloomberg, ASSET_CLASS.Option): Bloomberg_Option.__name__,
+    (FORMAT_TYPES.Eze, ASSET_CLASS.Option): Eze_Option.__name__,
+    (FORMAT_TYPES.Bloomberg, ASSET_CLASS.Equity): Bloomberg_Equity.__name__,
+    (FORMAT_TYPES.Bloomberg, ASSET_CLASS.Index): Bloomberg_Index.__name__,
+}
+
+
+class ParsedTicker:
+    """
+    A ticker that parsed, as kept in the parse cache. Renderings into the target formats are only done the
+    first time each one is asked for, and then remembered.
+    """
+
+    __slots__ = ("ticker_original", "security", "_rendered")
+
+    def __init__(self, ticker_original: str, security: Security, rendered=None):
+        self.ticker_original = ticker_original
+        self.security = security
+        self._rendered = rendered if rendered is not None else {}
+
+    def render(self, target_format: str) -> str:
+        try:
+            return self._rendered[target_format]
+        except KeyError:
+            start = time.perf_counter_ns()
+            s = self.security
+            rendered = FORMATS_FOR_REBUILD[s.asset_class][target_format].to_ticker_string(s)
+            self._rendered[target_format] = rendered
+            METRICS.record_render(target_format, time.perf_counter_ns() - start)
+            return rendered
+
+    @property
+    def outcome(self) -> str:
+        """name of the format the ticker was parsed with, what METRICS counts this result under"""
+        s = self.security
+        if s.format_type == FORMAT_TYPES.Generic:
+            return Generic_Non_Option.__name__
+        return _FORMAT_NAMES[s.format_type, s.asset_class]
+
+    def to_dict(self, formats=RENDER_FORMATS) -> dict:
+        """the parse_ticker dict, with renderings for the given formats only"""
+        d = self.security.to_dict()
+        d["ticker_original"] = self.ticker_original
+        for target_format in formats:
+            d[RENDERED_KEYS[target_format]] = self.render(target_format)
         return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ParsedTicker":
+        """inverse of to_dict, keeping whatever renderings d has"""
+        security = Security(**{key: d[key] for key in Security.__slots__ if key in d})
+        rendered = {fmt: d[key] for fmt, key in RENDERED_KEYS.items() if key in d}
+        return cls(d["ticker_original"], security, rendered)
+
+    def __repr__(self):
+        return f"{self.__class__.__qualname__}({self.ticker_original!r}, {self.security!r})"
+
+
+def check_formats(formats) -> tuple:
+    """validate a selection of target formats, as a tuple, raising ValueError for unknown ones"""
+    formats = tuple(formats)
+    unknown = [fmt for fmt in formats if fmt not in RENDERED_KEYS]
+    if unknown:
+        raise ValueError(f"Unknown formats {unknown}, expected some of {list(RENDER_FORMATS)}")
+    return formats
+
+
+def _parse_one(ticker: str, candidates=None):
+    """Security for the ticker, or a TickerError saying why it could not be parsed"""
+    start = time.perf_counter_ns()
+    matching_formats = _match_ticker(ticker, candidates)
+    if len(matching_formats) == 1:
+        fmt, match = matching_formats[0]
+        parsed = fmt.to_Security(match)
+        outcome = fmt.__name__
+    elif matching_formats:
+        parsed = TickerError(ticker, PARSE_ERROR.Ambiguous)
+        outcome = PARSE_ERROR.Ambiguous
     else:
-        return {"ticker_original": ticker, "error_message": sec}
+        parsed = TickerError(ticker, PARSE_ERROR.NoMatch)
+        outcome = PARSE_ERROR.NoMatch
+    METRICS.record_parse(ticker, outcome, time.perf_counter_ns() - start)
+    return parsed
+
+
+def _parse_distinct(tickers) -> dict:
+    """
+    Parse each distinct ticker once, returning {ticker: Security or TickerError}. Tickers are grouped by
+    shape first so each group is matched against the same precompiled candidate formats.
+    """
+    groups = {}
+    for ticker in dict.fromkeys(tickers):
+        groups.setdefault(_ticker_shape(ticker), []).append(ticker)
+
+    parsed = {}
+    for shape, group in groups.items():
+        candidates = _DISPATCH_TABLE[shape]
+        for ticker in group:
+            parsed[ticker] = _parse_one(ticker, candidates)
+    return parsed
+
+
+def _classify(ticker: str, candidates=None) -> str:
+    """
+    Name of the one format matching ticker, or PARSE_ERROR.NoMatch / PARSE_ERROR.Ambiguous. Runs the same
+    regexes as _parse_one, but builds no Security.
+    """
+    if candidates is None:
+        candidates = _DISPATCH_TABLE[_ticker_shape(ticker)]
+    outcome = PARSE_ERROR.NoMatch
+    for fmt, pattern in candidates:
+        if pattern.match(ticker) is not None:
+            if outcome != PARSE_ERROR.NoMatch:
+                return PARSE_ERROR.Ambiguous
+            outcome = fmt.__name__
+    return outcome
+
+
+def validate_tickers(tickers) -> list:
+    """
+    Reason code for each ticker, in input order: the name of the format it would be parsed as (like
+    "OCC_Option"), or PARSE_ERROR.NoMatch / PARSE_ERROR.Ambiguous for tickers parse_ticker would reject.
+    Meant for screening input before converting it, so nothing is parsed into a Security, rendered or
+    cached. Each distinct ticker is checked once.
+    """
+    tickers = list(tickers)
+    groups = {}
+    for ticker in dict.fromkeys(tickers):
+        groups.setdefault(_ticker_shape(ticker), []).append(ticker)
+
+    codes = {}
+    for shape, group in groups.items():
+        candidates = _DISPATCH_TABLE[shape]
+        for ticker in group:
+            codes[ticker] = _classify(ticker, candidates)
+    return [codes[ticker] for ticker in tickers]
+
+
+def valid_mask(tickers) -> list:
+    """True for each ticker that parses, see validate_tickers"""
+    errors = (PARSE_ERROR.NoMatch, PARSE_ERROR.Ambiguous)
+    return [code not in errors for code in validate_tickers(tickers)]
+
+
+def _to_result(ticker: str, parsed):
+    """what the parse cache stores for a ticker: a ParsedTicker, or its TickerError"""
+    return parsed if isinstance(parsed, TickerError) else ParsedTicker(ticker, parsed)
+
+
+class CACHE_POLICY:
+    LRU = "LRU"
+    Admission = "Admission"
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    store_hits: int  # misses of the in-memory cache found in its store
+    misses: int
+    evictions: int  # entries removed to make room, including expired_evictions
+    expired_evictions: int  # evictions of options that had already expired
+    rejections: int  # new entries not admitted by the Admission policy
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """fraction of lookups answered from memory"""
+        lookups = self.hits + self.store_hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ParseCache:
+    """
+    Bounded cache of parse results keyed by the original ticker, used by parse_ticker and parse_tickers.
+
+    policy is one of CACHE_POLICY. LRU always makes room for a new entry by evicting the least recently used
+    one. Admission only does so if the new ticker has been looked up more often, recently, than that least
+    recently used entry, so one-off tickers in a large batch cannot flush the tickers that are used all day.
+
+    With expiry_aware, options whose expiry date is already past are evicted before anything else.
+
+    store is an optional second level, like symbol_store.SymbolStore, with get(ticker), put(ticker, result)
+    and delete(tickers) methods. Misses are looked up there before giving up, and new results are written
+    to it.
+
+    Cached results are ParsedTicker or TickerError objects, which are never modified once rendered. The
+    public functions build a new dict from them for every caller, so callers are free to modify those.
+    """
+
+    def __init__(self, maxsize=65536, policy=CACHE_POLICY.LRU, expiry_aware=False, store=None):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+        if policy not in (CACHE_POLICY.LRU, CACHE_POLICY.Admission):
+            raise ValueError(f"Unknown cache policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.expiry_aware = expiry_aware
+        self.store = store
+        self._lock = threading.Lock()
+        self._data = collections.OrderedDict()
+        self._expiries = []  # heap of (expiry date, ticker), only filled when expiry_aware
+        # bumped by invalidate, so results parsed before an invalidation are not cached after it
+        self.generation = 0
+        self._frequency = collections.Counter()  # recent lookups per ticker, only used by Admission
+        self._lookups = 0
+        self._hits = self._store_hits = self._misses = 0
+        self._evictions = self._expired_evictions = self._rejections = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, ticker):
+        return ticker in self._data
+
+    def get(self, ticker: str):
+        """the cached ParsedTicker or TickerError for ticker, or None"""
+        with self._lock:
+            if self.policy == CACHE_POLICY.Admission:
+                self._record_lookup(ticker)
+            result = self._data.get(ticker)
+            if result is not None:
+                self._hits += 1
+                self._data.move_to_end(ticker)
+            elif self.store is None:
+                self._misses += 1
+                return None
+
+        if result is None:
+            generation = self.generation
+            result = self.store.get(ticker)
+            with self._lock:
+                if result is None:
+                    self._misses += 1
+                    return None
+                self._store_hits += 1
+                if generation == self.generation:
+                    self._insert(ticker, result)
+        return result
+
+    def put(self, ticker: str, result, generation=None):
+        """
+        add a result to the cache and its store. generation is the one the result was parsed in, when the
+        result is from an invalidated generation it is dropped rather than cached.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._insert(ticker, result)
+        if self.store is not None:
+            self.store.put(ticker, result)
+            if generation is not None and generation != self.generation:
+                # invalidated while it was being stored, the invalidation may have missed it
+                self.store.delete([ticker])
+
+    def preload(self, items) -> int:
+        """add (ticker, result) pairs to the in-memory cache without writing them to the store"""
+        count = 0
+        with self._lock:
+            for ticker, result in items:
+                self._insert(ticker, result)
+                count += 1
+        return count
+
+    def invalidate(self, tickers) -> int:
+        """drop tickers from the cache and from its store, returns how many were cached in memory"""
+        tickers = list(tickers)
+        with self._lock:
+            self.generation += 1
+            removed = sum(self._data.pop(ticker, None) is not None for ticker in tickers)
+        if self.store is not None:
+            self.store.delete(tickers)
+        return removed
+
+    def clear(self):
+        """empty the in-memory cache, the store is left alone"""
+        with self._lock:
+            self._data.clear()
+            self._expiries.clear()
+            self._frequency.clear()
+            self._lookups = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            store_hits=self._store_hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expired_evictions=self._expired_evictions,
+            rejections=self._rejections,
+            size=len(self._data),
+            maxsize=self.maxsize,
+        )
+
+    def _insert(self, ticker, result):
+        """add to the in-memory cache, the caller holds the lock"""
+        if ticker in self._data:
+            self._data[ticker] = result
+            self._data.move_to_end(ticker)
+            return
+        if len(self._data) >= self.maxsize and not self._make_room(ticker):
+            self._rejections += 1
+            return
+        self._data[ticker] = result
+        if self.expiry_aware:
+            expiry = _expiry_date(result)
+            if expiry is not None:
+                heapq.heappush(self._expiries, (expiry, ticker))
+                # evicted and invalidated tickers are left in the heap, drop them once they pile up
+                if len(self._expiries) > 2 * self.maxsize:
+                    self._rebuild_expiries()
+
+    def _rebuild_expiries(self):
+        """the heap of the options in the in-memory cache only, the caller holds the lock"""
+        expiries = ((_expiry_date(result), ticker) for ticker, result in self._data.items())
+        self._expiries = [(expiry, ticker) for expiry, ticker in expiries if expiry is not None]
+        heapq.heapify(self._expiries)
+
+    def _record_lookup(self, ticker):
+        self._frequency[ticker] += 1
+        self._lookups += 1
+        # age the counts so they reflect recent traffic, this also keeps the counter bounded
+        if self._lookups >= 10 * self.maxsize:
+            self._frequency = collections.Counter(
+                {t: n // 2 for t, n in self._frequency.items() if n > 1}
+            )
+            self._lookups = 0
+
+    def _make_room(self, ticker) -> bool:
+        """evict one entry to make room for ticker, returns False if ticker should not be added instead"""
+        if self.expiry_aware:
+            today = datetime.date.today()
+            while self._expiries and self._expiries[0][0] < today:
+                _, expired = heapq.heappop(self._expiries)
+                if expired in self._data:
+                    del self._data[expired]
+                    self._evictions += 1
+                    self._expired_evictions += 1
+                    return True
+
+        victim = next(iter(self._data))
+        if (
+            self.policy == CACHE_POLICY.Admission
+            and self._frequency[ticker] <= self._frequency[victim]
+        ):
+            return False
+        del self._data[victim]
+        self._evictions += 1
+        return True
+
+
+def _expiry_date(result) -> Optional[datetime.date]:
+    if not isinstance(result, ParsedTicker) or result.security.expiry_year is None:
+        return None
+    s = result.security
+    try:
+        return datetime.date(2000 + s.expiry_year, s.expiry_month, s.expiry_day)
+    except ValueError:
+        return None
+
+
+PARSE_CACHE = ParseCache()
+
+
+def configure_parse_cache(**kwargs) -> ParseCache:
+    """Replace PARSE_CACHE with a new, empty ParseCache(**kwargs)"""
+    global PARSE_CACHE
+    PARSE_CACHE = ParseCache(**kwargs)
+    return PARSE_CACHE
+
+
+def classified_tickers(symbols) -> list:
+    """
+    The tickers whose parse result depends on how each of symbols is classified: the plain ticker itself,
+    and the same with the trailing newline the regexes allow.
+    """
+    return [ticker for symbol in symbols for ticker in (symbol, symbol + "\n")]
+
+
+def set_reference_data(index=None, cash=None) -> frozenset:
+    """
+    Replace INDEX_LIST and/or CASH_LIST. Only the cached results of tickers whose classification changes
+    are dropped, from PARSE_CACHE and its store, and results of parses still running with the old lists are
+    not cached (see ParseCache.generation). Returns the symbols whose classification changed.
+    """
+    global INDEX_LIST, CASH_LIST
+    index = INDEX_LIST if index is None else frozenset(index)
+    cash = CASH_LIST if cash is None else frozenset(cash)
+    changed = (index ^ INDEX_LIST) | (cash ^ CASH_LIST)
+    INDEX_LIST, CASH_LIST = index, cash
+    if changed:
+        PARSE_CACHE.invalidate(classified_tickers(changed))
+    return changed
+
+
+def _lookup(ticker: str):
+    """ParsedTicker or TickerError for one ticker, from PARSE_CACHE or parsed and added to it"""
+    cache = PARSE_CACHE
+    generation = cache.generation
+    result = cache.get(ticker)
+    if result is None:
+        result = _to_result(ticker, _parse_one(ticker))
+        cache.put(ticker, result, generation)
+    METRICS.record_outcome(result.outcome)
+    return result
+
+
+def _lookup_many(tickers) -> dict:
+    """
+    {ticker: ParsedTicker or TickerError} for each distinct ticker, only parsing the ones not cached. The
+    outcome of a ticker is counted in METRICS once for each time it is in tickers.
+    """
+    cache = PARSE_CACHE
+    generation = cache.generation
+    counts = collections.Counter(tickers)
+    results = {}
+    missing = []
+    for ticker in counts:
+        result = cache.get(ticker)
+        if result is None:
+            missing.append(ticker)
+        else:
+            results[ticker] = result
+    logging.info(f"Looked up {len(results) + len(missing)} tickers, {len(missing)} not cached")
+
+    for ticker, parsed in _parse_distinct(missing).items():
+        results[ticker] = result = _to_result(ticker, parsed)
+        cache.put(ticker, result, generation)
+
+    metrics = METRICS
+    for ticker, n in counts.items():
+        metrics.record_outcome(results[ticker].outcome, n)
+    return results
+
+
+def parse_ticker(ticker: str, formats=RENDER_FORMATS) -> dict:
+    """
+    All fields of the parsed ticker plus its renderings into each of formats (OCC, Bloomberg and Eze by
+    default), or a dict with an error_message if it could not be parsed.
+    """
+    result = _lookup(ticker)
+    if isinstance(result, TickerError):
+        return result.to_dict()
+    return result.to_dict(formats)
+
+
+def parse_tickers(tickers, formats=RENDER_FORMATS) -> list:
+    """
+    Batch version of parse_ticker. Returns one result per input ticker, in input order: the parse_ticker
+    dict for tickers that parse, a TickerError for those that do not.
+
+    Each distinct ticker is looked up in PARSE_CACHE once, and only the ones not found there are parsed.
+    Every row gets its own copy of the result dict.
+    """
+    tickers = list(tickers)
+    results = {
+        ticker: result if isinstance(result, TickerError) else result.to_dict(formats)
+        for ticker, result in _lookup_many(tickers).items()
+    }
+    return [
+        result if isinstance(result, TickerError) else dict(result)
+        for result in map(results.__getitem__, tickers)
+    ]
 
 
 class RegexMatchNotFoundException(Exception):
@@ -372,8 +1117,22 @@ class RegexMatchNotFoundException(Exception):
 
 def convert_ticker(ticker: str, target_format: str) -> str:
     fmt = getattr(FORMAT_TYPES, target_format)
-    sec = _parse_ticker(ticker)
-    if isinstance(sec, Security):
-        return FORMATS_FOR_REBUILD[sec.asset_class][fmt].to_ticker_string(sec)
+    result = _lookup(ticker)
+    if isinstance(result, ParsedTicker):
+        return result.render(fmt)
     else:
         raise RegexMatchNotFoundException(f"No regex matches found for: {ticker}")
+
+
+def convert_tickers(tickers, target_format: str) -> list:
+    """
+    Batch version of convert_ticker. Returns one result per input ticker, in input order: the converted
+    ticker string, or a TickerError for tickers that could not be parsed.
+    """
+    fmt = getattr(FORMAT_TYPES, target_format)
+    tickers = list(tickers)
+    converted = {
+        ticker: result if isinstance(result, TickerError) else result.render(fmt)
+        for ticker, result in _lookup_many(tickers).items()
+    }
+    return [converted[ticker] for ticker in tickers]
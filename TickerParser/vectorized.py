@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Column-at-a-time decoding and rendering of option tickers with NumPy, for files with millions of rows
+where parsing or rendering one ticker at a time through ticker_parser is too slow.
+
+Requires numpy, which is not needed by the rest of the package.
+"""
+
+import datetime
+from typing import NamedTuple
+
+import numpy as np
+
+try:
+    from . import ticker_parser as tp
+except ImportError:  # imported as a top level module, like the tests do
+    import ticker_parser as tp
+
+OCC_LENGTH = 21
+
+# powers of ten for turning the 8 strike digits into an integer number of thousandths
+_STRIKE_WEIGHTS = 10 ** np.arange(7, -1, -1, dtype=np.int64)
+
+
+class OCCColumns(NamedTuple):
+    """
+    Decoded OCC symbols, one array per Security field plus a validity mask. Rows that are not a well formed
+    OCC symbol have valid=False, an empty root and call_put, zero dates and a NaN strike.
+    """
+
+    root_symbol: np.ndarray  # unicode, padding removed
+    expiry_year: np.ndarray  # int16, 2 digit year
+    expiry_month: np.ndarray  # int16
+    expiry_day: np.ndarray  # int16
+    call_put: np.ndarray  # unicode, single character as written in the symbol
+    strike_price: np.ndarray  # float64
+    valid: np.ndarray  # bool
+
+
+def _as_byte_matrix(symbols, record_size):
+    """
+    View the input as an (n, 21) uint8 matrix plus a mask of rows that had the right length and were ASCII.
+    Only str/bytes arrays need a copy, bytes buffers are viewed in place.
+    """
+    if isinstance(symbols, (bytes, bytearray, memoryview)):
+        buf = np.frombuffer(symbols, dtype=np.uint8)
+        record_size = record_size or OCC_LENGTH
+        if record_size < OCC_LENGTH:
+            raise ValueError(f"record_size must be at least {OCC_LENGTH}, got {record_size}")
+        # the last record may be missing its trailing separator
+        n = (len(buf) + record_size - OCC_LENGTH) // record_size
+        if n * record_size > len(buf):
+            buf = np.concatenate([buf, np.zeros(n * record_size - len(buf), dtype=np.uint8)])
+        matrix = np.lib.stride_tricks.as_strided(
+            buf, shape=(n, OCC_LENGTH), strides=(record_size, 1), writeable=False
+        )
+        return matrix, np.ones(n, dtype=bool)
+
+    arr = np.asarray(symbols)
+    if arr.ndim != 1:
+        arr = arr.ravel()
+
+    if arr.dtype.kind == "S":
+        lengths = np.char.str_len(arr)
+        fixed = arr.astype(f"S{OCC_LENGTH}")
+        matrix = fixed.view(np.uint8).reshape(len(arr), OCC_LENGTH)
+        return matrix, lengths == OCC_LENGTH
+
+    if arr.dtype.kind != "U":
+        arr = arr.astype(str)
+    lengths = np.char.str_len(arr) if len(arr) else np.zeros(0, dtype=np.int64)
+    codepoints = arr.astype(f"U{OCC_LENGTH}").view(np.uint32).reshape(len(arr), OCC_LENGTH)
+    ok = (lengths == OCC_LENGTH) & (codepoints < 128).all(axis=1)
+    return codepoints.astype(np.uint8), ok
+
+
+def decode_occ(symbols, record_size=None) -> OCCColumns:
+    """
+    Decode many OCC symbols (see ticker_parser.OCC_Option) at once using their fixed offsets:
+    6 characters of space padded root, yymmdd, C or P and an 8 digit strike in thousandths.
+
+    symbols is either a sequence or NumPy array of str/bytes, or a bytes-like buffer of back to back
+    records. In a buffer, each record is record_size bytes long (default 21), so newline terminated
+    records use record_size=22.
+
+    Only ASCII symbols are recognised, anything else is flagged invalid rather than raising.
+    """
+    matrix, valid = _as_byte_matrix(symbols, record_size)
+
+    root = matrix[:, 0:6]
+    dates = matrix[:, 6:12]
+    call_put = matrix[:, 12]
+    strike = matrix[:, 13:21]
+
+    is_letter = ((root | 0x20) >= ord("a")) & ((root | 0x20) <= ord("z"))
+    valid &= (is_letter | (root == ord(" "))).all(axis=1)
+    valid &= ((dates >= ord("0")) & (dates <= ord("9"))).all(axis=1)
+    valid &= np.isin(call_put, np.frombuffer(b"CcPp", dtype=np.uint8))
+    valid &= ((strike >= ord("0")) & (strike <= ord("9"))).all(axis=1)
+
+    digits = dates.astype(np.int16) - ord("0")
+    expiry_year = np.where(valid, digits[:, 0] * 10 + digits[:, 1], 0).astype(np.int16)
+    expiry_month = np.where(valid, digits[:, 2] * 10 + digits[:, 3], 0).astype(np.int16)
+    expiry_day = np.where(valid, digits[:, 4] * 10 + digits[:, 5], 0).astype(np.int16)
+
+    strike_thousandths = (strike.astype(np.int64) - ord("0")) @ _STRIKE_WEIGHTS
+    strike_price = np.where(valid, strike_thousandths / 1000, np.nan)
+
+    # blank invalid rows before decoding, they may hold bytes that are not ASCII
+    root = np.where(valid[:, None], root, np.uint8(ord(" ")))
+    root_symbol = np.char.strip(root.view("S6").ravel()).astype("U6")
+    call_put_str = np.where(valid, call_put, np.uint8(0)).view("S1").astype("U1")
+
+    return OCCColumns(
+        root_symbol=root_symbol,
+        expiry_year=expiry_year,
+        expiry_month=expiry_month,
+        expiry_day=expiry_day,
+        call_put=call_put_str,
+        strike_price=strike_price,
+        valid=valid,
+    )
+
+
+# the parts of an option ticker in each target format: root (and exchange), expiry date, call/put, strike,
+# then a fixed suffix. render_options and render_option_chain format each distinct value of a part once.
+RENDERED_SUFFIX = {
+    tp.FORMAT_TYPES.OCC: "",
+    tp.FORMAT_TYPES.Bloomberg: " Equity",
+    tp.FORMAT_TYPES.Eze: "",
+}
+
+
+def _root_parts(roots: np.ndarray, target_format: str, exchange: str) -> np.ndarray:
+    roots = np.char.upper(roots.astype(str))
+    if target_format == tp.FORMAT_TYPES.OCC:
+        return np.char.ljust(roots, 6)
+    return np.char.add(roots, f" {exchange} ")
+
+
+def _date_parts(
+    year: np.ndarray, month: np.ndarray, day: np.ndarray, target_format: str
+) -> np.ndarray:
+    if target_format == tp.FORMAT_TYPES.OCC:
+        return np.char.zfill((year * 10000 + month * 100 + day).astype(str), 6)
+    mm, dd, yy = (np.char.zfill(part.astype(str), 2) for part in (month, day, year))
+    return np.char.add(
+        np.char.add(np.char.add(np.char.add(mm, "/"), dd), "/"), np.char.add(yy, " ")
+    )
+
+
+def _strike_parts(strikes: np.ndarray, target_format: str) -> np.ndarray:
+    if target_format == tp.FORMAT_TYPES.OCC:
+        # same rounding as format(strike * 1000, "08.0f"), i.e. half to even
+        return np.char.zfill(np.rint(strikes * 1000).astype(np.int64).astype(str), 8)
+    return np.array([tp._format_strike(float(strike)) for strike in strikes], dtype=object)
+
+
+def _per_row(values: np.ndarray, format_distinct) -> np.ndarray:
+    """format_distinct applied to each distinct value once, then spread back over the rows"""
+    distinct, inverse = np.unique(values, return_inverse=True)
+    return np.asarray(format_distinct(distinct), dtype=object)[inverse.ravel()]
+
+
+def _check_option_format(target_format: str) -> str:
+    if target_format not in RENDERED_SUFFIX:
+        raise ValueError(
+            f"Unknown option format {target_format!r}, expected one of {list(RENDERED_SUFFIX)}"
+        )
+    return target_format
+
+
+def render_options(
+    root_symbol,
+    expiry_year,
+    expiry_month,
+    expiry_day,
+    call_put,
+    strike_price,
+    target_format: str,
+    exchange="US",
+) -> list:
+    """
+    Option tickers in target_format (OCC, Bloomberg or Eze) from columns of Security fields, the batch
+    version of the formats' to_ticker_string. Each argument is an array or sequence with one value per
+    option, or a single value used for every option. Expiry years are 2 digit years, as in Security.
+    """
+    _check_option_format(target_format)
+    root_symbol, year, month, day, call_put, strike = np.broadcast_arrays(
+        np.asarray(root_symbol),
+        np.asarray(expiry_year, dtype=np.int64),
+        np.asarray(expiry_month, dtype=np.int64),
+        np.asarray(expiry_day, dtype=np.int64),
+        np.asarray(call_put),
+        np.asarray(strike_price, dtype=np.float64),
+    )
+    roots = _per_row(root_symbol.ravel(), lambda r: _root_parts(r, target_format, exchange))
+    dates = _per_row(
+        (year * 10000 + month * 100 + day).ravel(),
+        lambda ymd: _date_parts(ymd // 10000, ymd // 100 % 100, ymd % 100, target_format),
+    )
+    strikes = _per_row(strike.ravel(), lambda s: _strike_parts(s, target_format))
+    suffix = RENDERED_SUFFIX[target_format]
+    return [
+        f"{r}{d}{cp}{s}{suffix}"
+        for r, d, cp, s in zip(roots, dates, call_put.ravel().astype(str).tolist(), strikes)
+    ]
+
+
+def render_option_chain(
+    roots, expiries, strikes, target_format: str, call_put=("C", "P"), exchange="US"
+) -> list:
+    """
+    Every combination of roots, expiries (datetime.date or (yy, mm, dd) tuples), call_put and strikes, as
+    tickers in target_format. Ordered by root, then expiry, then call_put, then strike.
+    """
+    _check_option_format(target_format)
+    ymd = np.array(
+        [
+            (e.year % 100, e.month, e.day) if isinstance(e, datetime.date) else tuple(e)
+            for e in expiries
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    root_parts = _root_parts(np.asarray(roots), target_format, exchange).tolist()
+    date_parts = _date_parts(ymd[:, 0], ymd[:, 1], ymd[:, 2], target_format).tolist()
+    strike_parts = _strike_parts(np.asarray(strikes, dtype=np.float64), target_format).tolist()
+    suffix = RENDERED_SUFFIX[target_format]
+    return [
+        f"{r}{d}{cp}{s}{suffix}"
+        for r in root_parts
+        for d in date_parts
+        for cp in call_put
+        for s in strike_parts
+    ]
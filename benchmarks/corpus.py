@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Deterministic synthetic ticker corpus for the benchmarks.
+
+A corpus is drawn from a universe of distinct instruments, each rendered in one of the formats the parser
+searches (see KINDS), plus invalid input. Rows are drawn with a skew towards the front of the universe,
+like a book where a few names make up most positions. The same (n, distinct, seed, mix) always gives the
+same corpus, on every machine and Python version.
+"""
+
+import random
+import string
+import sys
+import pathlib
+
+# hack to add the app folder to the python path, like the tests do
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import ticker_parser as tp
+
+# kind of ticker: (format used to render it, asset class)
+KINDS = {
+    "equity_generic": (tp.Generic_Non_Option, tp.ASSET_CLASS.Equity),
+    "equity_bloomberg": (tp.Bloomberg_Equity, tp.ASSET_CLASS.Equity),
+    "index_generic": (tp.Generic_Non_Option, tp.ASSET_CLASS.Index),
+    "index_bloomberg": (tp.Bloomberg_Index, tp.ASSET_CLASS.Index),
+    "cash": (tp.Generic_Non_Option, tp.ASSET_CLASS.Cash),
+    "option_occ": (tp.OCC_Option, tp.ASSET_CLASS.Option),
+    "option_bloomberg": (tp.Bloomberg_Option, tp.ASSET_CLASS.Option),
+    "option_eze": (tp.Eze_Option, tp.ASSET_CLASS.Option),
+    "invalid": (None, None),
+}
+
+# share of each kind in the universe, roughly an options heavy equity book
+DEFAULT_MIX = {
+    "equity_generic": 0.25,
+    "equity_bloomberg": 0.12,
+    "index_generic": 0.03,
+    "index_bloomberg": 0.03,
+    "cash": 0.02,
+    "option_occ": 0.22,
+    "option_bloomberg": 0.15,
+    "option_eze": 0.13,
+    "invalid": 0.05,
+}
+
+# how strongly rows favour the front of the universe, 0 draws every instrument equally often
+DEFAULT_SKEW = 0.8
+
+_STRIKE_STEPS = (0.5, 1.0, 2.5, 5.0)
+_EXCHANGES = ("US", "US", "US", "LN", "CN")
+
+
+def _root(rng: random.Random, max_len=5) -> str:
+    return "".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, max_len)))
+
+
+def _option(rng: random.Random, fmt) -> str:
+    step = rng.choice(_STRIKE_STEPS)
+    security = tp.Security(
+        fmt.format_type[0],
+        tp.ASSET_CLASS.Option,
+        _root(rng, 6 if fmt is tp.OCC_Option else 5),
+        call_put=rng.choice("CP"),
+        expiry_year=rng.randint(18, 30),
+        expiry_month=rng.randint(1, 12),
+        expiry_day=rng.randint(1, 28),
+        strike_price=step * rng.randint(1, int(1000 / step)),
+        exchange="US",
+        bloomberg_suffix="Equity",
+    )
+    return fmt.to_ticker_string(security)
+
+
+def _invalid(rng: random.Random) -> str:
+    """near misses of the real formats, so invalid input runs as many regexes as valid input does"""
+    root = _root(rng)
+    date = f"{rng.randint(18, 30)}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+    return rng.choice(
+        [
+            f"{root} {date}C{rng.randint(0, 99999999):08d}",  # OCC with the wrong padding
+            f"{root:<6}{date}X{rng.randint(0, 99999999):08d}",  # OCC without call or put
+            f"{root} US {date} C{rng.randint(1, 999)} Equity",  # Bloomberg option without slashes
+            f"{root} US Equity Index",
+            f"{root}{_root(rng)}{_root(rng)}XYZ",  # too long for a plain ticker
+            f"{root}!",
+            "",
+        ]
+    )
+
+
+def instrument(rng: random.Random, kind: str) -> str:
+    """one ticker of the given kind (a key of KINDS)"""
+    fmt, asset_class = KINDS[kind]
+    if kind == "invalid":
+        return _invalid(rng)
+    if asset_class == tp.ASSET_CLASS.Option:
+        return _option(rng, fmt)
+    if asset_class == tp.ASSET_CLASS.Index:
+        root = rng.choice(sorted(t for t in tp.INDEX_LIST if t.isalpha()))
+    elif asset_class == tp.ASSET_CLASS.Cash:
+        root = rng.choice(sorted(t for t in tp.CASH_LIST if " " not in t))
+    else:
+        root = _root(rng) + rng.choice(["", "", "", "", ".A", ".B", "/U"])
+    exchange = rng.choice(_EXCHANGES)
+    security = tp.Security(fmt.format_type, asset_class, root, exchange=exchange)
+    if fmt is tp.Bloomberg_Equity:
+        security.bloomberg_suffix = "Equity"
+        # the exchange is optional in Bloomberg equity tickers
+        if rng.random() < 0.3:
+            return f"{root} Equity"
+    elif fmt is tp.Bloomberg_Index:
+        security.bloomberg_suffix = "Index"
+    return fmt.to_ticker_string(security)
+
+
+def universe(distinct: int, seed=0, mix=DEFAULT_MIX) -> list:
+    """distinct tickers (duplicates are possible for the small index and cash lists), kinds shuffled"""
+    rng = random.Random(seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=distinct)
+    return [instrument(rng, kind) for kind in kinds]
+
+
+def generate(n: int, distinct=None, seed=0, mix=DEFAULT_MIX, skew=DEFAULT_SKEW) -> list:
+    """
+    n tickers drawn from a universe of distinct instruments (n // 10 by default), favouring the front of
+    the universe according to skew
+    """
+    if distinct is None:
+        distinct = max(1, n // 10)
+    tickers = universe(distinct, seed, mix)
+    rng = random.Random(seed + 1)
+    weights = [1 / (rank + 1) ** skew for rank in range(len(tickers))]
+    return rng.choices(tickers, weights=weights, k=n)
+
+
+def covered_formats(tickers) -> set:
+    """names of the FORMATS_TO_SEARCH classes that match at least one of the tickers"""
+    covered = set()
+    for ticker in dict.fromkeys(tickers):
+        for fmt, _ in tp._match_ticker(ticker):
+            covered.add(fmt.__name__)
+    return covered
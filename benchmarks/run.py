@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+Throughput benchmarks for the parser, compared against a stored baseline:
+
+    python benchmarks/run.py                     # run everything, compare with benchmarks/baseline.json
+    python benchmarks/run.py --only parse_ticker_cold parse_ticker_warm
+    python benchmarks/run.py --output results.json --threshold 0.25 --min-seconds 3
+    python benchmarks/run.py --save-baseline     # after a deliberate change in speed, on the baseline machine
+    python benchmarks/run.py --save-baseline --only new_benchmark    # add a new benchmark to the baseline
+
+Every benchmark runs over the same synthetic corpus (see corpus.py). "cold" benchmarks start each run with
+an empty parse cache, "warm" ones with every ticker of the corpus already cached. Each benchmark runs
+until it has taken at least --min-seconds, and is compared by its median run. The exit status is 1 if any
+benchmark is more than threshold slower per ticker than in the baseline. Baselines only mean something
+on the machine they were recorded on, so record a new one when the benchmarks move to another machine.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import pathlib
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, NamedTuple, Optional
+
+# hack to add the app folder to the python path, like the tests do
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import api
+import corpus
+import ticker_parser as tp
+
+BASELINE_PATH = pathlib.Path(__file__).parent / "baseline.json"
+# fraction slower than the baseline that counts as a regression. On the machine the baseline was recorded
+# on, the medians of unchanged code moved by up to 40% between runs, most of all for the benchmarks
+# that take the longest per ticker (http_*, parse_ticker_cold)
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_SIZE = 20_000
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_SECONDS = 1.0  # timed seconds per benchmark, so one slow run barely moves the median
+HTTP_LIST_SIZE = 500  # tickers per comma separated request
+
+
+class Benchmark(NamedTuple):
+    """run(tickers) is timed, setup(tickers) runs untimed before every run"""
+
+    run: Callable
+    setup: Optional[Callable] = None
+
+
+def _cold(tickers):
+    tp.configure_parse_cache(maxsize=tp.PARSE_CACHE.maxsize)
+    tp._format_strike.cache_clear()
+
+
+def _warm(tickers):
+    tp.parse_tickers(tickers)
+
+
+def _parse_each(tickers):
+    for ticker in tickers:
+        tp.parse_ticker(ticker)
+
+
+def _convert_each(tickers):
+    for ticker in tickers:
+        try:
+            tp.convert_ticker(ticker, tp.FORMAT_TYPES.Bloomberg)
+        except tp.RegexMatchNotFoundException:
+            pass
+
+
+def _http_single(tickers):
+    for ticker in tickers:
+        api.handle({"ticker": ticker}, {}, b"")
+
+
+def _http_list(tickers):
+    for start in range(0, len(tickers), HTTP_LIST_SIZE):
+        api.handle({"ticker": ",".join(tickers[start : start + HTTP_LIST_SIZE])}, {}, b"")
+
+
+BENCHMARKS = {
+    "parse_ticker_cold": Benchmark(_parse_each, _cold),
+    "parse_ticker_warm": Benchmark(_parse_each, _warm),
+    "convert_ticker_cold": Benchmark(_convert_each, _cold),
+    "convert_ticker_warm": Benchmark(_convert_each, _warm),
+    "parse_tickers_cold": Benchmark(tp.parse_tickers, _cold),
+    "parse_tickers_warm": Benchmark(tp.parse_tickers, _warm),
+    "convert_tickers_cold": Benchmark(lambda t: tp.convert_tickers(t, tp.FORMAT_TYPES.OCC), _cold),
+    "validate_tickers": Benchmark(tp.validate_tickers),
+    "http_single_warm": Benchmark(_http_single, _warm),
+    "http_list_warm": Benchmark(_http_list, _warm),
+}
+
+
+def _add_function_benchmark():
+    """time the Azure Functions entry point too, when azure-functions is installed"""
+    sys.path.append(str(pathlib.Path(__file__).parents[1]))
+    try:
+        import azure.functions as func
+        import TickerParser
+    except ImportError:
+        return
+
+    def http_main(tickers):
+        for ticker in tickers:
+            req = func.HttpRequest(
+                method="GET", url="/api/TickerParser", params={"ticker": ticker}, body=b""
+            )
+            TickerParser.main(req)
+
+    # the package has its own copy of ticker_parser, and so its own parse cache to warm
+    BENCHMARKS["http_main_warm"] = Benchmark(http_main, TickerParser.ticker_parser.parse_tickers)
+
+
+def _add_pandas_benchmarks():
+    """time the Series.ticker accessor against Series.map, when pandas is installed"""
+    try:
+        import pandas as pd
+        import pandas_accessor  # noqa: F401
+    except ImportError:
+        return
+
+    def series_map(tickers):
+        pd.Series(tickers).map(_convert_or_none)
+
+    BENCHMARKS["series_map_cold"] = Benchmark(series_map, _cold)
+    BENCHMARKS["series_accessor_cold"] = Benchmark(
+        lambda t: pd.Series(t).ticker.convert(tp.FORMAT_TYPES.Bloomberg), _cold
+    )
+
+
+def _convert_or_none(ticker):
+    try:
+        return tp.convert_ticker(ticker, tp.FORMAT_TYPES.Bloomberg)
+    except tp.RegexMatchNotFoundException:
+        return None
+
+
+def time_benchmark(
+    bench: Benchmark, tickers, repeat=DEFAULT_REPEAT, min_seconds=DEFAULT_MIN_SECONDS
+) -> dict:
+    """
+    Median of at least repeat runs over tickers, and of as many more as it takes for the timed runs to add
+    up to min_seconds. spread is the interquartile range of the runs relative to their median.
+    """
+    times = []
+    while len(times) < repeat or sum(times) < min_seconds:
+        if bench.setup:
+            bench.setup(tickers)
+        start = time.perf_counter()
+        bench.run(tickers)
+        times.append(time.perf_counter() - start)
+    median = statistics.median(times)
+    if len(times) > 1:
+        q1, _, q3 = statistics.quantiles(times, n=4)
+    else:
+        q1 = q3 = median
+    return {
+        "seconds": median,
+        "best_seconds": min(times),
+        "runs": len(times),
+        "spread": (q3 - q1) / median,
+        "items": len(tickers),
+        "ns_per_item": median / len(tickers) * 1e9,
+        "items_per_second": len(tickers) / median,
+    }
+
+
+def run(
+    names,
+    size=DEFAULT_SIZE,
+    distinct=None,
+    seed=0,
+    repeat=DEFAULT_REPEAT,
+    min_seconds=DEFAULT_MIN_SECONDS,
+) -> dict:
+    tickers = corpus.generate(size, distinct, seed)
+    results = {}
+    for name in names:
+        results[name] = time_benchmark(BENCHMARKS[name], tickers, repeat, min_seconds)
+        logging.info(f"{name}: {results[name]['ns_per_item']:.0f} ns per ticker")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "system": platform.system(),
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "corpus": {"size": size, "distinct": len(set(tickers)), "seed": seed},
+            "repeat": repeat,
+            "min_seconds": min_seconds,
+        },
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict) -> list:
+    """
+    (name, ratio) for every benchmark in both results and baseline, ratio being the time per ticker
+    relative to the baseline. Sorted slowest first.
+    """
+    ratios = [
+        (name, result["ns_per_item"] / baseline["results"][name]["ns_per_item"])
+        for name, result in results["results"].items()
+        if name in baseline["results"]
+    ]
+    return sorted(ratios, key=lambda pair: pair[1], reverse=True)
+
+
+def regressions(ratios, threshold=DEFAULT_THRESHOLD) -> list:
+    return [name for name, ratio in ratios if ratio > 1 + threshold]
+
+
+def _print_table(results: dict, ratios: dict, threshold: float, out=sys.stdout):
+    print(f"{'benchmark':<24}{'ns/ticker':>12}{'tickers/s':>14}{'vs baseline':>14}", file=out)
+    for name, result in results["results"].items():
+        ratio = ratios.get(name)
+        change = "" if ratio is None else f"{ratio - 1:+.1%}"
+        flag = "  REGRESSION" if ratio is not None and ratio > 1 + threshold else ""
+        print(
+            f"{name:<24}{result['ns_per_item']:>12.0f}{result['items_per_second']:>14,.0f}"
+            f"{change:>14}{flag}",
+            file=out,
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="benchmarks to run (default all)")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="tickers in the corpus")
+    parser.add_argument("--distinct", type=int, help="instruments in the corpus (default size/10)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="minimum runs")
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=DEFAULT_MIN_SECONDS,
+        help=f"minimum timed seconds per benchmark (default {DEFAULT_MIN_SECONDS})",
+    )
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"slowdown that counts as a regression (default {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store the results as the new baseline"
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    _add_function_benchmark()
+    _add_pandas_benchmarks()
+    args = build_parser().parse_args(argv)
+    names = args.only or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run(names, args.size, args.distinct, args.seed, args.repeat, args.min_seconds)
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    baseline_path = pathlib.Path(args.baseline)
+    ratios = {}
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text())
+        if baseline["meta"]["corpus"] != results["meta"]["corpus"]:
+            print("Corpus differs from the baseline, not comparing", file=sys.stderr)
+        else:
+            ratios = dict(compare(results, baseline))
+    _print_table(results, ratios, args.threshold)
+
+    if args.save_baseline:
+        if args.only and baseline_path.exists():
+            # only replace the benchmarks that were run
+            baseline = json.loads(baseline_path.read_text())
+            if baseline["meta"]["corpus"] == results["meta"]["corpus"]:
+                results["results"] = {**baseline["results"], **results["results"]}
+        baseline_path.write_text(json.dumps(results, indent=2) + "\n")
+        return 0
+    slower = regressions(ratios.items(), args.threshold)
+    if slower:
+        print(f"Slower than the baseline: {', '.join(slower)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import sys
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+import arrow_output
+import bulk
+import cli
+import ticker_parser as tp
+
+TICKERS = ["AAPL", "AAPL  180216C00170000", "bad ticker!", "SPX Index", "AAPL"]
+
+
+class TestRecordBatch:
+    def test_schema_and_order(self):
+        batch = arrow_output.record_batch(TICKERS)
+        assert batch.schema == arrow_output.SCHEMA
+        assert batch.column("ticker_original").to_pylist() == TICKERS
+
+    def test_fields(self):
+        rows = arrow_output.record_batch(TICKERS).to_pylist()
+        assert rows[1] == {
+            "ticker_original": "AAPL  180216C00170000",
+            "format_type": "OCC",
+            "asset_class": "Option",
+            "root_symbol": "AAPL",
+            "call_put": "C",
+            "expiry_year": 18,
+            "expiry_month": 2,
+            "expiry_day": 16,
+            "strike_price": 170.0,
+            "exchange": "US",
+            "bloomberg_suffix": "Equity",
+            "ticker_occ": "AAPL  180216C00170000",
+            "ticker_bloomberg": "AAPL US 02/16/18 C170.0 Equity",
+            "ticker_eze": "AAPL US 02/16/18 C170.0",
+            "error_reason": None,
+        }
+        assert rows[3]["exchange"] is None and rows[3]["ticker_eze"] == "SPX"
+
+    def test_error_row(self):
+        row = arrow_output.record_batch(TICKERS).to_pylist()[2]
+        assert row["error_reason"] == tp.PARSE_ERROR.NoMatch
+        assert all(
+            v is None for k, v in row.items() if k not in ("ticker_original", "error_reason")
+        )
+
+    def test_same_as_parse_tickers(self):
+        parsed = tp.parse_tickers(TICKERS)
+        for row, expected in zip(arrow_output.record_batch(TICKERS).to_pylist(), parsed):
+            if isinstance(expected, tp.TickerError):
+                continue
+            assert {
+                k: v for k, v in row.items() if v is not None and k != "error_reason"
+            } == expected
+
+    def test_partly_cached(self, monkeypatch):
+        monkeypatch.setattr(tp, "PARSE_CACHE", tp.ParseCache())
+        tp.parse_ticker("SPX Index")
+        tickers = ["AAPL", "SPX Index", "MSFT"]
+        assert arrow_output.record_batch(tickers).column("ticker_original").to_pylist() == tickers
+
+    def test_empty(self):
+        assert arrow_output.record_batch([]).num_rows == 0
+
+
+class TestWriters:
+    def test_parquet(self, tmp_path):
+        path = tmp_path / "out.parquet"
+        stats = arrow_output.write_parquet(TICKERS * 3, str(path), chunk_size=4)
+        assert (stats.rows, stats.errors) == (15, 3)
+        table = pq.read_table(path)
+        assert table.schema == arrow_output.SCHEMA
+        assert table.column("ticker_original").to_pylist() == TICKERS * 3
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_ipc(self, tmp_path, stream):
+        path = tmp_path / "out.arrow"
+        arrow_output.write_ipc(TICKERS, str(path), chunk_size=2, stream=stream)
+        with pa.OSFile(str(path)) as f:
+            reader = pa.ipc.open_stream(f) if stream else pa.ipc.open_file(f)
+            table = reader.read_all()
+        assert table.equals(arrow_output.to_table(TICKERS))
+
+    def test_cli_parquet(self, tmp_path):
+        src = tmp_path / "positions.csv"
+        src.write_text("id,Symbol\n" + "".join(f'{i},"{t}"\n' for i, t in enumerate(TICKERS)))
+        out = tmp_path / "out.parquet"
+        cli.main(["convert", str(src), "--column", "Symbol", "--parquet", "-o", str(out)])
+        assert pq.read_table(out).column("ticker_original").to_pylist() == TICKERS
+
+    def test_cli_no_workers(self, tmp_path):
+        src = tmp_path / "tickers.txt"
+        src.write_text("AAPL\n")
+        with pytest.raises(SystemExit):
+            cli.main(["convert", str(src), "--arrow", "-o", "-", "--workers", "2"])
+
+
+class TestReadTickers:
+    def test_lines(self):
+        assert list(bulk.read_tickers(["AAPL\r\n", "SPX Index\n"])) == ["AAPL", "SPX Index"]
+
+    def test_csv_column(self):
+        lines = ["id,Symbol\n", '1,"SPX Index"\n', "2\n"]
+        assert list(bulk.read_tickers(lines, "Symbol")) == ["SPX Index", ""]
+        assert list(bulk.read_tickers(lines[1:], "1", header=False)) == ["SPX Index", ""]
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import sys
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import ticker_parser as tp
+
+TICKERS = [
+    "AAPL  180216C00170000",
+    "AAPL",
+    "SPX Index",
+    "AAPL  180216C00170000",
+    "not a ticker!",
+    "AAPL US 02/16/18 C175.45",
+    "AAPL",
+]
+
+
+class TestParseTickers:
+    def test_same_as_parse_ticker(self):
+        results = tp.parse_tickers(TICKERS)
+        assert len(results) == len(TICKERS)
+        for ticker, result in zip(TICKERS, results):
+            if isinstance(result, tp.TickerError):
+                assert result.to_dict() == tp.parse_ticker(ticker)
+            else:
+                assert result == tp.parse_ticker(ticker)
+
+    def test_accepts_any_iterable(self):
+        assert tp.parse_tickers(iter(TICKERS)) == tp.parse_tickers(TICKERS)
+
+    def test_no_match(self):
+        (result,) = tp.parse_tickers(["not a ticker!"])
+        assert result == tp.TickerError("not a ticker!", tp.PARSE_ERROR.NoMatch)
+        assert result.error_message == tp._parse_ticker("not a ticker!")
+
+    def test_ambiguous(self, monkeypatch):
+        # a format that claims every short ticker makes plain equities ambiguous
+        class Anything(tp.BaseTickerFormat):
+            regex_string = r"^.+$"
+
+        table = tp._build_dispatch_table(tp.FORMATS_TO_SEARCH + [Anything])
+        monkeypatch.setattr(tp, "_DISPATCH_TABLE", table)
+        monkeypatch.setattr(tp, "PARSE_CACHE", tp.ParseCache())
+        (result,) = tp.parse_tickers(["AAPL"])
+        assert result.reason == tp.PARSE_ERROR.Ambiguous
+
+    def test_empty(self):
+        assert tp.parse_tickers([]) == []
+
+
+class TestConvertTickers:
+    @pytest.mark.parametrize("target_format", ["OCC", "Bloomberg", "Eze"])
+    def test_same_as_convert_ticker(self, target_format):
+        results = tp.convert_tickers(TICKERS, target_format)
+        for ticker, result in zip(TICKERS, results):
+            if isinstance(result, tp.TickerError):
+                with pytest.raises(tp.RegexMatchNotFoundException):
+                    tp.convert_ticker(ticker, target_format)
+            else:
+                assert result == tp.convert_ticker(ticker, target_format)
+
+    def test_unknown_format(self):
+        with pytest.raises(AttributeError):
+            tp.convert_tickers(TICKERS, "Reuters")
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import sys
+import json
+import time
+import pathlib
+
+# hack to add the benchmarks folder to the python path, it adds the app folder itself
+bench_path = pathlib.Path(__file__).parents[1] / "benchmarks"
+sys.path.append(str(bench_path))
+
+import corpus
+import run
+import ticker_parser as tp
+
+
+class TestCorpus:
+    def test_deterministic(self):
+        assert corpus.generate(2000, seed=3) == corpus.generate(2000, seed=3)
+        assert corpus.generate(2000, seed=3) != corpus.generate(2000, seed=4)
+
+    def test_covers_every_format(self):
+        tickers = corpus.generate(5000)
+        assert corpus.covered_formats(tickers) == {fmt.__name__ for fmt in tp.FORMATS_TO_SEARCH}
+
+    def test_mix(self):
+        results = tp.parse_tickers(corpus.generate(5000))
+        errors = sum(isinstance(r, tp.TickerError) for r in results)
+        assert 0 < errors < len(results) * 0.2
+        asset_classes = {r["asset_class"] for r in results if isinstance(r, dict)}
+        assert asset_classes == {"Equity", "Index", "Cash", "Option"}
+
+    def test_single_kind(self):
+        tickers = corpus.generate(200, mix={"option_occ": 1})
+        assert corpus.covered_formats(tickers) == {"OCC_Option"}
+
+
+class TestRun:
+    def test_results(self):
+        results = run.run(
+            ["parse_tickers_cold", "http_list_warm"], size=500, repeat=1, min_seconds=0
+        )
+        assert set(results["results"]) == {"parse_tickers_cold", "http_list_warm"}
+        assert results["results"]["parse_tickers_cold"]["items"] == 500
+        assert results["meta"]["corpus"]["size"] == 500
+
+    def test_min_seconds(self):
+        calls = []
+        result = run.time_benchmark(run.Benchmark(calls.append), ["AAPL"], repeat=2, min_seconds=0)
+        assert len(calls) == result["runs"] == 2
+        result = run.time_benchmark(
+            run.Benchmark(lambda t: time.sleep(0.01)), ["AAPL"], repeat=1, min_seconds=0.05
+        )
+        assert result["runs"] >= 5
+        assert result["best_seconds"] <= result["seconds"]
+
+    def test_regressions(self):
+        def results(**ns):
+            return {"results": {name: {"ns_per_item": n} for name, n in ns.items()}}
+
+        baseline = results(a=100, b=100, c=100)
+        ratios = run.compare(results(a=130, b=90, d=500), baseline)
+        assert ratios == [("a", 1.3), ("b", 0.9)]
+        assert run.regressions(ratios, threshold=0.2) == ["a"]
+        assert run.regressions(ratios, threshold=0.5) == []
+
+    def test_main_exit_status(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        args = "--only parse_tickers_warm --size 200 --repeat 1 --min-seconds 0".split()
+        assert run.main(args + ["--baseline", str(baseline), "--save-baseline"]) == 0
+        # nothing can be 1000 times slower than itself
+        assert run.main(args + ["--baseline", str(baseline), "--threshold", "1000"]) == 0
+        assert run.main(args + ["--baseline", str(baseline), "--threshold", "-1"]) == 1
+
+    def test_save_baseline_only(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        args = "--size 200 --repeat 1 --min-seconds 0 --save-baseline".split()
+        args += ["--baseline", str(baseline)]
+        run.main(args + ["--only", "parse_tickers_warm", "parse_tickers_cold"])
+        run.main(args + ["--only", "parse_tickers_cold", "validate_tickers"])
+        saved = json.loads(baseline.read_text())["results"]
+        assert set(saved) == {"parse_tickers_warm", "parse_tickers_cold", "validate_tickers"}
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import json
+import pathlib
+import subprocess
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import bulk
+import cli
+import parallel
+import ticker_parser as tp
+
+TICKERS = ["AAPL", "AAPL  180216C00170000", "bad ticker!", "SPX Index", "AAPL"]
+
+
+@pytest.fixture
+def ticker_file(tmp_path):
+    path = tmp_path / "tickers.txt"
+    path.write_text("\n".join(TICKERS) + "\n")
+    return path
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "positions.csv"
+    rows = ["id,Symbol,qty"] + [f'{i},"{t}",100' for i, t in enumerate(TICKERS)]
+    path.write_text("\n".join(rows) + "\n")
+    return path
+
+
+class TestConvertFile:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+    def test_lines(self, ticker_file, tmp_path, chunk_size):
+        out = tmp_path / "out.txt"
+        stats = bulk.convert_file(str(ticker_file), str(out), "Bloomberg", chunk_size=chunk_size)
+        assert stats.rows == len(TICKERS)
+        assert stats.errors == 1
+        assert out.read_text().splitlines() == [
+            "AAPL US Equity",
+            "AAPL US 02/16/18 C170.0 Equity",
+            "",
+            "SPX Index",
+            "AAPL US Equity",
+        ]
+
+    def test_crlf_lines(self, tmp_path):
+        src = tmp_path / "tickers.txt"
+        src.write_bytes(b"AAPL  180216C00170000\r\nSPX Index\r\n")
+        out = tmp_path / "out.txt"
+        bulk.convert_file(str(src), str(out), "Eze")
+        assert out.read_text().splitlines() == ["AAPL US 02/16/18 C170.0", "SPX"]
+
+    def test_parse(self, ticker_file, tmp_path):
+        out = tmp_path / "out.ndjson"
+        bulk.convert_file(str(ticker_file), str(out))
+        results = [json.loads(line) for line in out.read_text().splitlines()]
+        assert results[1] == tp.parse_ticker(TICKERS[1])
+        assert results[2] == tp.parse_ticker(TICKERS[2])
+
+    @pytest.mark.parametrize("column", ["Symbol", "1"])
+    def test_csv(self, csv_file, tmp_path, column):
+        out = tmp_path / "out.csv"
+        stats = bulk.convert_file(str(csv_file), str(out), "OCC", column=column, chunk_size=2)
+        assert stats.rows == len(TICKERS)
+        lines = out.read_text().splitlines()
+        assert lines[0] == "id,Symbol,qty,ticker_occ"
+        assert lines[2] == "1,AAPL  180216C00170000,100,AAPL  180216C00170000"
+        assert lines[3] == "2,bad ticker!,100,"
+
+    def test_csv_unknown_column(self, csv_file, tmp_path):
+        with pytest.raises(ValueError):
+            bulk.convert_file(str(csv_file), str(tmp_path / "out.csv"), "OCC", column="Ticker")
+
+
+class TestCLI:
+    def test_convert(self, ticker_file, tmp_path, capsys):
+        out = tmp_path / "out.txt"
+        cli.main(["convert", str(ticker_file), "--to", "Eze", "-o", str(out)])
+        assert out.read_text().splitlines()[1] == "AAPL US 02/16/18 C170.0"
+        assert "rows/sec" in capsys.readouterr().err
+
+    def test_module_without_function_app(self, ticker_file, tmp_path):
+        # python -m TickerParser needs neither azure.functions nor the function app settings
+        out, db = tmp_path / "out.txt", tmp_path / "symbols.sqlite"
+        script = (
+            "import runpy, sys; sys.modules['azure'] = sys.modules['azure.functions'] = None; "
+            "runpy.run_module('TickerParser', run_name='__main__')"
+        )
+        args = ["convert", str(ticker_file), "--to", "Eze", "-o", str(out)]
+        subprocess.run(
+            [sys.executable, "-c", script] + args,
+            cwd=app_path.parent,
+            env={**os.environ, "TICKER_PARSER_SYMBOL_DB": str(db)},
+            check=True,
+        )
+        assert out.read_text().splitlines()[0] == "AAPL"
+        assert not db.exists()
+
+    def test_convert_needs_target(self, ticker_file):
+        with pytest.raises(SystemExit):
+            cli.main(["convert", str(ticker_file)])
+
+
+class TestParallel:
+    @pytest.mark.parametrize("chunk_bytes", [1, 10, 1 << 20])
+    def test_chunk_offsets(self, ticker_file, chunk_bytes):
+        offsets = parallel.chunk_offsets(str(ticker_file), chunk_bytes)
+        data = ticker_file.read_bytes()
+        assert offsets[0][0] == 0 and offsets[-1][1] == len(data)
+        for (_, end), (start, _) in zip(offsets, offsets[1:]):
+            assert end == start and data[end - 1 : end] == b"\n"
+
+    @pytest.mark.parametrize("target_format", [None, "Bloomberg"])
+    def test_lines_same_as_serial(self, ticker_file, tmp_path, target_format):
+        serial, par = tmp_path / "serial.txt", tmp_path / "parallel.txt"
+        bulk.convert_file(str(ticker_file), str(serial), target_format)
+        stats = parallel.convert_file_parallel(
+            str(ticker_file), str(par), target_format, workers=2, chunk_bytes=8
+        )
+        assert par.read_text() == serial.read_text()
+        assert (stats.rows, stats.errors) == (len(TICKERS), 1)
+
+    def test_csv_same_as_serial(self, csv_file, tmp_path):
+        serial, par = tmp_path / "serial.csv", tmp_path / "parallel.csv"
+        bulk.convert_file(str(csv_file), str(serial), "OCC", column="Symbol")
+        stats = parallel.convert_file_parallel(
+            str(csv_file), str(par), "OCC", column="Symbol", workers=2, chunk_bytes=8
+        )
+        assert par.read_text() == serial.read_text()
+        assert stats.rows == len(TICKERS)
+
+    def test_cli_workers(self, ticker_file, tmp_path):
+        out = tmp_path / "out.txt"
+        cli.main(["convert", str(ticker_file), "--to", "OCC", "-o", str(out), "--workers", "2"])
+        assert out.read_text().splitlines()[0] == "AAPL"
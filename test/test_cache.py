@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import sys
+import datetime
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import ticker_parser as tp
+
+EXPIRED_OPTION = "AAPL  180216C00170000"
+LIVE_OPTION = f"AAPL  {datetime.date.today().year % 100 + 1:02d}0216C00170000"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = tp.ParseCache(maxsize=2)
+    monkeypatch.setattr(tp, "PARSE_CACHE", cache)
+    return cache
+
+
+class TestParseCache:
+    def test_hits_and_misses(self, cache):
+        tp.parse_ticker("AAPL")
+        tp.parse_ticker("AAPL")
+        tp.parse_ticker("MSFT")
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 2, 2)
+        assert stats.hit_rate == pytest.approx(1 / 3)
+
+    def test_lru_eviction(self, cache):
+        for ticker in ["AAPL", "MSFT", "AAPL", "IBM"]:
+            tp.parse_ticker(ticker)
+        assert "AAPL" in cache and "IBM" in cache and "MSFT" not in cache
+        assert cache.stats().evictions == 1
+
+    def test_copy_on_read(self, cache):
+        tp.parse_ticker("AAPL")["root_symbol"] = "corrupted"
+        tp.parse_tickers(["AAPL"])[0]["root_symbol"] = "corrupted"
+        assert tp.parse_ticker("AAPL")["root_symbol"] == "AAPL"
+
+    def test_rows_do_not_share_results(self, cache):
+        first, second = tp.parse_tickers(["AAPL", "AAPL"])
+        assert first == second and first is not second
+
+    def test_errors_are_cached(self, cache):
+        assert "error_message" in tp.parse_ticker("bad ticker!")
+        assert isinstance(tp.parse_tickers(["bad ticker!"])[0], tp.TickerError)
+        assert cache.stats().hits == 1
+
+    def test_admission_rejects_one_off_tickers(self):
+        cache = tp.ParseCache(maxsize=2, policy=tp.CACHE_POLICY.Admission)
+        for ticker in ["AAPL", "MSFT"] * 3:
+            if cache.get(ticker) is None:
+                cache.put(ticker, tp._to_result(ticker, tp._parse_ticker(ticker)))
+        assert cache.get("IBM") is None
+        cache.put("IBM", tp._to_result("IBM", tp._parse_ticker("IBM")))
+        assert "IBM" not in cache and len(cache) == 2
+        assert cache.stats().rejections == 1
+
+    def test_expired_options_evicted_first(self):
+        cache = tp.ParseCache(maxsize=2, expiry_aware=True)
+        for ticker in [EXPIRED_OPTION, "AAPL", "MSFT"]:
+            cache.put(ticker, tp._to_result(ticker, tp._parse_ticker(ticker)))
+        assert EXPIRED_OPTION not in cache and "AAPL" in cache and "MSFT" in cache
+        assert cache.stats().expired_evictions == 1
+
+    def test_live_options_evicted_by_lru(self):
+        cache = tp.ParseCache(maxsize=2, expiry_aware=True)
+        for ticker in [LIVE_OPTION, "AAPL", "MSFT"]:
+            cache.put(ticker, tp._to_result(ticker, tp._parse_ticker(ticker)))
+        assert LIVE_OPTION not in cache
+        assert cache.stats().expired_evictions == 0
+
+    def test_expiry_heap_bounded(self):
+        cache = tp.ParseCache(maxsize=100, expiry_aware=True)
+        for i in range(5000):
+            ticker = f"AAPL  991231C{i:08d}"  # far future expiry, only ever evicted by LRU
+            cache.put(ticker, tp._to_result(ticker, tp._parse_ticker(ticker)))
+            if i % 7 == 0:
+                cache.invalidate([ticker])
+        assert len(cache._expiries) <= 2 * cache.maxsize
+        assert {ticker for _, ticker in cache._expiries} >= set(cache._data)
+
+    def test_clear(self, cache):
+        tp.parse_ticker("AAPL")
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_configure(self, monkeypatch):
+        monkeypatch.setattr(tp, "PARSE_CACHE", tp.PARSE_CACHE)
+        cache = tp.configure_parse_cache(maxsize=10, policy=tp.CACHE_POLICY.Admission)
+        assert tp.PARSE_CACHE is cache and cache.maxsize == 10
+
+    @pytest.mark.parametrize("kwargs", [{"maxsize": 0}, {"policy": "FIFO"}])
+    def test_invalid_settings(self, kwargs):
+        with pytest.raises(ValueError):
+            tp.ParseCache(**kwargs)
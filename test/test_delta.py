@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import sys
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import bulk
+import cli
+import delta
+import ticker_parser as tp
+
+SNAPSHOT = "id,Symbol,qty\n1,AAPL,100\n2,AAPL  180216C00170000,5\n3,bad ticker!,1\n4,SPX Index,2\n"
+
+
+@pytest.fixture
+def positions(tmp_path):
+    path = tmp_path / "positions.csv"
+    path.write_text(SNAPSHOT)
+    return path
+
+
+def convert(src, dst, **options):
+    return delta.convert_delta(src, dst, "Bloomberg", column="Symbol", **options)
+
+
+class TestConvertDelta:
+    def test_same_as_convert_file(self, positions, tmp_path):
+        out, full = tmp_path / "out.csv", tmp_path / "full.csv"
+        stats = convert(positions, out)
+        bulk.convert_file(str(positions), str(full), "Bloomberg", column="Symbol")
+        assert out.read_text() == full.read_text()
+        assert (stats.rows, stats.errors, stats.converted, stats.pruned) == (4, 1, 4, 0)
+
+    def test_only_changed_lines_converted(self, positions, tmp_path, monkeypatch):
+        out, full = tmp_path / "out.csv", tmp_path / "full.csv"
+        convert(positions, out)
+        positions.write_text(SNAPSHOT.replace("1,AAPL,100", "1,AAPL,200") + "5,MSFT,3\n")
+
+        converted = []
+        convert_fields = bulk.convert_fields
+        monkeypatch.setattr(
+            bulk, "convert_fields", lambda t, f: converted.extend(t) or convert_fields(t, f)
+        )
+        stats = convert(positions, out)
+        assert converted == ["AAPL", "MSFT"]
+        assert (stats.rows, stats.errors, stats.converted, stats.pruned) == (5, 1, 2, 1)
+        bulk.convert_file(str(positions), str(full), "Bloomberg", column="Symbol")
+        assert out.read_text() == full.read_text()
+
+    def test_stale_lines_pruned(self, positions, tmp_path):
+        out = tmp_path / "out.csv"
+        convert(positions, out)
+        positions.write_text("id,Symbol,qty\n1,AAPL,100\n")
+        assert convert(positions, out).pruned == 3
+        store = delta.DeltaStore(f"{out}{delta.STORE_SUFFIX}", "")
+        assert len(store) == 0  # a different version empties it
+        store.close()
+
+    def test_options_change_starts_over(self, positions, tmp_path):
+        out = tmp_path / "out.csv"
+        convert(positions, out)
+        stats = delta.convert_delta(positions, out, "OCC", column="Symbol")
+        assert stats.converted == 4
+        assert out.read_text().splitlines()[1] == "1,AAPL,100,AAPL"
+
+    def test_reference_data_change_starts_over(self, positions, tmp_path, monkeypatch):
+        out = tmp_path / "out.csv"
+        convert(positions, out)
+        monkeypatch.setattr(tp, "INDEX_LIST", tp.INDEX_LIST | {"AAPL"})
+        tp.PARSE_CACHE.invalidate(["AAPL"])
+        assert convert(positions, out).converted == 4
+        assert out.read_text().splitlines()[1] == "1,AAPL,100,AAPL Index"
+        tp.PARSE_CACHE.invalidate(["AAPL"])
+
+    def test_lines(self, tmp_path):
+        src, out = tmp_path / "tickers.txt", tmp_path / "out.txt"
+        src.write_text("AAPL\nSPX Index\nAAPL\n")
+        delta.convert_delta(src, out, "OCC")
+        src.write_text("AAPL\nMSFT\n")
+        stats = delta.convert_delta(src, out, "OCC")
+        assert out.read_text() == "AAPL\nMSFT\n"
+        assert (stats.converted, stats.pruned) == (1, 1)
+
+    def test_cli(self, positions, tmp_path):
+        out, store = tmp_path / "out.csv", tmp_path / "store.sqlite"
+        args = ["delta", str(positions), "--column", "Symbol", "--to", "Eze", "-o", str(out)]
+        cli.main(args + ["--store", str(store)])
+        assert out.read_text().splitlines()[4] == "4,SPX Index,2,SPX"
+        assert store.exists()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import sys
+import pathlib
+import random
+import re
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import ticker_parser as tp
+
+TICKERS = [
+    "AAPL",
+    "SPX",
+    "USD",
+    "/VXG18",
+    "BRK.B",
+    "AAPL US Equity",
+    "AAPL Equity",
+    "AAPLEquity",
+    "SPX Index",
+    "AAPL  180216C00170000",
+    "AAPL  180216C00170000\n",
+    "AAPL 180216C00170000",
+    "AAPL US 02/16/18 C170.0 Equity",
+    "AAPL US 02/16/18 C170.0",
+    "AAPL US 02/16/18 C170",
+    "AAPL US 02/16/18 C1\n",
+    "A US 01/01/01 C1",
+    "AAPL\n",
+    "",
+    " ",
+    "\n",
+    "AAPL MSFT",
+    "AAPL\tUS\tEquity",
+    "SPX\nIndex",
+    "ABCDEFGHIJK",
+]
+
+
+def brute_force_matches(ticker):
+    """the matching formats as found by the original try-every-regex loop"""
+    return [fmt for fmt in tp.FORMATS_TO_SEARCH if re.match(fmt.regex_string, ticker, re.VERBOSE)]
+
+
+def random_tickers(n, seed=0):
+    rng = random.Random(seed)
+    alphabet = "AaPpCc0123456789 \t/.-_\nEquityIndexUS"
+    for _ in range(n):
+        yield "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 32)))
+
+
+class TestDispatcher:
+    @pytest.mark.parametrize("ticker", TICKERS)
+    def test_same_matches_as_brute_force(self, ticker):
+        assert [fmt for fmt, _ in tp._match_ticker(ticker)] == brute_force_matches(ticker)
+
+    def test_same_matches_as_brute_force_random(self):
+        for ticker in random_tickers(5000):
+            matches = [fmt for fmt, _ in tp._match_ticker(ticker)]
+            assert matches == brute_force_matches(ticker), ticker
+
+    def test_table_covers_every_shape(self):
+        assert len(tp._DISPATCH_TABLE) == 3 * 3 * 2
+
+    def test_common_shapes_have_one_candidate(self):
+        for ticker in ["AAPL", "AAPL  180216C00170000", "AAPL US 02/16/18 C170.0", "SPX Index"]:
+            assert len(tp._DISPATCH_TABLE[tp._ticker_shape(ticker)]) == 1
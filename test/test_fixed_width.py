@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import sys
+import mmap
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import fixed_width as fw
+import ticker_parser as tp
+
+TICKERS = [
+    "AAPL",
+    "BRK/B",
+    "SPX",
+    "AAPL US Equity",
+    "AAPL Equity",
+    "SPX Index",
+    "AAPL  180216C00170000",
+    "AAPL US 02/16/18 C170.0 Equity",
+    "AAPL US 02/16/18 C170.55",
+    "AAPL 180216C00175450",
+    "bad ticker!",
+    "",
+]
+
+# fixed-width records: 5 byte id, 32 byte ticker field padded with spaces, 4 byte quantity, line break
+RECORD_LENGTH = 42
+FEED = b"".join(f"{i:05d}{t:<32}{i:04d}\n".encode() for i, t in enumerate(TICKERS))
+
+
+def same(result, expected):
+    if isinstance(expected, tp.TickerError):
+        return result == expected
+    return result.to_dict() == expected.to_dict()
+
+
+class TestParseField:
+    @pytest.mark.parametrize("ticker", TICKERS)
+    def test_same_as_str(self, ticker):
+        assert same(fw.parse_field(ticker.encode()), tp._parse_one(ticker))
+
+    @pytest.mark.parametrize("buffer_type", [bytes, bytearray, memoryview])
+    def test_buffer_types(self, buffer_type):
+        buf = buffer_type(b"xxAAPL  180216C00170000yy")
+        security = fw.parse_field(buf, 2, 23)
+        assert security.to_dict() == tp._parse_one("AAPL  180216C00170000").to_dict()
+
+    def test_padding(self):
+        assert fw.parse_field(b"  AAPL US Equity   ").root_symbol == "AAPL"
+        error = fw.parse_field(b"AAPL   ", strip=False)
+        assert error == tp.TickerError("AAPL   ", tp.PARSE_ERROR.NoMatch)
+
+    def test_error_decodes_ticker(self):
+        error = fw.parse_field(b"|bad ticker!   |", 1, 15)
+        assert error == tp.TickerError("bad ticker!", tp.PARSE_ERROR.NoMatch)
+
+    def test_counted_in_metrics(self, monkeypatch):
+        metrics = tp.ParseMetrics(log_every=1)
+        monkeypatch.setattr(tp, "METRICS", metrics)
+        fw.parse_field(b"AAPL US Equity")
+        fw.parse_field(b"bad ticker!")
+        assert metrics.outcomes == {"Bloomberg_Equity": 1, tp.PARSE_ERROR.NoMatch: 1}
+
+
+class TestRecords:
+    def test_parse_records(self):
+        results = list(fw.parse_records(FEED, RECORD_LENGTH, offset=5, length=32))
+        assert len(results) == len(TICKERS)
+        for result, ticker in zip(results, TICKERS):
+            assert same(result, tp._parse_one(ticker)), ticker
+
+    def test_mmap(self, tmp_path):
+        path = tmp_path / "feed.dat"
+        path.write_bytes(FEED + b"00099AAPL")  # partial record at the end
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as feed:
+            results = list(fw.parse_records(feed, RECORD_LENGTH, offset=5, length=32))
+        assert len(results) == len(TICKERS)
+        assert results[6].strike_price == 170.0
+
+    def test_default_length_with_line_breaks(self):
+        for feed in [b"AAPL      \nSPX       \n", b"AAPL     \r\nSPX      \r\n"]:
+            results = list(fw.parse_records(feed, 11))
+            assert [r.root_symbol for r in results] == ["AAPL", "SPX"]
+
+    def test_field_outside_record(self):
+        with pytest.raises(ValueError):
+            list(fw.parse_records(FEED, RECORD_LENGTH, offset=20, length=32))
+
+    def test_convert_records(self):
+        converted = fw.convert_records(FEED, RECORD_LENGTH, "Bloomberg", offset=5, length=32)
+        assert converted[:3] == ["AAPL US Equity", "BRK/B US Equity", "SPX Index"]
+        assert converted[6] == "AAPL US 02/16/18 C170.0 Equity"
+        assert converted[-3:] == [None, None, None]
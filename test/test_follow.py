@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import time
+import pathlib
+import threading
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import cli
+import follow
+
+
+def append(path, text):
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def blotter(tmp_path):
+    path = tmp_path / "blotter.txt"
+    path.write_text("AAPL\nAAPL  180216C00170000\n")
+    return path
+
+
+class TestTailReader:
+    def test_complete_lines_only(self, blotter):
+        reader = follow.TailReader(blotter)
+        assert reader.read() == (0, ["AAPL", "AAPL  180216C00170000"])
+        append(blotter, "MS")
+        assert reader.read() == (27, [])
+        append(blotter, "FT\nIBM")
+        assert reader.read() == (27, ["MSFT"])
+        assert reader.offset == 32
+        reader.close()
+
+    def test_rotation(self, blotter):
+        reader = follow.TailReader(blotter)
+        reader.read()
+        append(blotter, "MSFT\nIB")
+        os.rename(blotter, f"{blotter}.1")
+        blotter.write_text("SPX Index\n")
+        append(f"{blotter}.1", "M\nX")
+        assert reader.read() == (27, ["MSFT", "IBM"])  # rest of the old file
+        assert reader.read() == (36, ["X"])  # its unfinished last line
+        assert reader.read() == (0, [])
+        assert reader.read() == (0, ["SPX Index"])
+        assert reader.inode == os.stat(blotter).st_ino
+        reader.close()
+
+    def test_truncation(self, blotter):
+        reader = follow.TailReader(blotter)
+        reader.read()
+        blotter.write_text("MSFT\n")
+        assert reader.read() == (0, ["MSFT"])
+        reader.close()
+
+
+class TestFollow:
+    def test_converts_file(self, blotter, tmp_path):
+        out = tmp_path / "out.txt"
+        stats = follow.follow(blotter, out, "Bloomberg", idle_timeout=0)
+        assert out.read_text() == "AAPL US Equity\nAAPL US 02/16/18 C170.0 Equity\n"
+        assert (stats.rows, stats.errors) == (2, 0)
+
+    def test_resumes_from_checkpoint(self, blotter, tmp_path):
+        out, checkpoint = tmp_path / "out.txt", tmp_path / "checkpoint"
+        follow.follow(blotter, out, "OCC", checkpoint=checkpoint, idle_timeout=0)
+        append(blotter, "SPX Index\nbad ticker!\n")
+        stats = follow.follow(blotter, out, "OCC", checkpoint=checkpoint, idle_timeout=0)
+        assert (stats.rows, stats.errors) == (2, 1)
+        assert out.read_text().splitlines() == ["AAPL", "AAPL  180216C00170000", "SPX", ""]
+        assert follow.Checkpoint(checkpoint).load() == (
+            os.stat(blotter).st_ino,
+            blotter.stat().st_size,
+        )
+
+    def test_checkpoint_of_rotated_file(self, blotter, tmp_path):
+        out, checkpoint = tmp_path / "out.txt", tmp_path / "checkpoint"
+        follow.follow(blotter, out, "OCC", checkpoint=checkpoint, idle_timeout=0)
+        os.rename(blotter, f"{blotter}.1")
+        blotter.write_text("MSFT\n")
+        follow.follow(blotter, out, "OCC", checkpoint=checkpoint, idle_timeout=0)
+        assert out.read_text().splitlines()[-1] == "MSFT"
+
+    def test_csv_resumes_with_header(self, tmp_path):
+        blotter, out = tmp_path / "blotter.csv", tmp_path / "out.csv"
+        checkpoint = tmp_path / "checkpoint"
+        blotter.write_text("id,Symbol\n1,AAPL\n")
+        follow.follow(blotter, out, "Eze", column="Symbol", checkpoint=checkpoint, idle_timeout=0)
+        append(blotter, "2,SPX Index\n")
+        follow.follow(blotter, out, "Eze", column="Symbol", checkpoint=checkpoint, idle_timeout=0)
+        assert out.read_text() == "id,Symbol,ticker_eze\n1,AAPL,AAPL\n2,SPX Index,SPX\n"
+
+    def test_csv_header_written_once_across_rotation(self, tmp_path):
+        blotter, out = tmp_path / "blotter.csv", tmp_path / "out.csv"
+        checkpoint = tmp_path / "checkpoint"
+        blotter.write_text("id,Symbol\n1,AAPL\n")
+        follow.follow(blotter, out, "Eze", column="Symbol", checkpoint=checkpoint, idle_timeout=0)
+        os.rename(blotter, f"{blotter}.1")
+        blotter.write_text("id,Symbol\n2,SPX Index\n")
+        follow.follow(blotter, out, "Eze", column="Symbol", checkpoint=checkpoint, idle_timeout=0)
+        assert out.read_text() == "id,Symbol,ticker_eze\n1,AAPL,AAPL\n2,SPX Index,SPX\n"
+
+    def test_live(self, blotter, tmp_path):
+        out = tmp_path / "out.txt"
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=follow.follow, args=(blotter, out, "Bloomberg"), kwargs=dict(stop=stop)
+        )
+        thread.start()
+        try:
+            append(blotter, "MSFT\n")
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                if out.exists() and "MSFT US Equity" in out.read_text():
+                    break
+                time.sleep(0.01)
+        finally:
+            stop.set()
+            thread.join()
+        assert out.read_text().splitlines()[-1] == "MSFT US Equity"
+
+    def test_cli(self, blotter, tmp_path):
+        out = tmp_path / "out.txt"
+        cli.main(["follow", str(blotter), "--to", "Eze", "-o", str(out), "--idle-timeout", "0"])
+        assert out.read_text().splitlines() == ["AAPL", "AAPL US 02/16/18 C170.0"]
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import sys
+import gzip
+import json
+import pathlib
+
+# hack to add the repo root to the python path, so the function app can be imported as a package
+repo_path = pathlib.Path(__file__).parents[1]
+sys.path.append(str(repo_path))
+
+import pytest
+
+func = pytest.importorskip("azure.functions")
+
+import TickerParser
+
+
+def get(**params):
+    req = func.HttpRequest(method="GET", url="/api/TickerParser", params=params, body=b"")
+    return TickerParser.main(req)
+
+
+def post(body):
+    req = func.HttpRequest(
+        method="POST", url="/api/TickerParser", body=json.dumps(body).encode(), params={}
+    )
+    return TickerParser.main(req)
+
+
+class TestMain:
+    def test_single_ticker(self):
+        resp = get(ticker="AAPL")
+        assert resp.status_code == 200
+        assert json.loads(resp.get_body())["ticker_bloomberg"] == "AAPL US Equity"
+
+    def test_comma_separated(self):
+        body = json.loads(get(ticker="AAPL,bad ticker!,AAPL").get_body())
+        assert [r["ticker_original"] for r in body] == ["AAPL", "bad ticker!", "AAPL"]
+        assert "error_message" in body[1]
+
+    def test_json_list(self):
+        body = json.loads(post({"ticker": ["SPX Index", "AAPL  180216C00170000"]}).get_body())
+        assert [r["ticker_eze"] for r in body] == ["SPX", "AAPL US 02/16/18 C170.0"]
+
+    def test_no_ticker(self):
+        assert get().status_code == 400
+
+    def test_formats_selector(self):
+        body = json.loads(get(ticker="AAPL  180216C00170000", formats="Bloomberg").get_body())
+        assert body["ticker_bloomberg"] == "AAPL US 02/16/18 C170.0 Equity"
+        assert "ticker_occ" not in body and "ticker_eze" not in body
+
+    def test_formats_selector_in_body(self):
+        body = json.loads(post({"ticker": ["AAPL"], "formats": ["OCC", "Eze"]}).get_body())
+        assert set(body[0]) >= {"ticker_occ", "ticker_eze"}
+        assert "ticker_bloomberg" not in body[0]
+
+    def test_unknown_format(self):
+        assert get(ticker="AAPL", formats="Reuters").status_code == 400
+
+
+class TestBulk:
+    def post_ndjson(self, body, headers=None, params=None):
+        headers = {"Content-Type": "application/x-ndjson", **(headers or {})}
+        req = func.HttpRequest(
+            method="POST", url="/api/TickerParser", body=body, headers=headers, params=params or {}
+        )
+        return TickerParser.main(req)
+
+    def test_ndjson(self):
+        resp = self.post_ndjson(b'"AAPL"\n"SPX Index"\n', params={"formats": "Eze"})
+        assert resp.mimetype == "application/x-ndjson"
+        lines = [json.loads(line) for line in resp.get_body().splitlines()]
+        assert [r["ticker_eze"] for r in lines] == ["AAPL", "SPX"]
+
+    def test_gzip(self):
+        resp = self.post_ndjson(
+            gzip.compress(b'"AAPL"\n'),
+            headers={"Content-Encoding": "gzip", "Accept-Encoding": "gzip, deflate"},
+        )
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(resp.get_body()))["ticker_original"] == "AAPL"
+
+    def test_too_large(self, monkeypatch):
+        monkeypatch.setattr(TickerParser.api, "BULK_MAX_ROWS", 1)
+        assert self.post_ndjson(b'"AAPL"\n"MSFT"\n').status_code == 413
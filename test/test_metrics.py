@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import sys
+import json
+import logging
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import api
+import ticker_parser as tp
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = tp.ParseMetrics()
+    monkeypatch.setattr(tp, "METRICS", metrics)
+    monkeypatch.setattr(tp, "PARSE_CACHE", tp.ParseCache())
+    return metrics
+
+
+class TestLatencyHistogram:
+    def test_buckets(self):
+        histogram = tp.LatencyHistogram()
+        for ns in [100, 1000, 1500, 3000, 10**12]:
+            histogram.observe(ns)
+        d = histogram.to_dict()
+        assert d["count"] == 5
+        assert d["buckets"] == {1024: 2, 2048: 1, 4096: 1, 2**30: 1}
+        assert d["p50_ns"] == 2048
+        assert d["p99_ns"] == 2**30
+
+    def test_empty(self):
+        d = tp.LatencyHistogram().to_dict()
+        assert d["count"] == 0 and d["mean_ns"] is None and d["p50_ns"] is None
+
+
+class TestParseMetrics:
+    def test_format_counters(self, metrics):
+        tp.parse_tickers(
+            ["AAPL", "MSFT", "SPX Index", "AAPL  180216C00170000", "bad ticker!", "AAPL"]
+        )
+        d = tp.metrics_snapshot()
+        assert d["parsed"] == 5
+        assert d["formats"]["Generic_Non_Option"] == 3
+        assert d["formats"]["Bloomberg_Index"] == 1
+        assert d["formats"]["OCC_Option"] == 1
+        assert d["formats"]["Eze_Option"] == 0
+        assert d["errors"] == {"NoMatch": 1, "Ambiguous": 0}
+        assert d["parse_latency"]["count"] == 5
+
+    def test_ambiguous(self, metrics, monkeypatch):
+        table = tp._build_dispatch_table([tp.Generic_Non_Option, tp.Generic_Non_Option])
+        monkeypatch.setattr(tp, "_DISPATCH_TABLE", table)
+        tp.parse_ticker("AAPL")
+        assert metrics.to_dict()["errors"]["Ambiguous"] == 1
+
+    def test_cache_hits_are_not_parses(self, metrics):
+        for _ in range(3):
+            tp.parse_ticker("AAPL")
+        d = tp.metrics_snapshot()
+        assert d["parsed"] == 1
+        assert (d["cache"]["hits"], d["cache"]["misses"]) == (2, 1)
+
+    def test_cache_hits_are_counted(self, metrics):
+        for _ in range(1000):
+            tp.parse_ticker("bad!")
+        tp.parse_tickers(["AAPL"] * 1000)
+        tp.parse_tickers(["AAPL", "SPX Index"])
+        d = tp.metrics_snapshot()
+        assert d["errors"]["NoMatch"] == 1000
+        assert d["formats"]["Generic_Non_Option"] == 1001
+        assert d["formats"]["Bloomberg_Index"] == 1
+        assert d["parsed"] == d["parse_latency"]["count"] == 3
+
+    @pytest.mark.parametrize(
+        "ticker",
+        [
+            "AAPL",
+            "SPX",
+            "USD",
+            "AAPL US Equity",
+            "SPX Index",
+            "AAPL  180216C00170000",
+            "AAPL US 02/16/18 C170.0 Equity",
+            "AAPL US 02/16/18 C170.55",
+            "bad ticker!",
+        ],
+    )
+    def test_outcome_of_result(self, ticker):
+        assert tp._to_result(ticker, tp._parse_one(ticker)).outcome == tp._classify(ticker)
+
+    def test_render_latency(self, metrics):
+        tp.convert_ticker("AAPL  180216C00170000", "Bloomberg")
+        tp.convert_ticker("AAPL  180216C00170000", "Bloomberg")
+        render_latency = metrics.to_dict()["render_latency"]
+        assert list(render_latency) == ["Bloomberg"]
+        assert render_latency["Bloomberg"]["count"] == 1
+
+    def test_sampled_logging(self, metrics, caplog):
+        metrics.log_every = 3
+        with caplog.at_level(logging.INFO):
+            tp.parse_tickers([f"T{i}" for i in range(7)])
+        parsed_logs = [r for r in caplog.records if r.getMessage().startswith("Parsed ticker")]
+        assert [r.getMessage().split()[2] for r in parsed_logs] == ["'T2'", "'T5'"]
+
+    def test_json_serializable(self, metrics):
+        tp.parse_tickers(["AAPL", "bad ticker!"])
+        assert json.loads(json.dumps(tp.metrics_snapshot()))["cache"]["size"] == 2
+
+    def test_endpoint(self, metrics):
+        tp.parse_ticker("AAPL")
+        resp = api.handle({"metrics": ""}, {}, b"")
+        assert resp.status_code == 200 and resp.mimetype == "application/json"
+        assert json.loads(resp.body)["formats"]["Generic_Non_Option"] == 1
+
+    def test_log_sample_setting(self, metrics):
+        api.configure_from_environ({"TICKER_PARSER_LOG_SAMPLE_EVERY": "0"})
+        assert metrics.log_every == 0
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import sys
+import gzip
+import json
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import ndjson_bulk
+import ticker_parser as tp
+
+BODY = b'"AAPL"\n{"ticker": "SPX Index"}\n\n"bad ticker!"\n"AAPL  180216C00170000"'
+
+
+def convert(body: bytes, **kwargs) -> bytes:
+    return b"".join(ndjson_bulk.convert_body(body, **kwargs))
+
+
+def results(body: bytes) -> list:
+    return [json.loads(line) for line in body.splitlines()]
+
+
+class TestConvertBody:
+    def test_plain(self):
+        out = results(convert(BODY, chunk_size=2))
+        tickers = ["AAPL", "SPX Index", "bad ticker!", "AAPL  180216C00170000"]
+        assert out == [tp.parse_ticker(t) for t in tickers]
+
+    def test_gzip_in_and_out(self):
+        out = convert(gzip.compress(BODY), gzipped=True, gzip_output=True)
+        assert results(gzip.decompress(out)) == results(convert(BODY))
+
+    def test_formats(self):
+        out = results(convert(b'"AAPL"', formats=("Bloomberg",)))
+        assert "ticker_bloomberg" in out[0] and "ticker_occ" not in out[0]
+
+    def test_empty(self):
+        assert convert(b"") == b""
+
+    def test_parsed_a_block_at_a_time(self, monkeypatch):
+        parsed = []
+        parse_tickers = tp.parse_tickers
+
+        def counting_parse_tickers(tickers, formats):
+            parsed.append(len(tickers))
+            return parse_tickers(tickers, formats)
+
+        monkeypatch.setattr(tp, "parse_tickers", counting_parse_tickers)
+        blocks = ndjson_bulk.convert_body(BODY, chunk_size=3)
+        assert parsed == []
+        assert len(results(next(blocks))) == 3 and parsed == [3]
+        assert len(results(next(blocks))) == 1 and parsed == [3, 1]
+        assert next(blocks, None) is None
+
+    def test_too_many_rows(self):
+        with pytest.raises(ndjson_bulk.BulkRequestError) as e:
+            ndjson_bulk.convert_body(BODY, max_rows=3)
+        assert e.value.status_code == 413
+
+    def test_too_many_bytes(self):
+        with pytest.raises(ndjson_bulk.BulkRequestError) as e:
+            ndjson_bulk.convert_body(BODY, max_bytes=10)
+        assert e.value.status_code == 413
+
+    def test_gzip_bomb(self):
+        bomb = gzip.compress(b'"AAPL"\n' * 100_000)
+        with pytest.raises(ndjson_bulk.BulkRequestError) as e:
+            ndjson_bulk.convert_body(bomb, gzipped=True, max_bytes=len(bomb) * 2)
+        assert e.value.status_code == 413
+
+    @pytest.mark.parametrize("body", [b"not json", b'{"symbol": "AAPL"}', b"123"])
+    def test_bad_lines(self, body):
+        with pytest.raises(ndjson_bulk.BulkRequestError) as e:
+            ndjson_bulk.convert_body(body)
+        assert e.value.status_code == 400
+
+    def test_bad_gzip(self):
+        with pytest.raises(ndjson_bulk.BulkRequestError):
+            ndjson_bulk.convert_body(b"not gzip", gzipped=True)
+
+    def test_gzip_members(self):
+        body = gzip.compress(b'"AAPL"\n') + gzip.compress(b'"MSFT"\n')
+        out = convert(body, gzipped=True)
+        assert [r["ticker_original"] for r in results(out)] == ["AAPL", "MSFT"]
+
+    def test_gzip_members_over_max_bytes(self):
+        body = gzip.compress(b'"AAPL"\n' * 100) * 3
+        with pytest.raises(ndjson_bulk.BulkRequestError) as e:
+            ndjson_bulk.convert_body(body, gzipped=True, max_bytes=1000)
+        assert e.value.status_code == 413
+
+    def test_truncated_gzip(self):
+        body = gzip.compress(b'"AAPL"\n' * 100)
+        with pytest.raises(ndjson_bulk.BulkRequestError) as e:
+            ndjson_bulk.convert_body(body[:-10], gzipped=True)
+        assert e.value.status_code == 400
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import sys
+import datetime
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import option_chain
+import ticker_parser as tp
+
+BOOK = [
+    "AAPL  180216C00170000",
+    "AAPL  180216P00150000",
+    "AAPL  180216P00175000",
+    "AAPL  180216P00200000",
+    "AAPL  180216P00210000",
+    "AAPL US 02/09/18 P160.0 Equity",
+    "AAPL US 03/16/18 P170.0",
+    "MSFT  180216P00090000",
+    "AAPL",
+    "SPX Index",
+    "bad ticker!",
+]
+
+
+@pytest.fixture
+def chain():
+    chain = option_chain.OptionChainIndex()
+    chain.add_tickers(BOOK)
+    return chain
+
+
+def occ(contracts):
+    return [c.render("OCC") for c in contracts]
+
+
+class TestOptionChainIndex:
+    def test_only_options_indexed(self, chain):
+        assert len(chain) == 8
+        assert chain.roots() == ["AAPL", "MSFT"]
+        assert chain.expiries("aapl") == [
+            datetime.date(2018, 2, 9),
+            datetime.date(2018, 2, 16),
+            datetime.date(2018, 3, 16),
+        ]
+
+    def test_puts_this_month_in_strike_range(self, chain):
+        result = chain.query(
+            "AAPL",
+            expiry_from=datetime.date(2018, 2, 1),
+            expiry_to=datetime.date(2018, 2, 28),
+            call_put="P",
+            strike_min=150,
+            strike_max=200,
+        )
+        assert occ(result) == [
+            "AAPL  180209P00160000",
+            "AAPL  180216P00150000",
+            "AAPL  180216P00175000",
+            "AAPL  180216P00200000",
+        ]
+
+    def test_order_and_open_bounds(self, chain):
+        assert occ(chain.query("AAPL", expiry_from=datetime.date(2018, 2, 16), strike_max=170)) == [
+            "AAPL  180216C00170000",
+            "AAPL  180216P00150000",
+            "AAPL  180316P00170000",
+        ]
+        assert len(chain.query("AAPL")) == 7
+        assert chain.query("IBM") == []
+
+    def test_target_format(self, chain):
+        assert chain.query("MSFT", target_format="Bloomberg") == ["MSFT US 02/16/18 P90.0 Equity"]
+        assert chain.query("AAPL", call_put="c", target_format="Eze") == ["AAPL US 02/16/18 C170.0"]
+
+    def test_same_contract_in_other_format_replaces(self, chain):
+        assert chain.add_tickers(["AAPL US 02/16/18 C170.0 Equity"]) == 1
+        assert len(chain) == 8
+        (contract,) = chain.query("AAPL", call_put="C")
+        assert contract.ticker_original == "AAPL US 02/16/18 C170.0 Equity"
+
+    def test_add_security(self):
+        chain = option_chain.OptionChainIndex()
+        assert chain.add(tp._parse_ticker("AAPL US 02/16/18 C170.0"))
+        assert not chain.add(tp._parse_ticker("AAPL"))
+        (contract,) = chain.query("AAPL")
+        assert contract.ticker_original == "AAPL  180216C00170000"
+
+    def test_invalid_expiry_skipped(self):
+        chain = option_chain.OptionChainIndex()
+        assert chain.add_tickers(["AAPL  181316C00170000"]) == 0
+        assert len(chain) == 0
+
+    def test_bad_call_put(self, chain):
+        with pytest.raises(ValueError):
+            chain.query("AAPL", call_put="X")
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import sys
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import pandas_accessor  # noqa: F401, registers Series.ticker
+import ticker_parser as tp
+
+
+@pytest.fixture
+def symbols():
+    return pd.Series(
+        ["AAPL", "AAPL  180216C00170000", None, "bad ticker!", "SPX Index", "AAPL"],
+        index=list("abcdef"),
+        name="symbol",
+    )
+
+
+class TestConvert:
+    def test_convert(self, symbols):
+        converted = symbols.ticker.convert("Bloomberg")
+        assert converted.dtype == "string"
+        assert converted.name == "symbol"
+        assert list(converted.index) == list("abcdef")
+        assert converted.tolist() == [
+            "AAPL US Equity",
+            "AAPL US 02/16/18 C170.0 Equity",
+            pd.NA,
+            pd.NA,
+            "SPX Index",
+            "AAPL US Equity",
+        ]
+
+    def test_same_as_convert_ticker(self, symbols):
+        for ticker, converted in zip(symbols, symbols.ticker.convert("OCC")):
+            if pd.notna(ticker) and ticker != "bad ticker!":
+                assert converted == tp.convert_ticker(ticker, "OCC")
+
+    def test_errors_raise(self, symbols):
+        with pytest.raises(tp.RegexMatchNotFoundException, match="bad ticker!"):
+            symbols.ticker.convert("Eze", errors="raise")
+        assert symbols.dropna().iloc[:2].ticker.convert("Eze", errors="raise").notna().all()
+
+    def test_parses_each_distinct_ticker_once(self, monkeypatch):
+        monkeypatch.setattr(tp, "PARSE_CACHE", tp.ParseCache())
+        pd.Series(["AAPL", "MSFT"] * 1000).ticker.convert("OCC")
+        stats = tp.PARSE_CACHE.stats()
+        assert stats.hits + stats.misses == 2
+
+    def test_empty(self):
+        assert pd.Series([], dtype=object).ticker.convert("OCC").empty
+
+
+class TestParse:
+    def test_typed_columns(self, symbols):
+        parsed = symbols.ticker.parse()
+        assert list(parsed.columns) == list(pandas_accessor.PARSED_COLUMNS)
+        assert {col: str(dtype) for col, dtype in parsed.dtypes.items()} == {
+            col: dtype for col, dtype in pandas_accessor.PARSED_COLUMNS.items()
+        }
+        assert list(parsed.index) == list("abcdef")
+
+    def test_values(self, symbols):
+        parsed = symbols.ticker.parse()
+        option = parsed.loc["b"]
+        assert option.asset_class == "Option" and option.root_symbol == "AAPL"
+        assert option.call_put == "C" and option.strike_price == 170.0
+        assert option.expiry == pd.Timestamp("2018-02-16")
+        assert parsed.loc["e", "asset_class"] == "Index"
+        assert parsed.loc["d", "error_reason"] == tp.PARSE_ERROR.NoMatch
+        assert parsed.loc["c"].isna().all()
+        assert pd.isna(parsed.loc["a", "strike_price"])
+
+    def test_query_like_usage(self, symbols):
+        parsed = symbols.ticker.parse()
+        assert (parsed.asset_class == "Equity").sum() == 2
+
+
+class TestValidate:
+    def test_validate(self, symbols):
+        codes = symbols.ticker.validate()
+        assert codes.dtype == "category"
+        assert codes.tolist()[:2] == ["Generic_Non_Option", "OCC_Option"]
+        assert pd.isna(codes["c"])
+        assert codes["d"] == tp.PARSE_ERROR.NoMatch
+
+    def test_is_valid(self, symbols):
+        assert symbols.ticker.is_valid().tolist() == [True, True, False, False, True, True]
+
+    def test_all_missing(self):
+        assert pd.Series([None, None], dtype=object).ticker.validate().isna().all()
+        assert not pd.Series([None, None], dtype=object).ticker.is_valid().any()
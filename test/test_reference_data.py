@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import api
+import reference_data
+import ticker_parser as tp
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """fresh parse cache, and the built in reference data back after each test"""
+    monkeypatch.setattr(tp, "PARSE_CACHE", tp.ParseCache())
+    monkeypatch.setattr(tp, "INDEX_LIST", tp.INDEX_LIST)
+    monkeypatch.setattr(tp, "CASH_LIST", tp.CASH_LIST)
+    monkeypatch.setattr(api, "REFERENCE_DATA", None)
+
+
+def write(path, text):
+    """replace the file the way the module docstring asks for, by renaming a new file over it"""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+class TestSetReferenceData:
+    def test_reclassifies(self):
+        assert tp.parse_ticker("DGCXX")["asset_class"] == "Cash"
+        changed = tp.set_reference_data(
+            index=tp.INDEX_LIST | {"DGCXX"}, cash=tp.CASH_LIST - {"DGCXX"}
+        )
+        assert changed == {"DGCXX"}
+        assert tp.parse_ticker("DGCXX")["asset_class"] == "Index"
+
+    def test_only_affected_entries_invalidated(self):
+        tp.parse_tickers(["AAPL", "MSFT", "SPX", "AAPL  180216C00170000"])
+        tp.set_reference_data(index=tp.INDEX_LIST | {"MSFT"})
+        assert "MSFT" not in tp.PARSE_CACHE
+        assert all(t in tp.PARSE_CACHE for t in ["AAPL", "SPX", "AAPL  180216C00170000"])
+        assert tp.parse_ticker("MSFT")["ticker_bloomberg"] == "MSFT Index"
+
+    def test_unchanged(self):
+        tp.parse_ticker("SPX")
+        assert tp.set_reference_data(index=set(tp.INDEX_LIST)) == frozenset()
+        assert "SPX" in tp.PARSE_CACHE
+
+    def test_store_entries_deleted(self):
+        class Store(dict):
+            def put(self, ticker, result):
+                self[ticker] = result
+
+            def delete(self, tickers):
+                for ticker in tickers:
+                    self.pop(ticker, None)
+
+        tp.PARSE_CACHE.store = store = Store()
+        tp.parse_tickers(["AAPL", "MSFT"])
+        tp.set_reference_data(cash={"AAPL"})
+        assert set(store) == {"MSFT"}
+
+    def test_parse_in_flight_not_cached(self, monkeypatch):
+        # the reference data changes while AAPL is classified with the old lists
+        parse_one, parse_distinct = tp._parse_one, tp._parse_distinct
+
+        def parse_during_change(parse):
+            def parse_then_change(tickers):
+                parsed = parse(tickers)
+                tp.set_reference_data(index=tp.INDEX_LIST ^ {"AAPL"})
+                return parsed
+
+            return parse_then_change
+
+        monkeypatch.setattr(tp, "_parse_one", parse_during_change(parse_one))
+        assert tp.parse_ticker("AAPL")["asset_class"] == "Equity"
+        assert "AAPL" not in tp.PARSE_CACHE
+        monkeypatch.setattr(tp, "_parse_one", parse_one)
+        assert tp.parse_ticker("AAPL")["asset_class"] == "Index"
+
+        monkeypatch.setattr(tp, "_parse_distinct", parse_during_change(parse_distinct))
+        assert tp.parse_tickers(["AAPL"])[0]["asset_class"] == "Index"
+        assert "AAPL" not in tp.PARSE_CACHE
+
+    def test_store_put_in_flight_deleted(self):
+        class Store(dict):
+            def put(self, ticker, result):
+                if ticker == "AAPL":  # invalidated before the put reaches the store
+                    tp.set_reference_data(index=tp.INDEX_LIST | {"AAPL"})
+                self[ticker] = result
+
+            def delete(self, tickers):
+                for ticker in tickers:
+                    self.pop(ticker, None)
+
+        tp.PARSE_CACHE.store = store = Store()
+        tp.parse_tickers(["MSFT", "AAPL"])
+        assert set(store) == {"MSFT"}
+
+
+class TestReferenceDataFile:
+    def test_load(self, tmp_path):
+        path = tmp_path / "reference.csv"
+        path.write_text("symbol,asset_class\nSPX,Index\n\n# money market\nDGCXX,Cash\nFOO , Cash\n")
+        assert reference_data.load(path) == {"Index": {"SPX"}, "Cash": {"DGCXX", "FOO"}}
+
+    @pytest.mark.parametrize("text", ["SPX\n", "SPX,Equity\n", "SPX,Index,extra\n"])
+    def test_malformed(self, tmp_path, text):
+        path = tmp_path / "reference.csv"
+        path.write_text(text)
+        with pytest.raises(ValueError, match="line 1"):
+            reference_data.load(path)
+
+    def test_hot_reload(self, tmp_path):
+        path = tmp_path / "reference.csv"
+        write(path, "SPX,Index\nDGCXX,Cash\n")
+        ref = reference_data.ReferenceDataFile(path, check_interval=0)
+        ref.reload()
+        assert tp.parse_ticker("NDX")["asset_class"] == "Equity"
+        tp.parse_ticker("AAPL")
+
+        assert ref.check() is None
+        write(path, "SPX,Index\nNDX,Index\nDGCXX,Cash\n")
+        assert ref.check() == {"NDX"}
+        assert tp.parse_ticker("NDX")["asset_class"] == "Index"
+        assert "AAPL" in tp.PARSE_CACHE
+
+    def test_check_interval(self, tmp_path):
+        path = tmp_path / "reference.csv"
+        write(path, "SPX,Index\n")
+        ref = reference_data.ReferenceDataFile(path, check_interval=3600)
+        ref.check()
+        write(path, "NDX,Index\n")
+        assert ref.check() is None
+        assert "SPX" in tp.INDEX_LIST
+
+    def test_bad_file_keeps_current_data(self, tmp_path):
+        path = tmp_path / "reference.csv"
+        write(path, "SPX,Index\n")
+        ref = reference_data.ReferenceDataFile(path, check_interval=0)
+        ref.reload()
+        write(path, "SPX,Nonsense\n")
+        assert ref.check() is None
+        path.unlink()
+        assert ref.check() is None
+        assert tp.INDEX_LIST == {"SPX"}
+
+    def test_configured_from_environ(self, tmp_path):
+        path = tmp_path / "reference.csv"
+        write(path, "AAPL,Index\n")
+        api.configure_from_environ(
+            {
+                "TICKER_PARSER_REFERENCE_DATA": str(path),
+                "TICKER_PARSER_REFERENCE_DATA_CHECK_SECONDS": "0",
+            }
+        )
+        assert api.REFERENCE_DATA.check_interval == 0
+        assert tp.parse_ticker("AAPL")["asset_class"] == "Index"
+        write(path, "MSFT,Index\n")
+        resp = api.handle({"ticker": "AAPL"}, {}, b"")
+        assert '"asset_class": "Equity"' in resp.body
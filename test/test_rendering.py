@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import sys
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import ticker_parser as tp
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    cache = tp.ParseCache()
+    monkeypatch.setattr(tp, "PARSE_CACHE", cache)
+    return cache
+
+
+class TestLazyRendering:
+    def test_only_selected_formats_rendered(self, cache):
+        d = tp.parse_ticker("AAPL  180216C00170000", formats=("Bloomberg",))
+        assert d["ticker_bloomberg"] == "AAPL US 02/16/18 C170.0 Equity"
+        assert "ticker_occ" not in d and "ticker_eze" not in d
+        assert set(cache.get("AAPL  180216C00170000")._rendered) == {"Bloomberg"}
+
+    def test_renderings_memoized(self, cache, monkeypatch):
+        tp.convert_ticker("AAPL  180216C00170000", "Eze")
+
+        def fail(s):
+            raise AssertionError("rendered twice")
+
+        monkeypatch.setattr(tp.Eze_Option, "to_ticker_string", staticmethod(fail))
+        assert tp.convert_ticker("AAPL  180216C00170000", "Eze") == "AAPL US 02/16/18 C170.0"
+
+    def test_default_renders_all(self):
+        d = tp.parse_ticker("SPX Index")
+        assert (d["ticker_occ"], d["ticker_bloomberg"], d["ticker_eze"]) == (
+            "SPX",
+            "SPX Index",
+            "SPX",
+        )
+
+    def test_batch_formats(self):
+        (d,) = tp.parse_tickers(["AAPL"], formats=["OCC"])
+        assert d["ticker_occ"] == "AAPL" and "ticker_bloomberg" not in d
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            tp.check_formats(["OCC", "Reuters"])
+
+    def test_from_dict_round_trip(self):
+        result = tp._lookup("AAPL US 02/16/18 C175.45")
+        copy = tp.ParsedTicker.from_dict(result.to_dict())
+        assert copy.to_dict() == result.to_dict()
+
+
+class TestStrikeFormatting:
+    @pytest.mark.parametrize(
+        "strike, expected",
+        [(170.0, "170.0"), (175.5, "175.5"), (175.45, "175.45"), (0.5, "0.5")],
+    )
+    def test_format_strike(self, strike, expected):
+        assert tp._format_strike(strike) == expected
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import sys
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import ticker_parser as tp
+
+
+class TestSecurity:
+    def test_no_instance_dict(self):
+        sec = tp._parse_ticker("AAPL  180216C00170000")
+        assert not hasattr(sec, "__dict__")
+        with pytest.raises(AttributeError):
+            sec.not_a_field = 1
+
+    def test_to_dict_skips_unset_fields(self):
+        assert tp._parse_ticker("SPX Index").to_dict() == {
+            "format_type": "Bloomberg",
+            "asset_class": "Index",
+            "root_symbol": "SPX",
+            "bloomberg_suffix": "Index",
+        }
+
+    def test_to_dict_keeps_zero_fields(self):
+        sec = tp._parse_ticker("AAPL  000216C00000000")
+        assert sec.to_dict()["expiry_year"] == 0
+        assert sec.to_dict()["strike_price"] == 0.0
+
+    def test_strings_interned(self):
+        first = tp._parse_ticker("AAPL  180216C00170000")
+        second = tp._parse_ticker("AAPL US 02/16/18 C175.0")
+        assert first.root_symbol is second.root_symbol
+        assert first.exchange is second.exchange
+
+    def test_repr(self):
+        assert repr(tp._parse_ticker("SPX Index")).startswith("Security(format_type='Bloomberg'")
+
+
+class TestBloombergEquity:
+    def test_exchange_defaults_to_us(self):
+        assert tp.convert_ticker("AAPL Equity", "Bloomberg") == "AAPL US Equity"
+
+    def test_exchange_kept(self):
+        assert tp.convert_ticker("VOD LN Equity", "Bloomberg") == "VOD LN Equity"
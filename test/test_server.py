@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+import sys
+import asyncio
+import json
+import pathlib
+import threading
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import api
+import ndjson_bulk
+import server
+import ticker_parser as tp
+
+
+async def request(port, raw: bytes) -> tuple:
+    """send one raw HTTP request, returns (status, headers, body)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:] if line)
+    if headers.get("Transfer-Encoding") == "chunked":
+        body = b""
+        while True:
+            size = int(await reader.readuntil(b"\r\n"), 16)
+            body += (await reader.readexactly(size + 2))[:-2]
+            if not size:
+                break
+    else:
+        body = await reader.readexactly(int(headers["Content-Length"]))
+    writer.close()
+    return int(lines[0].split()[1]), headers, body
+
+
+def get(path: str) -> bytes:
+    return f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+
+
+def post(body: bytes, content_type="application/json") -> bytes:
+    return (
+        f"POST /api/TickerParser HTTP/1.1\r\nContent-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    ).encode() + body
+
+
+def with_server(test, **kwargs):
+    async def run():
+        srv = await server.start_server(port=0, **kwargs)
+        port = srv.sockets[0].getsockname()[1]
+        try:
+            return await test(port)
+        finally:
+            srv.close()
+            await srv.wait_closed()
+
+    return asyncio.run(run())
+
+
+class TestServer:
+    def test_single_ticker(self):
+        status, _, body = with_server(
+            lambda port: request(port, get("/api/TickerParser?ticker=AAPL"))
+        )
+        assert status == 200
+        assert json.loads(body) == tp.parse_ticker("AAPL")
+
+    def test_comma_separated_and_formats(self):
+        status, _, body = with_server(
+            lambda port: request(port, get("/?ticker=AAPL,SPX%20Index&formats=Eze"))
+        )
+        assert [r["ticker_eze"] for r in json.loads(body)] == ["AAPL", "SPX"]
+
+    def test_post_json(self):
+        raw = post(json.dumps({"ticker": ["AAPL  180216C00170000"]}).encode())
+        _, _, body = with_server(lambda port: request(port, raw))
+        assert json.loads(body)[0]["ticker_bloomberg"] == "AAPL US 02/16/18 C170.0 Equity"
+
+    def test_post_ndjson(self):
+        raw = post(b'"AAPL"\n"MSFT"\n', content_type="application/x-ndjson")
+        status, headers, body = with_server(lambda port: request(port, raw))
+        assert headers["Content-Type"] == "application/x-ndjson"
+        assert len(body.splitlines()) == 2
+
+    def test_ndjson_chunked(self):
+        rows = b'"AAPL"\n' * (ndjson_bulk.DEFAULT_CHUNK_SIZE + 1)
+        raw = post(rows, content_type="application/x-ndjson")
+
+        async def chunks(port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(raw + get("/?ticker=AAPL"))
+            head = await reader.readuntil(b"\r\n\r\n")
+            sizes = []
+            while not sizes or sizes[-1]:
+                sizes.append(int(await reader.readuntil(b"\r\n"), 16))
+                await reader.readexactly(sizes[-1] + 2)
+            # the connection stays usable after the last chunk
+            following = await reader.readuntil(b"\r\n\r\n")
+            writer.close()
+            return head, sizes, following
+
+        head, sizes, following = with_server(chunks)
+        assert b"Transfer-Encoding: chunked" in head and b"Content-Length" not in head
+        assert len(sizes) == 3 and sizes[-1] == 0
+        assert following.startswith(b"HTTP/1.1 200")
+
+    def test_ndjson_http_1_0(self):
+        raw = post(b'"AAPL"\n"MSFT"\n', content_type="application/x-ndjson")
+        raw = raw.replace(b"HTTP/1.1", b"HTTP/1.0", 1)
+        status, headers, body = with_server(lambda port: request(port, raw))
+        assert "Transfer-Encoding" not in headers
+        assert len(body.splitlines()) == 2
+
+    def test_metrics(self):
+        status, _, body = with_server(lambda port: request(port, get("/?metrics")))
+        assert status == 200
+        assert "formats" in json.loads(body)
+
+    def test_no_ticker(self):
+        status, _, _ = with_server(lambda port: request(port, get("/")))
+        assert status == 400
+
+    def test_bad_content_length(self):
+        for length in ["abc", "-5"]:
+            raw = f"POST / HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode()
+            status, _, _ = with_server(lambda port: request(port, raw))
+            assert status == 400
+
+    def test_keep_alive(self):
+        async def two_requests(port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            statuses = []
+            for ticker in ["AAPL", "MSFT"]:
+                writer.write(get(f"/?ticker={ticker}"))
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+                await reader.readexactly(length)
+                statuses.append(int(head.split()[1]))
+            writer.close()
+            return statuses
+
+        assert with_server(two_requests) == [200, 200]
+
+    def test_http_1_0_closes(self):
+        async def read_to_end(port, connection):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"GET /?ticker=AAPL HTTP/1.0\r\n{connection}\r\n".encode())
+            try:
+                return await asyncio.wait_for(reader.read(), 1)
+            except asyncio.TimeoutError:
+                return None  # still open
+            finally:
+                writer.close()
+
+        response = with_server(lambda port: read_to_end(port, ""))
+        assert b"Connection: close" in response and b"AAPL US Equity" in response
+        assert with_server(lambda port: read_to_end(port, "Connection: keep-alive\r\n")) is None
+
+    def test_expect_100_continue(self):
+        async def post_after_continue(port):
+            body = json.dumps({"ticker": ["AAPL"]}).encode()
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                f"POST / HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+                "Expect: 100-continue\r\n\r\n".encode()
+            )
+            interim = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 1)
+            writer.write(body)
+            head = await reader.readuntil(b"\r\n\r\n")
+            writer.close()
+            return interim, head
+
+        interim, head = with_server(post_after_continue)
+        assert interim == b"HTTP/1.1 100 Continue\r\n\r\n"
+        assert head.startswith(b"HTTP/1.1 200")
+
+    def test_bulk_does_not_block_single_requests(self, monkeypatch):
+        started, release = threading.Event(), threading.Event()
+        released = []
+        handle = api.handle
+
+        def slow_handle(params, headers, body):
+            started.set()
+            # only released once the single ticker request is answered
+            released.append(release.wait(5))
+            return handle(params, headers, body)
+
+        monkeypatch.setattr(api, "handle", slow_handle)
+
+        async def bulk_and_single(port):
+            bulk = asyncio.ensure_future(
+                request(port, post(b'"AAPL"\n', content_type="application/x-ndjson"))
+            )
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            try:
+                single = await asyncio.wait_for(request(port, get("/?ticker=MSFT")), 2)
+            finally:
+                release.set()
+            return single[0], (await bulk)[0]
+
+        assert with_server(bulk_and_single) == (200, 200)
+        assert released == [True]
+
+    def test_concurrent_requests_batched(self, monkeypatch):
+        tickers = ["AAPL", "MSFT", "bad ticker!", "SPX Index"] * 5
+
+        async def many(port):
+            return await asyncio.gather(
+                *(request(port, get(f"/?ticker={t.replace(' ', '%20')}")) for t in tickers)
+            )
+
+        batch_sizes = []
+        flush = server.MicroBatcher.flush
+
+        def counting_flush(self):
+            if self._pending:
+                batch_sizes.append(len(self._pending))
+            flush(self)
+
+        monkeypatch.setattr(server.MicroBatcher, "flush", counting_flush)
+        responses = with_server(many, max_wait=0.2)
+        assert [json.loads(body)["ticker_original"] for _, _, body in responses] == tickers
+        assert len(batch_sizes) < len(tickers)
+
+
+class TestMicroBatcher:
+    def test_max_batch_flushes_immediately(self, monkeypatch):
+        calls = []
+        parse_tickers = tp.parse_tickers
+        monkeypatch.setattr(
+            tp, "parse_tickers", lambda t, f: calls.append(t) or parse_tickers(t, f)
+        )
+
+        async def run():
+            batcher = server.MicroBatcher(max_batch=3, max_wait=10)
+            futures = [batcher.submit(t) for t in ["AAPL", "MSFT", "IBM"]]
+            return await asyncio.wait_for(asyncio.gather(*futures), 1)
+
+        results = asyncio.run(run())
+        assert calls == [["AAPL", "MSFT", "IBM"]]
+        assert [r["root_symbol"] for r in results] == ["AAPL", "MSFT", "IBM"]
+
+    def test_groups_by_formats(self):
+        async def run():
+            batcher = server.MicroBatcher(max_wait=0.01)
+            first = batcher.submit("AAPL", ("OCC",))
+            second = batcher.submit("AAPL", ("Eze",))
+            return await asyncio.gather(first, second), batcher.batches
+
+        (first, second), batches = asyncio.run(run())
+        assert "ticker_occ" in first and "ticker_occ" not in second
+        assert batches == 1
+
+    def test_errors_come_back_as_ticker_errors(self):
+        async def run():
+            return await server.MicroBatcher(max_wait=0).submit("bad ticker!")
+
+        assert isinstance(asyncio.run(run()), tp.TickerError)
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+import sys
+import uuid
+import pathlib
+import multiprocessing
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+pytest.importorskip("fcntl")
+
+import api
+import parallel
+import shared_cache
+import symbol_store
+import ticker_parser as tp
+
+TICKERS = [
+    "AAPL",
+    "BRK/B US Equity",
+    "SPX Index",
+    "DGCXX",
+    "AAPL  180216C00170000",
+    "AAPL US 02/16/18 C170.5 Equity",
+    "bad ticker!",
+]
+
+
+@pytest.fixture
+def name():
+    name = f"tp_test_{uuid.uuid4().hex[:12]}"
+    yield name
+    try:
+        shared_cache.SharedParseCache(name).unlink()
+    except FileNotFoundError:
+        pass
+
+
+@pytest.fixture
+def cache(name):
+    cache = shared_cache.SharedParseCache(name, entries=64, ways=4)
+    yield cache
+    cache.close()
+
+
+def _put_in_child(name, ticker):
+    child = shared_cache.SharedParseCache(name)
+    child.put(ticker, tp._lookup(ticker))
+    child.close()
+
+
+def _same(result, expected):
+    if isinstance(expected, tp.TickerError):
+        return result == expected
+    return result.to_dict() == expected.to_dict()
+
+
+class TestSharedParseCache:
+    def test_round_trip(self, cache):
+        for ticker in TICKERS:
+            cache.put(ticker, tp._lookup(ticker))
+        for ticker in TICKERS:
+            assert _same(cache.get(ticker), tp._lookup(ticker)), ticker
+        assert cache.get("MSFT") is None
+        assert len(cache) == len(TICKERS)
+        stats = cache.stats()
+        assert (stats.hits, stats.misses) == (len(TICKERS), 1)
+
+    def test_attach_uses_existing_layout(self, cache, name):
+        cache.put("AAPL", tp._lookup("AAPL"))
+        other = shared_cache.SharedParseCache(name, entries=1000, ways=2)
+        assert (other.buckets, other.ways) == (cache.buckets, cache.ways)
+        assert other.get("AAPL").to_dict() == tp.parse_ticker("AAPL")
+        other.close()
+
+    def test_shared_between_processes(self, cache, name):
+        child = multiprocessing.Process(target=_put_in_child, args=(name, "AAPL  180216C00170000"))
+        child.start()
+        child.join()
+        assert child.exitcode == 0
+        assert cache.get("AAPL  180216C00170000").render("Bloomberg") == (
+            "AAPL US 02/16/18 C170.0 Equity"
+        )
+
+    def test_fifo_within_bucket(self, name):
+        cache = shared_cache.SharedParseCache(name, entries=2, ways=2)
+        assert cache.buckets == 1
+        for ticker in ["AAPL", "MSFT", "AAPL", "IBM"]:
+            cache.put(ticker, tp._lookup(ticker))
+        # putting AAPL again does not make it newer, MSFT was put after it
+        assert cache.get("AAPL") is None
+        assert cache.get("MSFT") is not None and cache.get("IBM") is not None
+        assert cache.stats().evictions == 1
+        cache.close()
+
+    def test_delete(self, cache):
+        for ticker in ["AAPL", "MSFT"]:
+            cache.put(ticker, tp._lookup(ticker))
+        cache.delete(["AAPL", "IBM"])
+        assert cache.get("AAPL") is None
+        assert cache.get("MSFT") is not None
+
+    def test_too_large_for_slot(self, name):
+        cache = shared_cache.SharedParseCache(name, entries=4, slot_bytes=64)
+        cache.put("AAPL  180216C00170000", tp._lookup("AAPL  180216C00170000"))
+        cache.put("bad!", tp._lookup("bad!"))
+        assert cache.get("AAPL  180216C00170000") is None
+        assert cache.get("bad!") is not None
+        assert cache.stats().rejections == 1
+        cache.close()
+
+    def test_slot_being_written_is_a_miss(self, cache):
+        cache.put("AAPL", tp._lookup("AAPL"))
+        key = b"AAPL"
+        slot = next(
+            s for s in cache._slots(cache._bucket(key)) if cache._buf[s + 16 : s + 20] == key
+        )
+        (sequence,) = shared_cache.SEQUENCE.unpack_from(cache._buf, slot)
+        shared_cache.SEQUENCE.pack_into(cache._buf, slot, sequence + 1)
+        assert cache.get("AAPL") is None
+        shared_cache.SEQUENCE.pack_into(cache._buf, slot, sequence + 2)
+        assert cache.get("AAPL") is not None
+
+    def test_unencodable_ticker(self, cache):
+        error = tp._to_result("\udc00X", tp._parse_one("\udc00X"))
+        cache.put("\udc00X", error)
+        assert cache.get("\udc00X") == error
+
+    def test_other_reference_data_is_a_miss(self, cache, name, monkeypatch):
+        assert cache.get("SPX") is None  # this process is on the built in reference data
+        # another process that has not loaded the new reference data yet, without SPX as an index
+        monkeypatch.setattr(tp, "INDEX_LIST", tp.INDEX_LIST - {"SPX"})
+        late = shared_cache.SharedParseCache(name)
+        late.put("SPX", tp._to_result("SPX", tp._parse_one("SPX")))
+        assert late.get("SPX").security.asset_class == "Equity"
+        late.close()
+        monkeypatch.undo()
+        assert cache.get("SPX") is None
+
+    def test_new_reference_data_keeps_unaffected_entries(self, cache, monkeypatch):
+        for ticker in ["AAPL", "MSFT"]:
+            cache.put(ticker, tp._to_result(ticker, tp._parse_one(ticker)))
+        monkeypatch.setattr(tp, "INDEX_LIST", tp.INDEX_LIST | {"AAPL"})
+        assert cache.get("AAPL") is None
+        assert cache.get("MSFT").security.asset_class == "Equity"
+
+    def test_stale_rules_dropped(self, cache, name, monkeypatch):
+        cache.put("AAPL", tp._lookup("AAPL"))
+        monkeypatch.setattr(symbol_store, "SCHEMA_VERSION", symbol_store.SCHEMA_VERSION + 1)
+        reopened = shared_cache.SharedParseCache(name)
+        assert len(reopened) == 0
+        reopened.close()
+
+    def test_second_level_of_parse_cache(self, cache, tmp_path, monkeypatch):
+        store = symbol_store.SymbolStore(tmp_path / "symbols.sqlite")
+        store.populate(["MSFT"])
+        cache.store = store
+        monkeypatch.setattr(tp, "PARSE_CACHE", tp.ParseCache(maxsize=10, store=cache))
+        tp.parse_tickers(["AAPL", "MSFT"])
+        assert cache.stats().store_hits == 1
+        assert store.get("AAPL") is not None
+
+        # a fresh process-local cache finds both in the shared table
+        monkeypatch.setattr(tp, "PARSE_CACHE", tp.ParseCache(maxsize=10, store=cache))
+        assert tp.parse_ticker("AAPL") == tp.parse_ticker("AAPL")
+        assert tp.PARSE_CACHE.stats().store_hits == 1
+        tp.PARSE_CACHE.invalidate(["AAPL"])
+        assert cache.get("AAPL") is None and store.get("AAPL") is None
+
+    def test_parallel_workers(self, name, tmp_path, monkeypatch):
+        # forked workers start with the parse cache of this process, which must not have the tickers yet
+        monkeypatch.setattr(tp, "PARSE_CACHE", tp.ParseCache())
+        src, out = tmp_path / "tickers.txt", tmp_path / "out.txt"
+        src.write_text("\n".join(TICKERS) + "\n")
+        parallel.convert_file_parallel(
+            str(src), str(out), "OCC", workers=2, chunk_bytes=8, shared_cache=name
+        )
+        cache = shared_cache.SharedParseCache(name)
+        assert cache.get("BRK/B US Equity").render("OCC") == "BRK/B"
+        cache.close()
+
+    def test_configured_from_environ(self, name, monkeypatch):
+        monkeypatch.setattr(tp, "PARSE_CACHE", tp.ParseCache())
+        api.configure_from_environ({"TICKER_PARSER_SHARED_CACHE": name})
+        api.configure_from_environ({"TICKER_PARSER_SHARED_CACHE": name})  # applied once only
+        assert isinstance(tp.PARSE_CACHE.store, shared_cache.SharedParseCache)
+        assert tp.PARSE_CACHE.store.store is None
+        tp.parse_ticker("AAPL")
+        assert tp.PARSE_CACHE.store.get("AAPL") is not None
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+import sys
+import json
+import pathlib
+import multiprocessing
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+import api
+import cli
+import symbol_store
+import ticker_parser as tp
+
+
+def _parse_in_child(path, ticker):
+    tp.PARSE_CACHE = tp.ParseCache(maxsize=10, store=symbol_store.SymbolStore(path))
+    tp.parse_ticker(ticker)
+    tp.PARSE_CACHE.store.close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = symbol_store.SymbolStore(tmp_path / "symbols.sqlite")
+    yield store
+    store.close()
+
+
+class TestSymbolStore:
+    def test_round_trip(self, store):
+        result = tp._to_result("AAPL  180216C00170000", tp._parse_ticker("AAPL  180216C00170000"))
+        store.put("AAPL  180216C00170000", result)
+        stored = store.get("AAPL  180216C00170000")
+        assert stored.to_dict() == tp.parse_ticker("AAPL  180216C00170000")
+        assert set(stored._rendered) == set(tp.RENDER_FORMATS)  # stored with every rendering
+        assert store.get("MSFT") is None
+
+    def test_round_trip_error(self, store):
+        error = tp.TickerError("bad ticker!", tp.PARSE_ERROR.NoMatch)
+        store.put("bad ticker!", error)
+        assert store.get("bad ticker!") == error
+
+    def test_persists_across_instances(self, store):
+        store.populate(["AAPL"])
+        store.close()
+        reopened = symbol_store.SymbolStore(store.path)
+        assert reopened.get("AAPL").to_dict() == tp.parse_ticker("AAPL")
+        reopened.close()
+
+    def test_stale_rules_dropped(self, store, monkeypatch):
+        store.populate(["AAPL", "MSFT"])
+        store.close()
+        monkeypatch.setattr(symbol_store, "SCHEMA_VERSION", symbol_store.SCHEMA_VERSION + 1)
+        reopened = symbol_store.SymbolStore(store.path)
+        assert len(reopened) == 0
+        reopened.close()
+
+    def test_rules_version_covers_code(self, monkeypatch):
+        version = symbol_store.rules_version()
+        monkeypatch.setattr(tp, "_format_strike", lambda strike: f"{strike:.3f}")
+        assert symbol_store.rules_version() != version
+        monkeypatch.undo()
+        monkeypatch.setattr(
+            tp.OCC_Option, "to_ticker_string", staticmethod(lambda s: s.root_symbol)
+        )
+        assert symbol_store.rules_version() != version
+
+    def test_unencodable_ticker(self, store, monkeypatch):
+        monkeypatch.setattr(tp, "PARSE_CACHE", tp.ParseCache(maxsize=10, store=store))
+        resp = api.handle({}, {}, json.dumps({"ticker": "\udc00X"}).encode())
+        assert resp.status_code == 200
+        assert "error_message" in json.loads(resp.body)
+        assert store.get("\udc00X") is None
+
+    def test_reclassified_tickers_dropped(self, store, monkeypatch):
+        store.populate(["AAPL", "MSFT", "SPX"])
+        store.close()
+        monkeypatch.setattr(tp, "INDEX_LIST", tp.INDEX_LIST | {"AAPL"})
+        reopened = symbol_store.SymbolStore(store.path)
+        assert reopened.get("AAPL") is None
+        assert reopened.get("MSFT") is not None and reopened.get("SPX") is not None
+        reopened.close()
+
+    def test_other_reference_data_is_a_miss(self, store, monkeypatch):
+        store.populate(["MSFT"])  # connects this process on the built in reference data
+        # another process that has not loaded the new reference data yet, without SPX as an index
+        monkeypatch.setattr(tp, "INDEX_LIST", tp.INDEX_LIST - {"SPX"})
+        late = symbol_store.SymbolStore(store.path)
+        late.put("SPX", tp._to_result("SPX", tp._parse_one("SPX")))
+        assert late.get("SPX").security.asset_class == "Equity"
+        late.close()
+        monkeypatch.undo()
+        assert store.get("SPX") is None
+
+    def test_new_reference_data_keeps_unaffected_entries(self, store, monkeypatch):
+        store.populate(["AAPL", "MSFT"])
+        monkeypatch.setattr(tp, "INDEX_LIST", tp.INDEX_LIST | {"AAPL"})
+        assert store.get("AAPL") is None
+        assert store.get("MSFT").security.asset_class == "Equity"
+
+    def test_populate_from_file(self, store, tmp_path):
+        universe = tmp_path / "universe.txt"
+        universe.write_text("AAPL\nSPX Index\n\nAAPL\nAAPL  180216C00170000\n")
+        assert store.populate_from_file(universe) == 3
+        assert len(store) == 3
+        assert store.get("SPX Index").render("Eze") == "SPX"
+
+    def test_second_level_of_parse_cache(self, store, monkeypatch):
+        store.populate(["AAPL"])
+        cache = tp.ParseCache(maxsize=10, store=store)
+        monkeypatch.setattr(tp, "PARSE_CACHE", cache)
+        tp.parse_ticker("AAPL")
+        tp.parse_ticker("AAPL")
+        tp.parse_tickers(["MSFT"])
+        stats = cache.stats()
+        assert (stats.hits, stats.store_hits, stats.misses) == (1, 1, 1)
+        assert store.get("MSFT").to_dict() == tp.parse_ticker("MSFT")
+
+    def test_shared_between_processes(self, store, monkeypatch):
+        # a put waiting to be written must not keep the database locked for other workers
+        monkeypatch.setattr(tp, "PARSE_CACHE", tp.ParseCache(maxsize=10, store=store))
+        tp.parse_ticker("AAPL")
+        child = multiprocessing.Process(target=_parse_in_child, args=(store.path, "MSFT"))
+        child.start()
+        child.join()
+        assert child.exitcode == 0
+        assert store.get("MSFT").to_dict() == tp.parse_ticker("MSFT")
+        assert store.get("AAPL").to_dict() == tp.parse_ticker("AAPL")
+
+    def test_warm(self, store):
+        store.populate(["AAPL", "MSFT", "IBM"])
+        cache = tp.ParseCache(maxsize=2)
+        assert store.warm(cache) == 2
+        assert len(cache) == 2
+
+    def test_cli_populate(self, tmp_path):
+        universe = tmp_path / "universe.txt"
+        universe.write_text("AAPL\nSPX Index\n")
+        db = tmp_path / "cli.sqlite"
+        cli.main(["populate", str(db), str(universe)])
+        assert len(symbol_store.SymbolStore(db)) == 2
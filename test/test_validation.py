@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import sys
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import ticker_parser as tp
+
+TICKERS = {
+    "AAPL": "Generic_Non_Option",
+    "AAPL US Equity": "Bloomberg_Equity",
+    "SPX Index": "Bloomberg_Index",
+    "AAPL  180216C00170000": "OCC_Option",
+    "AAPL US 02/16/18 C170.0 Equity": "Bloomberg_Option",
+    "AAPL US 02/16/18 C170.0": "Eze_Option",
+    "AAPL 180216C00175450": tp.PARSE_ERROR.NoMatch,
+    "bad ticker!": tp.PARSE_ERROR.NoMatch,
+    "": tp.PARSE_ERROR.NoMatch,
+}
+
+
+class TestValidate:
+    def test_reason_codes(self):
+        assert tp.validate_tickers(TICKERS) == list(TICKERS.values())
+
+    def test_agrees_with_parse_tickers(self):
+        tickers = list(TICKERS) * 2
+        parsed = tp.parse_tickers(tickers)
+        assert tp.valid_mask(tickers) == [not isinstance(r, tp.TickerError) for r in parsed]
+
+    def test_order_and_duplicates(self):
+        assert tp.validate_tickers(["bad ticker!", "AAPL", "bad ticker!"]) == [
+            tp.PARSE_ERROR.NoMatch,
+            "Generic_Non_Option",
+            tp.PARSE_ERROR.NoMatch,
+        ]
+
+    def test_ambiguous(self, monkeypatch):
+        table = tp._build_dispatch_table([tp.Generic_Non_Option, tp.Generic_Non_Option])
+        monkeypatch.setattr(tp, "_DISPATCH_TABLE", table)
+        assert tp.validate_tickers(["AAPL"]) == [tp.PARSE_ERROR.Ambiguous]
+        assert tp.valid_mask(["AAPL"]) == [False]
+
+    def test_builds_and_caches_nothing(self, monkeypatch):
+        monkeypatch.setattr(tp, "PARSE_CACHE", tp.ParseCache())
+
+        def no_security(*args, **kwargs):
+            raise AssertionError("validation must not build a Security")
+
+        monkeypatch.setattr(tp, "Security", no_security)
+        tp.validate_tickers(TICKERS)
+        assert len(tp.PARSE_CACHE) == 0
+        assert tp.PARSE_CACHE.stats().misses == 0
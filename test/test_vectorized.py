@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+import sys
+import datetime
+import pathlib
+
+# hack to add the folder to the python path
+app_path = pathlib.Path(__file__).parents[1] / "TickerParser"
+sys.path.append(str(app_path))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import ticker_parser as tp
+import vectorized as vec
+
+OCC_TICKERS = [
+    "AAPL  180216C00170000",
+    "AAPL  180216C00175450",
+    "SPY   191231p00321500",
+    "X     200117P00000500",
+    "GOOGL 210618C02500000",
+]
+INVALID_TICKERS = [
+    "AAPL 180216C00170000",  # too little padding
+    "AAPL   180216C00170000",  # too much padding
+    "AAPL  180216X00170000",  # not a call or put
+    "AAPL  18021AC00170000",  # letter in the date
+    "AAP1  180216C00170000",  # digit in the root
+    "ÄAPL  180216C00170000",  # not ascii in the root
+    "AAPL  180216C0017000é",  # not ascii
+    "",
+]
+
+
+def assert_matches_parser(columns, tickers):
+    for i, ticker in enumerate(tickers):
+        sec = tp._parse_ticker(ticker)
+        if not isinstance(sec, tp.Security):
+            assert not columns.valid[i], ticker
+            assert np.isnan(columns.strike_price[i])
+            continue
+        assert columns.valid[i], ticker
+        assert columns.root_symbol[i] == sec.root_symbol
+        assert columns.expiry_year[i] == sec.expiry_year
+        assert columns.expiry_month[i] == sec.expiry_month
+        assert columns.expiry_day[i] == sec.expiry_day
+        assert columns.call_put[i] == sec.call_put
+        assert columns.strike_price[i] == sec.strike_price
+
+
+class TestDecodeOCC:
+    def test_list_of_str(self):
+        tickers = OCC_TICKERS + INVALID_TICKERS
+        assert_matches_parser(vec.decode_occ(tickers), tickers)
+
+    def test_array_of_bytes(self):
+        tickers = OCC_TICKERS + INVALID_TICKERS[:-2]
+        arr = np.array([t.encode() for t in tickers])
+        assert_matches_parser(vec.decode_occ(arr), tickers)
+
+    def test_fixed_width_buffer(self):
+        buf = "".join(OCC_TICKERS).encode()
+        assert_matches_parser(vec.decode_occ(buf), OCC_TICKERS)
+
+    def test_newline_terminated_buffer(self):
+        buf = "\n".join(OCC_TICKERS).encode()  # no newline after the last record
+        assert_matches_parser(vec.decode_occ(buf, record_size=22), OCC_TICKERS)
+
+    def test_invalid_record_in_buffer(self):
+        buf = bytearray("".join(OCC_TICKERS).encode())
+        buf[21 + 12] = ord("X")
+        columns = vec.decode_occ(buf)
+        assert columns.valid.tolist() == [True, False, True, True, True]
+        assert columns.root_symbol[1] == ""
+
+    def test_latin1_byte_in_buffer(self):
+        buf = bytearray("".join(OCC_TICKERS).encode())
+        buf[21] = 0xC4  # latin-1 Ä in the root
+        buf[42 + 12] = 0xC4  # and in place of the call/put
+        columns = vec.decode_occ(buf)
+        assert columns.valid.tolist() == [True, False, False, True, True]
+        assert columns.root_symbol.tolist()[:3] == ["AAPL", "", ""]
+        assert columns.call_put.tolist()[:3] == ["C", "", ""]
+
+    def test_empty(self):
+        assert len(vec.decode_occ([]).valid) == 0
+        assert len(vec.decode_occ(b"").valid) == 0
+
+    def test_record_size_too_small(self):
+        with pytest.raises(ValueError):
+            vec.decode_occ(b"AAPL", record_size=4)
+
+
+class TestRenderOptions:
+    @pytest.mark.parametrize("target_format", ["OCC", "Bloomberg", "Eze"])
+    def test_same_as_to_ticker_string(self, target_format):
+        tickers = OCC_TICKERS + ["AAPL  180216C00175500", "AAPL  180216C00175005"]
+        securities = [tp._parse_ticker(t) for t in tickers]
+        fields = {
+            name: [getattr(s, name) for s in securities]
+            for name in ["root_symbol", "expiry_year", "expiry_month", "expiry_day", "call_put"]
+        }
+        rendered = vec.render_options(
+            strike_price=[s.strike_price for s in securities], target_format=target_format, **fields
+        )
+        fmt = tp.FORMATS_FOR_REBUILD[tp.ASSET_CLASS.Option][target_format]
+        assert rendered == [fmt.to_ticker_string(s) for s in securities]
+
+    def test_scalars_broadcast(self):
+        assert vec.render_options("aapl", 18, 2, 16, ["C", "P"], 170, "Bloomberg") == [
+            "AAPL US 02/16/18 C170.0 Equity",
+            "AAPL US 02/16/18 P170.0 Equity",
+        ]
+
+    def test_exchange(self):
+        assert vec.render_options("VOD", 18, 2, 16, "C", 2.25, "Eze", exchange="LN") == [
+            "VOD LN 02/16/18 C2.25"
+        ]
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            vec.render_options("AAPL", 18, 2, 16, "C", 170, "Generic")
+
+
+class TestRenderOptionChain:
+    def test_order(self):
+        chain = vec.render_option_chain(
+            ["AAPL", "X"], [datetime.date(2018, 2, 16), (18, 3, 16)], [170, 172.5], "OCC"
+        )
+        assert len(chain) == 2 * 2 * 2 * 2
+        assert chain[:4] == [
+            "AAPL  180216C00170000",
+            "AAPL  180216C00172500",
+            "AAPL  180216P00170000",
+            "AAPL  180216P00172500",
+        ]
+        assert chain[-1] == "X     180316P00172500"
+
+    def test_round_trips(self):
+        chain = vec.render_option_chain(["SPY"], [(19, 12, 31)], [321.5, 0.5], "Bloomberg", "P")
+        assert chain == ["SPY US 12/31/19 P321.5 Equity", "SPY US 12/31/19 P0.5 Equity"]
+        assert [tp.convert_ticker(t, "OCC") for t in chain] == [
+            "SPY   191231P00321500",
+            "SPY   191231P00000500",
+        ]